@@ -0,0 +1,139 @@
+import contextvars
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+
+from urllib3.connectionpool import HTTPConnectionPool
+
+LATENCY_WINDOW = 1000
+
+_current = contextvars.ContextVar('request_stats', default=None)
+_in_http_call = contextvars.ContextVar('in_http_call', default=False)
+
+
+class RequestStats:
+    """What one request spent, filled in by the DB execute wrapper and the HTTP hook."""
+
+    __slots__ = ('db_queries', 'db_seconds', 'http_calls', 'http_seconds')
+
+    def __init__(self):
+        self.db_queries = 0
+        self.db_seconds = 0.0
+        self.http_calls = 0
+        self.http_seconds = 0.0
+
+    def db_wrapper(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_seconds += time.perf_counter() - started
+            self.db_queries += 1
+
+
+@contextmanager
+def collect(stats=None):
+    """Attribute outbound HTTP calls to `stats` (a new RequestStats by default) while inside."""
+    stats = stats if stats is not None else RequestStats()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+def record_http_call(seconds):
+    stats = _current.get()
+    if stats is not None:
+        stats.http_calls += 1
+        stats.http_seconds += seconds
+
+
+_http_hook_lock = threading.Lock()
+
+
+def install_http_timing():
+    """
+    Time every outbound call made through urllib3, which carries the SMS API
+    (requests), Razorpay (requests) and Cloudinary (urllib3) traffic. Retries
+    and redirects inside one call are counted once.
+    """
+    with _http_hook_lock:
+        if getattr(HTTPConnectionPool.urlopen, '_timed', False):
+            return
+        original = HTTPConnectionPool.urlopen
+
+        @wraps(original)
+        def urlopen(self, *args, **kwargs):
+            if _in_http_call.get() or _current.get() is None:
+                return original(self, *args, **kwargs)
+            token = _in_http_call.set(True)
+            started = time.perf_counter()
+            try:
+                return original(self, *args, **kwargs)
+            finally:
+                _in_http_call.reset(token)
+                record_http_call(time.perf_counter() - started)
+
+        urlopen._timed = True
+        HTTPConnectionPool.urlopen = urlopen
+
+
+class MetricsRegistry:
+    """Per-process, per-endpoint request counters with rolling windows."""
+
+    SERIES = ('wall_ms', 'db_ms', 'db_queries', 'http_ms', 'response_bytes')
+
+    def __init__(self, window=LATENCY_WINDOW):
+        self._lock = threading.Lock()
+        self._window = window
+        self._endpoints = {}
+
+    def record(self, endpoint, status_code, **values):
+        with self._lock:
+            entry = self._endpoints.get(endpoint)
+            if entry is None:
+                entry = self._endpoints[endpoint] = {
+                    'requests': 0,
+                    'errors': 0,
+                    **{name: deque(maxlen=self._window) for name in self.SERIES},
+                }
+            entry['requests'] += 1
+            entry['errors'] += 1 if status_code >= 500 else 0
+            for name in self.SERIES:
+                if values.get(name) is not None:
+                    entry[name].append(values[name])
+
+    def reset(self):
+        with self._lock:
+            self._endpoints.clear()
+
+    def snapshot(self):
+        with self._lock:
+            endpoints = {
+                endpoint: (entry['requests'], entry['errors'], {name: sorted(entry[name]) for name in self.SERIES})
+                for endpoint, entry in self._endpoints.items()
+            }
+
+        def pct(values, q):
+            return round(values[min(int(len(values) * q), len(values) - 1)], 2) if values else None
+
+        def mean(values):
+            return round(sum(values) / len(values), 2) if values else None
+
+        return {
+            endpoint: {
+                'requests': requests,
+                'errors': errors,
+                **{
+                    name: {'p50': pct(values, 0.50), 'p95': pct(values, 0.95), 'max': pct(values, 1), 'mean': mean(values)}
+                    for name, values in series.items()
+                },
+            }
+            for endpoint, (requests, errors, series) in sorted(endpoints.items())
+        }
+
+
+registry = MetricsRegistry()
@@ -0,0 +1,190 @@
+import time
+from contextlib import ExitStack, contextmanager
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional
+    brotli = None
+
+from django.conf import settings
+from django.db import connections
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+from django.utils.regex_helper import _lazy_re_compile
+
+from .metrics import RequestStats, collect, install_http_timing, registry
+
+DEFAULT_MIN_SIZE = 1024
+# Dynamic responses: quality 4-5 compresses better than gzip -6 at similar CPU.
+DEFAULT_BROTLI_QUALITY = 4
+DEFAULT_COMPRESSIBLE_TYPES = (
+    'application/json',
+    'application/x-ndjson',
+    'application/javascript',
+    'application/xml',
+    'image/svg+xml',
+    'text/',
+)
+
+re_accepts_br = _lazy_re_compile(r'\bbr\b(?!\s*;\s*q=0(?:\.0*)?(?![\d.]))')
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """
+    Brotli (when the package is installed and the client accepts it) or gzip,
+    only for compressible content types and bodies of at least
+    COMPRESSION_MIN_SIZE bytes. Streaming responses are compressed chunk by
+    chunk as they are produced; their size is unknown up front, so the
+    threshold doesn't apply to them.
+
+    The gzip path keeps GZipMiddleware's BREACH mitigation (random filename
+    padding, max_random_bytes); the brotli package has no equivalent, so br
+    responses go out unpadded. Set COMPRESSION_BROTLI = False to serve gzip only
+    if responses ever reflect request input next to a secret.
+    """
+
+    def process_response(self, request, response):
+        if response.has_header('Content-Encoding') or not self.is_compressible(response):
+            return response
+        if not response.streaming and len(response.content) < getattr(settings, 'COMPRESSION_MIN_SIZE', DEFAULT_MIN_SIZE):
+            return response
+
+        use_brotli = brotli is not None and getattr(settings, 'COMPRESSION_BROTLI', True)
+        if not use_brotli or not re_accepts_br.search(request.META.get('HTTP_ACCEPT_ENCODING', '')):
+            return super().process_response(request, response)
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        quality = getattr(settings, 'COMPRESSION_BROTLI_QUALITY', DEFAULT_BROTLI_QUALITY)
+        if response.streaming:
+            if response.is_async:
+                original_iterator = response.streaming_content
+
+                async def brotli_wrapper():
+                    compressor = brotli.Compressor(quality=quality)
+                    async for chunk in original_iterator:
+                        data = compressor.process(chunk)
+                        if data:
+                            yield data
+                    yield compressor.finish()
+
+                response.streaming_content = brotli_wrapper()
+            else:
+                response.streaming_content = self.brotli_sequence(response.streaming_content, quality)
+            del response.headers['Content-Length']
+        else:
+            compressed = brotli.compress(response.content, quality=quality)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers['Content-Length'] = str(len(response.content))
+
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = 'br'
+        return response
+
+    @staticmethod
+    def is_compressible(response):
+        content_type = response.get('Content-Type', '').split(';')[0].strip().lower()
+        types = getattr(settings, 'COMPRESSIBLE_CONTENT_TYPES', DEFAULT_COMPRESSIBLE_TYPES)
+        return any(content_type.startswith(prefix) if prefix.endswith('/') else content_type == prefix for prefix in types)
+
+    @staticmethod
+    def brotli_sequence(sequence, quality):
+        compressor = brotli.Compressor(quality=quality)
+        for chunk in sequence:
+            data = compressor.process(chunk)
+            if data:
+                yield data
+        yield compressor.finish()
+
+
+class PerformanceMiddleware:
+    """
+    Per request: wall time, DB query count and time, outbound HTTP time and the
+    serialized body size, recorded per endpoint (method + URL pattern) in
+    config.metrics.registry. With PERFORMANCE_SERVER_TIMING (defaults to DEBUG)
+    the same numbers go out in a Server-Timing header.
+
+    Streaming responses are recorded once their body has been iterated, so the
+    queries and time spent producing it count too; their Server-Timing header
+    has to go out first and covers only the view up to the first byte.
+
+    Sits below CompressionMiddleware, so sizes are before compression.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        install_http_timing()
+
+    def __call__(self, request):
+        started = time.perf_counter()
+        stats = RequestStats()
+        with self.measure(stats):
+            response = self.get_response(request)
+
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = self.measured_async_stream(request, response, response.streaming_content, stats, started)
+            else:
+                response.streaming_content = self.measured_stream(request, response, response.streaming_content, stats, started)
+        else:
+            self.record(request, response, stats, started, len(response.content))
+
+        if getattr(settings, 'PERFORMANCE_SERVER_TIMING', settings.DEBUG):
+            wall = time.perf_counter() - started
+            response.headers['Server-Timing'] = ', '.join([
+                f'app;dur={wall * 1000:.1f}',
+                f'db;dur={stats.db_seconds * 1000:.1f};desc="{stats.db_queries} queries"',
+                f'http;dur={stats.http_seconds * 1000:.1f};desc="{stats.http_calls} calls"',
+            ])
+        return response
+
+    @staticmethod
+    @contextmanager
+    def measure(stats):
+        with collect(stats), ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(stats.db_wrapper))
+            yield
+
+    def measured_stream(self, request, response, content, stats, started):
+        # Measured a chunk at a time: the server may pull each one from a different context.
+        iterator, size = iter(content), 0
+        try:
+            while True:
+                with self.measure(stats):
+                    chunk = next(iterator, None)
+                if chunk is None:
+                    break
+                size += len(chunk)
+                yield chunk
+        finally:
+            self.record(request, response, stats, started, size)
+
+    async def measured_async_stream(self, request, response, content, stats, started):
+        iterator, size = aiter(content), 0
+        try:
+            while True:
+                with self.measure(stats):
+                    chunk = await anext(iterator, None)
+                if chunk is None:
+                    break
+                size += len(chunk)
+                yield chunk
+        finally:
+            self.record(request, response, stats, started, size)
+
+    @staticmethod
+    def record(request, response, stats, started, size):
+        match = request.resolver_match
+        endpoint = f"{request.method} /{match.route}" if match else f"{request.method} <unmatched>"
+        registry.record(
+            endpoint, response.status_code,
+            wall_ms=(time.perf_counter() - started) * 1000,
+            db_ms=stats.db_seconds * 1000,
+            db_queries=stats.db_queries,
+            http_ms=stats.http_seconds * 1000,
+            response_bytes=size,
+        )
@@ -52,6 +52,8 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'config.middleware.CompressionMiddleware',
+    'config.middleware.PerformanceMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -136,9 +138,58 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'static')
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'    
 
+REST_FRAMEWORK = {
+    # orjson-backed JSON with a stdlib fallback; output matches DRF's JSONRenderer.
+    'DEFAULT_RENDERER_CLASSES': [
+        'config.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'config.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+}
+
+# Responses of compressible types at or above this many bytes are sent with
+# Brotli (if the brotli package is installed and accepted) or gzip.
+COMPRESSION_MIN_SIZE = 1024
+COMPRESSION_BROTLI_QUALITY = 4
+# Unlike gzip, br responses carry no BREACH padding; False serves gzip only.
+COMPRESSION_BROTLI = True
+
+# Per-endpoint timings are always kept in config.metrics.registry (see the
+# staff-only /metrics/ endpoint); Server-Timing headers only when this is on.
+PERFORMANCE_SERVER_TIMING = DEBUG
+
 RAZORPAY_KEY_ID = os.environ.get('RAZORPAY_KEY_ID')
 RAZORPAY_KEY_SECRET = os.environ.get('RAZORPAY_KEY_SECRET')
 RAZORPAY_WEBHOOK_SECRET = os.environ.get('RAZORPAY_WEBHOOK_SECRET')
+# Shared cache for idempotency replays and cached read endpoints. Without REDIS_URL
+# each process gets its own local-memory cache.
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['REDIS_URL'],
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Seconds a stored response is replayed for a repeated Idempotency-Key.
+IDEMPOTENCY_TTL = 24 * 60 * 60
+# Seconds before a key whose first request never finished (e.g. the worker died) can be retried.
+IDEMPOTENCY_LOCK_TIMEOUT = 60
+
+# Process-wide payment client; 'user_management.payments.FakeGateway' for offline runs.
+PAYMENT_GATEWAY = os.environ.get('PAYMENT_GATEWAY', 'user_management.payments.RazorpayGateway')
+PAYMENT_GATEWAY_TIMEOUT = (3.05, 10)
+PAYMENT_GATEWAY_POOL_SIZE = 20
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
@@ -18,11 +18,13 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
+from .views import PerformanceMetricsView
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('user_management/', include('user_management.urls')),
     path('restaurant/', include('restaurant.urls')),
+    path('metrics/', PerformanceMetricsView.as_view(), name='performance-metrics'),
 ]
 
 urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
\ No newline at end of file
@@ -0,0 +1,20 @@
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from rest_framework import status
+
+from .metrics import registry
+
+
+class PerformanceMetricsView(APIView):
+    """Per-endpoint request metrics of the process that answers (each worker keeps its own)."""
+    authentication_classes = [TokenAuthentication]
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(registry.snapshot(), status=status.HTTP_200_OK)
+
+    def delete(self, request):
+        registry.reset()
+        return Response(status=status.HTTP_204_NO_CONTENT)
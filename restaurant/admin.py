@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Restaurant, Menu, Table, Payment, Seats, SeatSlot, Gallery, Performance, Offer, DiningOffer, TableConfig, RestaurantStaffProfile, Server
+from .models import Restaurant, Menu, Table, Payment, Seats, SeatSlot, Gallery, Performance, Offer, DiningOffer, TableConfig, RestaurantStaffProfile, Server, DailyRestaurantStats, DailyMenuItemStats, OpeningWindow
 
 admin.site.register(Restaurant)
 admin.site.register(Menu)   
@@ -13,4 +13,7 @@ admin.site.register(Offer)
 admin.site.register(DiningOffer)
 admin.site.register(TableConfig)
 admin.site.register(RestaurantStaffProfile)
-admin.site.register(Server)
\ No newline at end of file
+admin.site.register(Server)
+admin.site.register(DailyRestaurantStats)
+admin.site.register(DailyMenuItemStats)
+admin.site.register(OpeningWindow)
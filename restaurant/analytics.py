@@ -0,0 +1,74 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import DailyRestaurantStats, DailyMenuItemStats
+from user_management.models import SeatBooking, Billing, MenuBooking
+
+# CompleteOrderView moves a paid bill from 'success' to 'paid'; both count as revenue.
+PAID_BILL_STATUSES = ('success', 'paid')
+
+
+def rollup_day(day):
+    """Rebuild every restaurant's rollup rows for `day` with three grouped queries."""
+    stats = {}
+
+    def row(restaurant_id):
+        return stats.setdefault(restaurant_id, DailyRestaurantStats(restaurant_id=restaurant_id, date=day))
+
+    for entry in SeatBooking.objects.filter(
+        seat_slot__date=day, payment_status='success'
+    ).values('restaurant_id').annotate(covers=Sum('number_of_guests'), bookings=Count('id')):
+        daily = row(entry['restaurant_id'])
+        daily.covers = entry['covers'] or 0
+        daily.seat_bookings = entry['bookings']
+
+    for entry in Billing.objects.filter(
+        created_at__date=day, payment_status__in=PAID_BILL_STATUSES
+    ).annotate(
+        restaurant_id=Coalesce('table__restaurant_id', 'booking__restaurant_id')
+    ).values('restaurant_id').annotate(revenue=Sum('total_menu_price'), bills=Count('id')):
+        if entry['restaurant_id'] is None:
+            continue
+        daily = row(entry['restaurant_id'])
+        daily.bills = entry['bills']
+        daily.revenue = entry['revenue'] or Decimal('0.00')
+        daily.average_bill = (daily.revenue / daily.bills).quantize(Decimal('0.01')) if daily.bills else Decimal('0.00')
+
+    # Only items on a paid bill, like revenue: a booking's bill, or the walk-in
+    # bill they are pinned to when it's completed.
+    menu_items = [
+        DailyMenuItemStats(
+            restaurant_id=entry['table__restaurant_id'],
+            date=day,
+            menu_id=entry['menu_id'],
+            menu_name=entry['menu__name'],
+            quantity=entry['quantity'] or 0,
+            revenue=entry['revenue'] or Decimal('0.00'),
+        )
+        for entry in MenuBooking.objects.filter(
+            Q(booking__billing__payment_status__in=PAID_BILL_STATUSES)
+            | Q(billing__payment_status__in=PAID_BILL_STATUSES),
+            created_at__date=day,
+        ).values(
+            'table__restaurant_id', 'menu_id', 'menu__name'
+        ).annotate(quantity=Sum('quantity'), revenue=Sum('line_total'))
+    ]
+
+    with transaction.atomic():
+        DailyRestaurantStats.objects.filter(date=day).delete()
+        DailyRestaurantStats.objects.bulk_create(stats.values(), batch_size=500)
+        DailyMenuItemStats.objects.filter(date=day).delete()
+        DailyMenuItemStats.objects.bulk_create(menu_items, batch_size=500)
+
+    return len(stats)
+
+
+def rollup_recent(days=2):
+    """Incremental run: today's partial day plus the previous `days - 1` days."""
+    today = timezone.localdate()
+    return sum(rollup_day(today - timedelta(days=offset)) for offset in range(days))
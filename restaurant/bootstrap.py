@@ -0,0 +1,92 @@
+import uuid
+
+from django.core.cache import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import ObjectDoesNotExist
+from django.db import transaction
+
+from .models import Restaurant
+from .serializers import (
+    RestaurantSerializer, MenuSerializer, TimingSerializer, SeatSerializer, PaymentSerializer,
+    OfferSerializer, DiningOfferSerializer, GallerySerializer, Performanceserializer, TableConfigSerializer,
+)
+
+BOOTSTRAP_CACHE_TIMEOUT = 60 * 60
+# A process-local cache never sees other workers' invalidations, so there the
+# version (and with it the payload and ETag) may only be trusted this long.
+LOCAL_VERSION_TIMEOUT = 60
+VERSION_KEY = 'restaurant-bootstrap:version:{}'
+PAYLOAD_KEY = 'restaurant-bootstrap:{}:{}'
+
+# Section name -> (related accessor on Restaurant, serializer). Shapes match the
+# standalone owner endpoints, so the app can feed its existing screens as-is.
+LIST_SECTIONS = {
+    'menu': ('menus', MenuSerializer),
+    'seats': ('seats', SeatSerializer),
+    'offers': ('offers', OfferSerializer),
+    'dining_offers': ('dining_offers', DiningOfferSerializer),
+    'gallery': ('albums', GallerySerializer),
+    'performances': ('performance', Performanceserializer),
+}
+SINGLE_SECTIONS = {
+    'timing': ('timing', TimingSerializer),
+    'payment': ('payment', PaymentSerializer),
+    'table_config': ('table_config', TableConfigSerializer),
+}
+
+
+def version_timeout():
+    """Versions live until invalidated in a shared cache, briefly in a per-process one."""
+    return LOCAL_VERSION_TIMEOUT if isinstance(caches['default'], LocMemCache) else None
+
+
+def get_version(restaurant_id):
+    """Opaque token that changes whenever any bootstrap section of the restaurant changes."""
+    key = VERSION_KEY.format(restaurant_id)
+    version = cache.get(key)
+    if version is None:
+        version = uuid.uuid4().hex
+        # Another request may have set one first; theirs wins so both agree.
+        if not cache.add(key, version, timeout=version_timeout()):
+            version = cache.get(key) or version
+    return version
+
+
+def invalidate(restaurant_id):
+    # After commit, so a reader can't cache pre-commit rows under the new version.
+    transaction.on_commit(lambda: cache.delete(VERSION_KEY.format(restaurant_id)))
+
+
+def load_restaurant(restaurant_id):
+    """One query for the restaurant and its one-to-one sections, one per list section."""
+    return (
+        Restaurant.objects
+        .select_related(*(accessor for accessor, _ in SINGLE_SECTIONS.values()))
+        .prefetch_related(*(accessor for accessor, _ in LIST_SECTIONS.values()))
+        .get(pk=restaurant_id)
+    )
+
+
+def build_payload(restaurant):
+    payload = {'restaurant': RestaurantSerializer(restaurant).data}
+    for name, (accessor, serializer_class) in LIST_SECTIONS.items():
+        payload[name] = serializer_class(getattr(restaurant, accessor).all(), many=True).data
+    for name, (accessor, serializer_class) in SINGLE_SECTIONS.items():
+        try:
+            payload[name] = serializer_class(getattr(restaurant, accessor)).data
+        except ObjectDoesNotExist:
+            payload[name] = None
+    # The payments endpoint has always answered with a list.
+    payload['payment'] = [payload['payment']] if payload['payment'] is not None else []
+    return payload
+
+
+def get_bootstrap(restaurant_id, version=None):
+    version = version or get_version(restaurant_id)
+    key = PAYLOAD_KEY.format(restaurant_id, version)
+    payload = cache.get(key)
+    if payload is None:
+        payload = build_payload(load_restaurant(restaurant_id))
+        payload['version'] = version
+        cache.set(key, payload, timeout=BOOTSTRAP_CACHE_TIMEOUT)
+    return payload
@@ -0,0 +1,108 @@
+from math import radians, sin, cos, sqrt, atan2
+
+from django.db.models import Case, Exists, ExpressionWrapper, F, FloatField, IntegerField, OuterRef, Q, Value, When
+from django.utils import timezone
+
+from .models import Restaurant, Offer
+
+DEFAULT_NEARBY_LIMIT = 50
+MAX_NEARBY_LIMIT = 200
+KM_PER_DEGREE = 111.045
+RADIUS_SLACK = 1.01
+
+
+def haversine(lat1, lon1, lat2, lon2):
+    R = 6371
+    lat1, lon1, lat2, lon2 = map(radians, [lat1, lon1, lat2, lon2])
+    dlat = lat2 - lat1
+    dlon = lon2 - lon1
+    a = sin(dlat/2)**2 + cos(lat1)*cos(lat2)*sin(dlon/2)**2
+    return R * 2 * atan2(sqrt(a), sqrt(1-a))
+
+
+def active_offer_exists(moment):
+    return Exists(Offer.objects.currently_applicable(moment).filter(restaurant=OuterRef('pk')))
+
+
+def nearby_restaurants(latitude, longitude, food_types=None, min_bill=None, max_bill=None,
+                       open_now=False, has_offer=False, radius_km=None, limit=DEFAULT_NEARBY_LIMIT, now=None):
+    """
+    Filter, order and limit in SQL, then run haversine only on the page that is returned.
+
+    Ordering uses an equirectangular approximation (monotonic with true distance at
+    city scale); restaurants without coordinates come last unless a radius is given.
+    A radius is applied as a bounding box plus the approximate circle in SQL and the
+    exact haversine while reading rows, so a full page is still `limit` long.
+    """
+    now = now or timezone.now()
+    queryset = Restaurant.objects.all()
+
+    if food_types:
+        queryset = queryset.filter(food_type__in=food_types)
+    if min_bill is not None:
+        queryset = queryset.filter(average_bill_for_two__gte=min_bill)
+    if max_bill is not None:
+        queryset = queryset.filter(average_bill_for_two__lte=max_bill)
+    if open_now:
+        queryset = queryset.open_at(now)
+    if has_offer:
+        queryset = queryset.filter(active_offer_exists(now))
+
+    lng_scale = cos(radians(latitude))
+    if radius_km is not None:
+        lat_delta = radius_km / KM_PER_DEGREE
+        lng_delta = radius_km / (KM_PER_DEGREE * max(lng_scale, 0.01))
+        queryset = queryset.filter(
+            latitude__range=(latitude - lat_delta, latitude + lat_delta),
+            longitude__range=(longitude - lng_delta, longitude + lng_delta),
+        )
+
+    queryset = queryset.annotate(
+        unlocated=Case(
+            When(Q(latitude__isnull=True) | Q(longitude__isnull=True), then=Value(1)),
+            default=Value(0), output_field=IntegerField(),
+        ),
+        approx_distance=ExpressionWrapper(
+            (F('latitude') - Value(latitude)) * (F('latitude') - Value(latitude))
+            + (F('longitude') - Value(longitude)) * (F('longitude') - Value(longitude)) * Value(lng_scale * lng_scale),
+            output_field=FloatField(),
+        ),
+    )
+    if radius_km is not None:
+        # Trims the box's corners; the slack keeps rows the approximation puts
+        # just outside, and haversine below has the final say.
+        queryset = queryset.filter(approx_distance__lte=(radius_km / KM_PER_DEGREE) ** 2 * RADIUS_SLACK)
+    queryset = queryset.order_by('unlocated', 'approx_distance', 'id').only(
+        'id', 'name', 'location', 'image', 'food_type', 'average_bill_for_two', 'map_link',
+        'latitude', 'longitude', 'rating_avg', 'rating_count',
+    )
+
+    rows = queryset.iterator(chunk_size=limit) if radius_km is not None else queryset[:limit]
+    results = []
+    for r in rows:
+        entry = {
+            "id": r.id,
+            "name": r.name,
+            "location": r.location,
+            "image": r.image.url if r.image else None,
+            "food_type": r.food_type,
+            "average_bill_for_two": r.average_bill_for_two,
+            "map_link": r.map_link,
+            "rating_avg": r.rating_avg,
+            "rating_count": r.rating_count,
+        }
+        if r.latitude is not None and r.longitude is not None:
+            distance = haversine(latitude, longitude, float(r.latitude), float(r.longitude))
+            if radius_km is not None and distance > radius_km:
+                continue
+            entry.update({
+                "distance_km": round(distance, 1),
+                "latitude": float(r.latitude),
+                "longitude": float(r.longitude),
+            })
+        else:
+            entry.update({"distance_km": None, "latitude": None, "longitude": None})
+        results.append(entry)
+        if len(results) == limit:
+            break
+    return results
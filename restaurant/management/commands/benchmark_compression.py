@@ -0,0 +1,72 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.utils.text import compress_string
+
+from config.middleware import CompressionMiddleware, DEFAULT_BROTLI_QUALITY, DEFAULT_MIN_SIZE, brotli
+
+DEFAULT_PATHS = (
+    '/user_management/restaurant_list/',
+    '/restaurant/menu/',
+    '/restaurant/table-orders/',
+    '/restaurant/seat-booking-list/',
+    '/restaurant/bootstrap/',
+    '/restaurant/table-orders/?export=ndjson',
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Fetch endpoints uncompressed with the given token, then report bytes on the wire '
+        'and compression CPU time for gzip (as CompressionMiddleware applies it) and Brotli.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--token', required=True, help='Auth token of the user to fetch as.')
+        parser.add_argument('--path', action='append', dest='paths', help='Endpoint to measure; repeatable.')
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, **options):
+        client = Client(HTTP_AUTHORIZATION=f"Token {options['token']}", HTTP_ACCEPT_ENCODING='identity')
+        quality = getattr(settings, 'COMPRESSION_BROTLI_QUALITY', DEFAULT_BROTLI_QUALITY)
+        min_size = getattr(settings, 'COMPRESSION_MIN_SIZE', DEFAULT_MIN_SIZE)
+        if brotli is None:
+            self.stdout.write(self.style.WARNING('brotli is not installed; only gzip is measured.'))
+
+        measured = 0
+        for path in options['paths'] or DEFAULT_PATHS:
+            response = client.get(path)
+            if response.status_code != 200:
+                self.stdout.write(f"{path}: skipped (HTTP {response.status_code})")
+                continue
+            body = b''.join(response.streaming_content) if response.streaming else response.content
+            measured += 1
+
+            applies = CompressionMiddleware.is_compressible(response) and (response.streaming or len(body) >= min_size)
+            line = f"{path}: {len(body)} B{'' if applies else ' (left uncompressed by the middleware)'}"
+
+            gzipped, seconds = self.best(lambda: compress_string(body, max_random_bytes=CompressionMiddleware.max_random_bytes), options['repeat'])
+            line += f", gzip {len(gzipped)} B ({self.ratio(gzipped, body)}) in {seconds * 1000:.2f}ms"
+            if brotli is not None:
+                compressed, seconds = self.best(lambda: brotli.compress(body, quality=quality), options['repeat'])
+                line += f", br q{quality} {len(compressed)} B ({self.ratio(compressed, body)}) in {seconds * 1000:.2f}ms"
+            self.stdout.write(line)
+
+        if not measured:
+            raise CommandError('No endpoint answered 200; check the token and paths.')
+
+    @staticmethod
+    def best(fn, repeat):
+        best, result = None, None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            result = fn()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return result, best
+
+    @staticmethod
+    def ratio(compressed, body):
+        return f"{len(compressed) / len(body):.0%}" if body else 'n/a'
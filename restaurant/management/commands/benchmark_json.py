@@ -0,0 +1,104 @@
+import io
+import json
+import random
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from config.parsers import FastJSONParser
+from config.renderers import FastJSONRenderer, orjson
+from restaurant.models import Restaurant
+from restaurant.serializers import RestaurantSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        'Time DRF JSONRenderer/JSONParser against the configured FastJSON classes on '
+        'payloads shaped like the restaurant list and table orders responses, and check '
+        'that both produce the same output.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000, help='Rows per payload.')
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, **options):
+        if orjson is None:
+            self.stdout.write(self.style.WARNING('orjson is not installed; FastJSON classes fall back to the stdlib.'))
+
+        rows, repeat = options['rows'], options['repeat']
+        payloads = {
+            'restaurant_list': self.restaurant_list(rows),
+            'table_orders': self.table_orders(rows),
+        }
+        for name, data in payloads.items():
+            expected = JSONRenderer().render(data)
+            rendered = FastJSONRenderer().render(data)
+            if rendered == expected:
+                match = 'identical'
+            elif json.loads(rendered) == json.loads(expected):
+                # e.g. floats in exponent form: 1e16 vs 1e+16
+                match = 'equivalent'
+            else:
+                match = 'DIFFERENT'
+
+            render_std = self.best(lambda: JSONRenderer().render(data), repeat)
+            render_fast = self.best(lambda: FastJSONRenderer().render(data), repeat)
+            parse_std = self.best(lambda: JSONParser().parse(io.BytesIO(expected)), repeat)
+            parse_fast = self.best(lambda: FastJSONParser().parse(io.BytesIO(expected)), repeat)
+
+            self.stdout.write(
+                f"{name} ({rows} rows, {len(expected) / 1024:.0f} KiB, output {match}): "
+                f"render {self.ms(render_std)} -> {self.ms(render_fast)} ({render_std / render_fast:.1f}x), "
+                f"parse {self.ms(parse_std)} -> {self.ms(parse_fast)} ({parse_std / parse_fast:.1f}x)"
+            )
+
+    def restaurant_list(self, rows):
+        restaurants = [
+            Restaurant(
+                id=i, name=f'Restaurant {i}', image=f'restaurants/r{i}.jpg', location='MG Road, Bengaluru',
+                map_link=f'https://maps.example.com/{i}', phone_number=f'98765{i:05d}', owner_name='Owner',
+                food_type='veg', average_bill_for_two=Decimal(random.randint(200, 3000)),
+                latitude=Decimal('12.971600'), longitude=Decimal('77.594600'),
+                rating_avg=round(random.uniform(1, 5), 2), rating_count=random.randint(0, 500),
+            )
+            for i in range(1, rows + 1)
+        ]
+        return RestaurantSerializer(restaurants, many=True).data
+
+    def table_orders(self, rows):
+        now = timezone.now()
+        orders = []
+        for i in range(rows):
+            items = [
+                {'menu_name': f'Dish {j}', 'qty': 2, 'price': Decimal('149.50'), 'total': Decimal('299.00')}
+                for j in range(5)
+            ]
+            orders.append({
+                'table_no': f'TBL-{i % 40:03d}',
+                'user': f'98{i:08d}',
+                'user_phone': f'98{i:08d}',
+                'created_at': (now - timedelta(minutes=i)).strftime('%Y-%m-%d %H:%M:%S'),
+                'special_request': 'Less spicy, no onions — thanks',
+                'menu': items,
+                'total_bill': sum(item['total'] for item in items),
+            })
+        return orders
+
+    @staticmethod
+    def best(fn, repeat):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            fn()
+            timings.append(time.perf_counter() - started)
+        return min(timings)
+
+    @staticmethod
+    def ms(seconds):
+        return f"{seconds * 1000:.1f}ms"
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from restaurant.search import get_search_backend
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the menu/restaurant full-text search index from the database'
+
+    def handle(self, *args, **options):
+        count = get_search_backend().rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Indexed {count} documents."))
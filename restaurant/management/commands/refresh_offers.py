@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from restaurant.models import Offer
+
+
+class Command(BaseCommand):
+    help = 'Activate offers inside their validity window and deactivate the rest'
+
+    def handle(self, *args, **options):
+        activated, deactivated = Offer.objects.refresh_activity()
+        self.stdout.write(self.style.SUCCESS(f"{activated} offers activated, {deactivated} deactivated."))
@@ -0,0 +1,27 @@
+from datetime import date, timedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from restaurant.analytics import rollup_day
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the per-restaurant daily analytics rollups (default: today and yesterday)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=2, help='Number of days back from today to rebuild.')
+        parser.add_argument('--date', help='Rebuild a single day (YYYY-MM-DD) instead.')
+
+    def handle(self, *args, **options):
+        if options['date']:
+            try:
+                days = [date.fromisoformat(options['date'])]
+            except ValueError:
+                raise CommandError("--date must be in YYYY-MM-DD format.")
+        else:
+            today = timezone.localdate()
+            days = [today - timedelta(days=offset) for offset in range(options['days'])]
+
+        for day in days:
+            count = rollup_day(day)
+            self.stdout.write(f"{day}: {count} restaurants rolled up.")
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt analytics for {len(days)} day(s)."))
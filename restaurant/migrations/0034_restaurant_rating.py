@@ -0,0 +1,29 @@
+# Generated by Django 5.1.7 on 2026-10-19 13:13
+
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('restaurant', '0033_restaurant_latitude_restaurant_longitude'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='restaurant',
+            name='rating_avg',
+            field=models.DecimalField(db_index=True, decimal_places=2, default=Decimal('0.00'), max_digits=3),
+        ),
+        migrations.AddField(
+            model_name='restaurant',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='restaurant',
+            name='rating_total',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
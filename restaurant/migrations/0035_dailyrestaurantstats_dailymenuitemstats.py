@@ -0,0 +1,49 @@
+# Generated by Django 5.1.7 on 2026-10-19 13:19
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('restaurant', '0034_restaurant_rating'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyMenuItemStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('menu_name', models.CharField(max_length=255)),
+                ('quantity', models.PositiveIntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('menu', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='daily_stats', to='restaurant.menu')),
+                ('restaurant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_menu_stats', to='restaurant.restaurant')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['restaurant', 'date'], name='restaurant__restaur_0a90f0_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyRestaurantStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('covers', models.PositiveIntegerField(default=0)),
+                ('seat_bookings', models.PositiveIntegerField(default=0)),
+                ('bills', models.PositiveIntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('average_bill', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('restaurant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='restaurant.restaurant')),
+            ],
+            options={
+                'unique_together': {('restaurant', 'date')},
+            },
+        ),
+    ]
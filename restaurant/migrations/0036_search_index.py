@@ -0,0 +1,40 @@
+from django.db import migrations
+
+# rowid = object id * 2 + kind (0 = menu, 1 = restaurant); see restaurant/search.py.
+CREATE_SQL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS restaurant_search_index "
+    "USING fts5(title, body, tags, tokenize='unicode61 remove_diacritics 2')"
+)
+POPULATE_SQL = [
+    "INSERT INTO restaurant_search_index (rowid, title, body, tags) "
+    "SELECT m.id * 2, m.name, m.description, trim(r.name || ' ' || coalesce(r.food_type, '')) "
+    "FROM restaurant_menu m JOIN restaurant_restaurant r ON r.id = m.restaurant_id",
+    "INSERT INTO restaurant_search_index (rowid, title, body, tags) "
+    "SELECT id * 2 + 1, name, location, coalesce(food_type, '') FROM restaurant_restaurant",
+]
+
+
+def create_search_index(apps, schema_editor):
+    # Other databases use the icontains fallback backend and need no table.
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(CREATE_SQL)
+    for sql in POPULATE_SQL:
+        schema_editor.execute(sql)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute("DROP TABLE IF EXISTS restaurant_search_index")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('restaurant', '0035_dailyrestaurantstats_dailymenuitemstats'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.1.7 on 2026-10-19 13:22
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('restaurant', '0036_search_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='offer',
+            index=models.Index(fields=['restaurant', 'is_active', 'valid_until'], name='restaurant__restaur_56a9d0_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='restaurant',
+            index=models.Index(fields=['food_type'], name='restaurant__food_ty_eb47e6_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='restaurant',
+            index=models.Index(fields=['average_bill_for_two'], name='restaurant__average_575e72_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='restaurant',
+            index=models.Index(fields=['latitude', 'longitude'], name='restaurant__latitud_d4c14e_idx'),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.1.7 on 2026-10-19 13:23
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+
+
+def backfill_opening_windows(apps, schema_editor):
+    # Mirrors Timing.weekly_windows(); historical models don't carry custom methods.
+    Timing = apps.get_model('restaurant', 'Timing')
+    OpeningWindow = apps.get_model('restaurant', 'OpeningWindow')
+
+    windows = []
+    for timing in Timing.objects.all().iterator():
+        open_minute = timing.open_time.hour * 60 + timing.open_time.minute
+        close_minute = timing.close_time.hour * 60 + timing.close_time.minute
+        length = (close_minute - open_minute) % MINUTES_PER_DAY or MINUTES_PER_DAY
+        for day in range(7):
+            start = day * MINUTES_PER_DAY + open_minute
+            end = start + length
+            if end > MINUTES_PER_WEEK:
+                windows.append(OpeningWindow(restaurant_id=timing.restaurant_id, start_minute=start, end_minute=MINUTES_PER_WEEK))
+                windows.append(OpeningWindow(restaurant_id=timing.restaurant_id, start_minute=0, end_minute=end - MINUTES_PER_WEEK))
+            else:
+                windows.append(OpeningWindow(restaurant_id=timing.restaurant_id, start_minute=start, end_minute=end))
+    OpeningWindow.objects.bulk_create(windows, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('restaurant', '0037_discovery_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OpeningWindow',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('start_minute', models.PositiveIntegerField()),
+                ('end_minute', models.PositiveIntegerField()),
+                ('restaurant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='opening_windows', to='restaurant.restaurant')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['start_minute', 'end_minute'], name='restaurant__start_m_e20b9c_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_opening_windows, migrations.RunPython.noop),
+    ]
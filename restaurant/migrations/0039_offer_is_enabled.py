@@ -0,0 +1,18 @@
+# Generated by Django 5.1.7 on 2026-10-19 14:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('restaurant', '0038_openingwindow'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='offer',
+            name='is_enabled',
+            field=models.BooleanField(default=True),
+        ),
+    ]
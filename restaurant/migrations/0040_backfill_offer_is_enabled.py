@@ -0,0 +1,26 @@
+from django.db import migrations
+
+
+def copy_is_active(apps, schema_editor):
+    """
+    Until 0039 the owner's switch was is_active itself. An offer that is off now
+    may have been switched off by its owner, so it stays off until re-enabled.
+    """
+    Offer = apps.get_model('restaurant', 'Offer')
+    Offer.objects.filter(is_active=False).update(is_enabled=False)
+
+
+def restore_is_active(apps, schema_editor):
+    Offer = apps.get_model('restaurant', 'Offer')
+    Offer.objects.filter(is_enabled=False).update(is_active=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('restaurant', '0039_offer_is_enabled'),
+    ]
+
+    operations = [
+        migrations.RunPython(copy_is_active, restore_is_active),
+    ]
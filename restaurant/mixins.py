@@ -0,0 +1,233 @@
+import hashlib
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Count, Max
+from django.utils.http import parse_etags, quote_etag
+from rest_framework import serializers, status
+from rest_framework.relations import ManyRelatedField, PrimaryKeyRelatedField, RelatedField
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+
+class ConditionalListMixin:
+    """
+    Adds ETag / If-None-Match support to list endpoints.
+
+    The fingerprint is a single aggregate query (row count + newest updated_at),
+    so unchanged lists answer with 304 without serializing anything.
+    """
+    etag_timestamp_field = 'updated_at'
+
+    def get_list_etag(self, request, queryset):
+        fingerprint = queryset.order_by().aggregate(
+            last_modified=Max(self.etag_timestamp_field),
+            count=Count('pk'),
+        )
+        last_modified = fingerprint['last_modified']
+        raw = "|".join([
+            request.get_full_path(),
+            str(fingerprint['count']),
+            last_modified.isoformat() if last_modified else '',
+        ])
+        return quote_etag(hashlib.md5(raw.encode('utf-8'), usedforsecurity=False).hexdigest())
+
+    def conditional_list_response(self, request, queryset, build_data, status_code=status.HTTP_200_OK):
+        return self.conditional_response(request, self.get_list_etag(request, queryset), build_data, status_code)
+
+    def conditional_response(self, request, etag, build_data, status_code=status.HTTP_200_OK):
+        """304 if the client already holds `etag`; otherwise build_data() with the ETag set."""
+        if_none_match = request.headers.get('If-None-Match')
+        if if_none_match:
+            # Weak comparison: a W/ prefix added by a proxy or middleware still matches.
+            etags = [e[2:] if e.startswith('W/') else e for e in parse_etags(if_none_match)]
+            if '*' in etags or etag in etags:
+                return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+
+        return Response(build_data(), status=status_code, headers={'ETag': etag})
+
+
+class QuerysetOptimizerMixin:
+    """
+    List views declare the relations their serializers (or hand-built rows) read,
+    so a page costs the same number of queries whatever its length.
+    """
+    list_select_related = ()
+    list_prefetch_related = ()
+
+    def optimize_queryset(self, queryset):
+        if self.list_select_related:
+            queryset = queryset.select_related(*self.list_select_related)
+        if self.list_prefetch_related:
+            queryset = queryset.prefetch_related(*self.list_prefetch_related)
+        return queryset
+
+
+FIELDS_PARAM = 'fields'
+
+
+def requested_fields(request):
+    """Field names from `?fields=a,b`, or None when the client wants everything."""
+    raw = request.query_params.get(FIELDS_PARAM, '')
+    fields = [name.strip() for name in raw.split(',') if name.strip()]
+    return fields or None
+
+
+class SparseFieldsetMixin:
+    """
+    Serializers accept `fields=[...]` and drop every other field from their output.
+    Unknown names are ignored; if none are known, all fields are kept.
+
+    `narrow(queryset, fields)` defers the columns those fields don't read. Fields
+    the model can't account for (SerializerMethodField, properties) disable
+    narrowing unless `sparse_sources` lists the model fields they read.
+    """
+    sparse_sources = {}
+
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop('fields', None)
+        super().__init__(*args, **kwargs)
+        if fields:
+            keep = set(fields) & set(self.fields)
+            if keep:
+                for name in list(self.fields):
+                    if name not in keep:
+                        self.fields.pop(name)
+
+    @classmethod
+    def narrow(cls, queryset, fields):
+        if not fields:
+            return queryset
+        opts = queryset.model._meta
+        columns = {opts.pk.name}
+        for name, field in cls(fields=fields).fields.items():
+            if field.write_only:
+                continue
+            if name in cls.sparse_sources:
+                sources = cls.sparse_sources[name]
+            elif field.source == '*':
+                return queryset
+            else:
+                sources = [field.source_attrs[0]]
+            for source in sources:
+                try:
+                    model_field = opts.get_field(source)
+                except FieldDoesNotExist:
+                    return queryset
+                if model_field.concrete and not model_field.many_to_many:
+                    columns.add(model_field.name)
+
+        # Relations the queryset joins or prefetches through must stay loaded.
+        select_related = queryset.query.select_related
+        if select_related is True:
+            return queryset
+        if select_related:
+            columns.update(select_related)
+        for lookup in queryset._prefetch_related_lookups:
+            head = getattr(lookup, 'prefetch_through', lookup).split('__')[0]
+            try:
+                model_field = opts.get_field(head)
+            except FieldDoesNotExist:
+                continue
+            if model_field.concrete and not model_field.many_to_many:
+                columns.add(model_field.name)
+        return queryset.only(*columns)
+
+
+# Keyed by serializer and the subset of its fields requested, so the number of
+# entries is bounded by the serializers, not by what clients put in ?fields=.
+_VALUES_PLANS = {}
+_FIELD_NAMES = {}
+
+
+class ValuesFastPathMixin(SparseFieldsetMixin):
+    """
+    Read-only lists can skip model instances entirely: `values_data(queryset, fields)`
+    fetches one tuple per row and runs each field's own to_representation on it, so
+    the JSON is the same as `Serializer(queryset, many=True).data`.
+
+    The per-field mapping is compiled once per serializer and fieldset. Serializers
+    it can't reproduce exactly (method fields, nested serializers, overridden
+    to_representation, sources through nullable relations) use the regular path.
+    """
+
+    @classmethod
+    def values_data(cls, queryset, fields=None):
+        plan = cls.values_plan(fields)
+        if plan is None:
+            return cls(queryset, many=True, fields=fields).data
+        names, paths, converters = plan
+        return [
+            {
+                name: value if value is None or convert is None else convert(value)
+                for name, convert, value in zip(names, converters, row)
+            }
+            for row in queryset.values_list(*paths)
+        ]
+
+    @classmethod
+    def values_plan(cls, fields=None):
+        if cls not in _FIELD_NAMES:
+            _FIELD_NAMES[cls] = frozenset(cls().fields)
+        # Unknown names are ignored and order doesn't matter, as in __init__.
+        fields = _FIELD_NAMES[cls].intersection(fields or ()) or None
+        key = (cls, fields)
+        if key not in _VALUES_PLANS:
+            _VALUES_PLANS[key] = cls._compile_values_plan(fields)
+        return _VALUES_PLANS[key]
+
+    @classmethod
+    def _compile_values_plan(cls, fields):
+        if cls.to_representation is not serializers.Serializer.to_representation:
+            return None
+        model = cls.Meta.model
+        names, paths, converters = [], [], []
+        for name, field in cls(fields=fields).fields.items():
+            if field.write_only:
+                continue
+            if isinstance(field, (serializers.SerializerMethodField, serializers.BaseSerializer,
+                                  serializers.HiddenField, ManyRelatedField)) or field.source == '*':
+                return None
+            model_field = _resolve_source(model, field.source_attrs)
+            if model_field is None:
+                return None
+
+            if isinstance(field, RelatedField):
+                if not isinstance(field, PrimaryKeyRelatedField) or field.pk_field is not None:
+                    return None
+                convert = None  # values() already yields the pk
+            elif isinstance(field, serializers.FileField):
+                convert = _file_converter(model_field.storage, getattr(field, 'use_url', api_settings.UPLOADED_FILES_USE_URL))
+            else:
+                convert = field.to_representation
+
+            names.append(name)
+            paths.append('__'.join(field.source_attrs))
+            converters.append(convert)
+        return names, paths, converters
+
+
+def _resolve_source(model, attrs):
+    """The model field at the end of `attrs`, or None if values() can't fetch it faithfully."""
+    for attr in attrs[:-1]:
+        try:
+            field = model._meta.get_field(attr)
+        except FieldDoesNotExist:
+            return None
+        # A null relation would make DRF skip the key, where values() gives None.
+        if not (field.many_to_one or field.one_to_one) or not field.concrete or field.null:
+            return None
+        model = field.related_model
+    try:
+        field = model._meta.get_field(attrs[-1])
+    except FieldDoesNotExist:
+        return None
+    if not field.concrete or field.many_to_many:
+        return None
+    return field
+
+
+def _file_converter(storage, use_url):
+    # Mirrors FileField.to_representation without a request in the context.
+    if use_url:
+        return lambda name: storage.url(name) if name else None
+    return lambda name: name or None
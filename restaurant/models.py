@@ -1,7 +1,31 @@
-from django.db import models
+from django.db import models, transaction
+from decimal import Decimal
 from datetime import date, datetime
 from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
+from django.dispatch import Signal
+from django.utils import timezone
+
+
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+
+# Sent with `restaurant_ids` after bulk offer updates, which bypass post_save.
+offers_refreshed = Signal()
+
+
+def minute_of_week(moment):
+    """Monday 00:00 is minute 0; `moment` is expected in local time."""
+    return moment.weekday() * MINUTES_PER_DAY + moment.hour * 60 + moment.minute
+
+
+class RestaurantQuerySet(models.QuerySet):
+    def open_at(self, moment):
+        """Restaurants with an opening window covering `moment` (a single range predicate)."""
+        minute = minute_of_week(timezone.localtime(moment))
+        return self.filter(models.Exists(OpeningWindow.objects.filter(
+            restaurant=models.OuterRef('pk'), start_minute__lte=minute, end_minute__gt=minute,
+        )))
 
 
 class Restaurant(models.Model):
@@ -16,12 +40,50 @@ class Restaurant(models.Model):
     owner_name = models.CharField(max_length=255)
     food_type = models.CharField(max_length=255, blank=True, null=True) 
     average_bill_for_two = models.DecimalField(max_digits=10, decimal_places=2, blank=True, null=True)
+    # Maintained from Review create/delete so lists can sort by rating without aggregating reviews.
+    rating_avg = models.DecimalField(max_digits=3, decimal_places=2, default=Decimal('0.00'), db_index=True)
+    rating_count = models.PositiveIntegerField(default=0)
+    rating_total = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = RestaurantQuerySet.as_manager()
+
+    class Meta:
+        # Discovery filters and the nearby bounding box.
+        indexes = [
+            models.Index(fields=['food_type']),
+            models.Index(fields=['average_bill_for_two']),
+            models.Index(fields=['latitude', 'longitude']),
+        ]
+
     def __str__(self):
         return self.name
 
+    def set_rating(self, total, count):
+        self.rating_total = max(total, 0)
+        self.rating_count = max(count, 0)
+        if self.rating_count:
+            self.rating_avg = (Decimal(self.rating_total) / self.rating_count).quantize(Decimal('0.01'))
+        else:
+            self.rating_avg = Decimal('0.00')
+
+    @classmethod
+    def apply_review(cls, restaurant_id, stars, removed=False):
+        """Fold a created (or removed) review into the stored rating under a row lock."""
+        with transaction.atomic():
+            restaurant = cls.objects.select_for_update().only(
+                'id', 'rating_avg', 'rating_count', 'rating_total'
+            ).filter(pk=restaurant_id).first()
+            if restaurant is None:
+                return None
+            if removed:
+                restaurant.set_rating(restaurant.rating_total - stars, restaurant.rating_count - 1)
+            else:
+                restaurant.set_rating(restaurant.rating_total + stars, restaurant.rating_count + 1)
+            restaurant.save(update_fields=['rating_avg', 'rating_count', 'rating_total'])
+        return restaurant
+
 
 class RestaurantStaffProfile(models.Model):
     ROLE_CHOICES = [
@@ -113,6 +175,53 @@ class Timing(models.Model):
     def __str__(self):
         return f"{self.restaurant.name} opens at {self.open_time} and closes at {self.close_time}"
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        OpeningWindow.rebuild_for(self)
+
+    def weekly_windows(self):
+        """
+        (start, end) minute-of-week ranges, end exclusive. A close time at or before the
+        open time means the restaurant closes after midnight; a window running past
+        Sunday midnight is split so every range stays inside the week.
+        """
+        open_minute = self.open_time.hour * 60 + self.open_time.minute
+        close_minute = self.close_time.hour * 60 + self.close_time.minute
+        length = (close_minute - open_minute) % MINUTES_PER_DAY or MINUTES_PER_DAY
+
+        windows = []
+        for day in range(7):
+            start = day * MINUTES_PER_DAY + open_minute
+            end = start + length
+            if end > MINUTES_PER_WEEK:
+                windows.append((start, MINUTES_PER_WEEK))
+                windows.append((0, end - MINUTES_PER_WEEK))
+            else:
+                windows.append((start, end))
+        return windows
+
+
+class OpeningWindow(models.Model):
+    """Precomputed from Timing so "open at T" is an indexed range lookup."""
+    restaurant = models.ForeignKey(Restaurant, on_delete=models.CASCADE, related_name='opening_windows')
+    start_minute = models.PositiveIntegerField()
+    end_minute = models.PositiveIntegerField()
+
+    class Meta:
+        indexes = [models.Index(fields=['start_minute', 'end_minute'])]
+
+    def __str__(self):
+        return f"{self.restaurant_id}: {self.start_minute}-{self.end_minute}"
+
+    @classmethod
+    def rebuild_for(cls, timing):
+        with transaction.atomic():
+            cls.objects.filter(restaurant_id=timing.restaurant_id).delete()
+            cls.objects.bulk_create([
+                cls(restaurant_id=timing.restaurant_id, start_minute=start, end_minute=end)
+                for start, end in timing.weekly_windows()
+            ])
+
 
 class Seats(models.Model):
     restaurant = models.ForeignKey(Restaurant, on_delete=models.CASCADE, related_name='seats')
@@ -172,6 +281,48 @@ class Performance(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
 
 
+class OfferQuerySet(models.QuerySet):
+    @staticmethod
+    def window_q(now):
+        """Offers whose date range includes today and whose daily time window includes now."""
+        local = timezone.localtime(now)
+        today, current_time = local.date(), local.time()
+
+        # A start_time after end_time is an overnight window (e.g. 22:00-02:00).
+        daily = (
+            models.Q(start_time__isnull=True, end_time__isnull=True)
+            | models.Q(start_time__isnull=True, end_time__gt=current_time)
+            | models.Q(end_time__isnull=True, start_time__lte=current_time)
+            | (models.Q(start_time__lte=models.F('end_time'))
+               & models.Q(start_time__lte=current_time, end_time__gt=current_time))
+            | (models.Q(start_time__gt=models.F('end_time'))
+               & (models.Q(start_time__lte=current_time) | models.Q(end_time__gt=current_time)))
+        )
+        return models.Q(valid_from__lte=today, valid_until__gte=today) & daily
+
+    def currently_applicable(self, now=None):
+        """
+        Offers that may be applied right now: enabled by the owner, inside the
+        window, and with the scheduler-maintained is_active flag set, so an offer
+        that expired since the last refresh is never honoured.
+        """
+        return self.filter(self.window_q(now or timezone.now()), is_active=True, is_enabled=True)
+
+    def refresh_activity(self, now=None):
+        """Set is_active from the schedule with two set-based UPDATEs; returns (activated, deactivated)."""
+        now = now or timezone.now()
+        window = self.window_q(now)
+        to_activate = self.filter(window, is_active=False)
+        to_deactivate = self.filter(is_active=True).exclude(window)
+        restaurant_ids = set(to_activate.values_list('restaurant_id', flat=True))
+        restaurant_ids.update(to_deactivate.values_list('restaurant_id', flat=True))
+        activated = to_activate.update(is_active=True, updated_at=now)
+        deactivated = to_deactivate.update(is_active=False, updated_at=now)
+        if restaurant_ids:
+            offers_refreshed.send(sender=self.model, restaurant_ids=restaurant_ids)
+        return activated, deactivated
+
+
 class Offer(models.Model):
     restaurant = models.ForeignKey(Restaurant, on_delete=models.CASCADE, related_name='offers')
     title = models.CharField(max_length=255)
@@ -181,31 +332,20 @@ class Offer(models.Model):
     valid_until = models.DateField()
     start_time = models.TimeField(null=True, blank=True)  
     end_time = models.TimeField(null=True, blank=True)    
+    # The owner's on/off switch; the scheduler never touches it.
+    is_enabled = models.BooleanField(default=True)
+    # Maintained by OfferQuerySet.refresh_activity() on a schedule; read-only in the API.
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
-    def __str__(self):
-        return f"{self.title} - {self.discount_percentage}%"
-
-    def save(self, *args, **kwargs):
-        self.check_validity()
-        super().save(*args, **kwargs)
-
-    def check_validity(self):
-        now = datetime.now()
-        today = now.date()
-        current_time = now.time()
+    objects = OfferQuerySet.as_manager()
 
-        # Expired by date
-        if self.valid_until < today:
-            self.is_active = False
-            return
+    class Meta:
+        indexes = [models.Index(fields=['restaurant', 'is_active', 'valid_until'])]
 
-        # Expired today but passed end_time
-        if self.valid_until == today:
-            if self.end_time and current_time > self.end_time:
-                self.is_active = False
+    def __str__(self):
+        return f"{self.title} - {self.discount_percentage}%"
 
 
 class DiningOffer(models.Model):
@@ -220,5 +360,36 @@ class DiningOffer(models.Model):
         return f"{self.title} - ₹{self.amount}"
 
 
+class DailyRestaurantStats(models.Model):
+    restaurant = models.ForeignKey(Restaurant, on_delete=models.CASCADE, related_name='daily_stats')
+    date = models.DateField()
+    covers = models.PositiveIntegerField(default=0)
+    seat_bookings = models.PositiveIntegerField(default=0)
+    bills = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    average_bill = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('restaurant', 'date')
+
+    def __str__(self):
+        return f"{self.restaurant.name} stats for {self.date}"
 
 
+class DailyMenuItemStats(models.Model):
+    restaurant = models.ForeignKey(Restaurant, on_delete=models.CASCADE, related_name='daily_menu_stats')
+    date = models.DateField()
+    menu = models.ForeignKey(Menu, on_delete=models.SET_NULL, null=True, blank=True, related_name='daily_stats')
+    menu_name = models.CharField(max_length=255)
+    quantity = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['restaurant', 'date'])]
+
+    def __str__(self):
+        return f"{self.menu_name} x {self.quantity} on {self.date}"
@@ -0,0 +1,208 @@
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Case, IntegerField, Q, Value, When
+from django.utils.module_loading import import_string
+
+from .models import Menu, Restaurant
+
+SEARCH_TABLE = 'restaurant_search_index'
+SEARCH_KINDS = {'menu': 0, 'restaurant': 1}
+RESTAURANT_SEARCH_FIELDS = {'name', 'location', 'food_type'}
+DEFAULT_SEARCH_LIMIT = 20
+MAX_SEARCH_LIMIT = 100
+
+# Column weights for bm25(): a hit in the name outranks the description, which outranks tags.
+TITLE_WEIGHT, BODY_WEIGHT, TAGS_WEIGHT = 10.0, 2.0, 1.0
+
+_TERM_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def search_terms(query):
+    return _TERM_RE.findall(query or '')
+
+
+def _rowid(kind, object_id):
+    # One FTS table holds both kinds; the low bit of the rowid tells them apart.
+    return object_id * 2 + SEARCH_KINDS[kind]
+
+
+def menu_document(menu):
+    restaurant = menu.restaurant
+    return menu.name, menu.description, " ".join(filter(None, [restaurant.name, restaurant.food_type]))
+
+
+def restaurant_document(restaurant):
+    return restaurant.name, restaurant.location, restaurant.food_type or ''
+
+
+class BasicSearchBackend:
+    """
+    Fallback for databases without a full-text index: icontains, names starting
+    with the first term first. Menus and restaurants are merged on that score, so
+    a limited untyped query keeps the best hits of both.
+    """
+
+    def index_menu(self, menu):
+        pass
+
+    def index_restaurant(self, restaurant):
+        pass
+
+    def remove(self, kind, object_id):
+        pass
+
+    def rebuild(self):
+        return 0
+
+    def _match(self, queryset, terms, fields):
+        for term in terms:
+            condition = Q()
+            for field in fields:
+                condition |= Q(**{f'{field}__icontains': term})
+            queryset = queryset.filter(condition)
+        return queryset.annotate(
+            name_hit=Case(When(name__istartswith=terms[0], then=Value(1)), default=Value(0), output_field=IntegerField())
+        ).order_by('-name_hit', 'name')
+
+    def search(self, query, kind=None, limit=DEFAULT_SEARCH_LIMIT):
+        terms = search_terms(query)
+        if not terms:
+            return []
+
+        # Each kind's top `limit` is all the merged page can need from it.
+        ranked = []
+        if kind in (None, 'menu'):
+            menus = self._match(Menu.objects.all(), terms, ['name', 'description', 'restaurant__name', 'restaurant__food_type'])
+            ranked += [(name_hit, name, 'menu', pk) for pk, name_hit, name in menus.values_list('pk', 'name_hit', 'name')[:limit]]
+        if kind in (None, 'restaurant'):
+            restaurants = self._match(Restaurant.objects.all(), terms, ['name', 'location', 'food_type'])
+            ranked += [(name_hit, name, 'restaurant', pk) for pk, name_hit, name in restaurants.values_list('pk', 'name_hit', 'name')[:limit]]
+        ranked.sort(key=lambda hit: (-hit[0], hit[1].lower()))
+        return [(hit_kind, pk, float(name_hit)) for name_hit, _, hit_kind, pk in ranked[:limit]]
+
+
+class SQLiteFTSSearchBackend:
+    """
+    SQLite FTS5 index over menu and restaurant text. Queries are prefix matches on
+    every term ("dos" finds "Dosa") ranked by bm25, so no LIKE '%...%' scans.
+    """
+
+    def _write(self, kind, object_id, document):
+        rowid = _rowid(kind, object_id)
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {SEARCH_TABLE} WHERE rowid = %s", [rowid])
+            cursor.execute(
+                f"INSERT INTO {SEARCH_TABLE} (rowid, title, body, tags) VALUES (%s, %s, %s, %s)",
+                [rowid, *document],
+            )
+
+    def index_menu(self, menu):
+        self._write('menu', menu.pk, menu_document(menu))
+
+    def index_restaurant(self, restaurant):
+        self._write('restaurant', restaurant.pk, restaurant_document(restaurant))
+        # Menu rows carry the restaurant name and food type as tags.
+        for menu in restaurant.menus.all():
+            menu.restaurant = restaurant
+            self.index_menu(menu)
+
+    def remove(self, kind, object_id):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {SEARCH_TABLE} WHERE rowid = %s", [_rowid(kind, object_id)])
+
+    def rebuild(self):
+        with connection.cursor() as cursor:
+            cursor.execute(CREATE_SEARCH_TABLE_SQL)
+            cursor.execute(f"DELETE FROM {SEARCH_TABLE}")
+            cursor.execute(REBUILD_MENUS_SQL)
+            cursor.execute(REBUILD_RESTAURANTS_SQL)
+            cursor.execute(f"SELECT count(*) FROM {SEARCH_TABLE}")
+            return cursor.fetchone()[0]
+
+    def search(self, query, kind=None, limit=DEFAULT_SEARCH_LIMIT):
+        terms = search_terms(query)
+        if not terms:
+            return []
+
+        match = " ".join(f'"{term}"*' for term in terms)
+        sql = (
+            f"SELECT rowid, bm25({SEARCH_TABLE}, %s, %s, %s) AS score FROM {SEARCH_TABLE} "
+            f"WHERE {SEARCH_TABLE} MATCH %s"
+        )
+        params = [TITLE_WEIGHT, BODY_WEIGHT, TAGS_WEIGHT, match]
+        if kind is not None:
+            sql += " AND rowid %% 2 = %s"
+            params.append(SEARCH_KINDS[kind])
+        sql += " ORDER BY score LIMIT %s"
+        params.append(limit)
+
+        kinds = {code: name for name, code in SEARCH_KINDS.items()}
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return [(kinds[rowid % 2], rowid // 2, score) for rowid, score in cursor.fetchall()]
+
+
+CREATE_SEARCH_TABLE_SQL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} "
+    f"USING fts5(title, body, tags, tokenize='unicode61 remove_diacritics 2')"
+)
+REBUILD_MENUS_SQL = (
+    f"INSERT INTO {SEARCH_TABLE} (rowid, title, body, tags) "
+    f"SELECT m.id * 2 + {SEARCH_KINDS['menu']}, m.name, m.description, trim(r.name || ' ' || coalesce(r.food_type, '')) "
+    f"FROM restaurant_menu m JOIN restaurant_restaurant r ON r.id = m.restaurant_id"
+)
+REBUILD_RESTAURANTS_SQL = (
+    f"INSERT INTO {SEARCH_TABLE} (rowid, title, body, tags) "
+    f"SELECT id * 2 + {SEARCH_KINDS['restaurant']}, name, location, coalesce(food_type, '') "
+    f"FROM restaurant_restaurant"
+)
+
+
+def get_search_backend():
+    path = getattr(settings, 'SEARCH_BACKEND', None)
+    if path:
+        return import_string(path)()
+    if connection.vendor == 'sqlite':
+        return SQLiteFTSSearchBackend()
+    return BasicSearchBackend()
+
+
+def search(query, kind=None, limit=DEFAULT_SEARCH_LIMIT):
+    """Run the query and hydrate hits into response rows, in rank order (two queries at most)."""
+    hits = get_search_backend().search(query, kind=kind, limit=limit)
+
+    menu_ids = [object_id for hit_kind, object_id, _ in hits if hit_kind == 'menu']
+    restaurant_ids = [object_id for hit_kind, object_id, _ in hits if hit_kind == 'restaurant']
+    menus = Menu.objects.select_related('restaurant').in_bulk(menu_ids) if menu_ids else {}
+    restaurants = Restaurant.objects.in_bulk(restaurant_ids) if restaurant_ids else {}
+
+    results = []
+    for hit_kind, object_id, score in hits:
+        if hit_kind == 'menu' and object_id in menus:
+            menu = menus[object_id]
+            results.append({
+                "type": "menu",
+                "id": menu.id,
+                "name": menu.name,
+                "description": menu.description,
+                "price": str(menu.price),
+                "image": menu.image.url if menu.image else None,
+                "restaurant_id": menu.restaurant_id,
+                "restaurant_name": menu.restaurant.name,
+                "score": round(abs(score), 6),
+            })
+        elif hit_kind == 'restaurant' and object_id in restaurants:
+            restaurant = restaurants[object_id]
+            results.append({
+                "type": "restaurant",
+                "id": restaurant.id,
+                "name": restaurant.name,
+                "location": restaurant.location,
+                "food_type": restaurant.food_type,
+                "image": restaurant.image.url if restaurant.image else None,
+                "rating_avg": str(restaurant.rating_avg),
+                "score": round(abs(score), 6),
+            })
+    return results
@@ -1,15 +1,17 @@
 import re
 from rest_framework import serializers
 from django.contrib.auth.models import User
-from .models import Restaurant, Menu, Table, Payment, Timing, Seats, SeatSlot, Gallery, Performance, Offer, DiningOffer, TableConfig, RestaurantStaffProfile, Server
+from .mixins import SparseFieldsetMixin, ValuesFastPathMixin
+from .models import Restaurant, Menu, Table, Payment, Timing, Seats, SeatSlot, Gallery, Performance, Offer, DiningOffer, TableConfig, RestaurantStaffProfile, Server, DailyRestaurantStats
 
-class RestaurantSerializer(serializers.ModelSerializer):
+class RestaurantSerializer(ValuesFastPathMixin, serializers.ModelSerializer):
     email = serializers.EmailField(write_only=True)
     password = serializers.CharField(write_only=True)
 
     class Meta:
         model = Restaurant
-        fields = ['id', 'name', 'image', 'location', 'map_link', 'phone_number', 'owner_name', 'email', 'password', 'food_type','average_bill_for_two', 'latitude', 'longitude']
+        fields = ['id', 'name', 'image', 'location', 'map_link', 'phone_number', 'owner_name', 'email', 'password', 'food_type','average_bill_for_two', 'latitude', 'longitude', 'rating_avg', 'rating_count']
+        read_only_fields = ['rating_avg', 'rating_count']
 
     def validate_email(self, value):
         if User.objects.filter(username=value).exists():
@@ -145,13 +147,13 @@ class serverSerializer(serializers.Serializer):
 
 
 
-class MenuSerializer(serializers.ModelSerializer):
+class MenuSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = Menu
         fields = ['id', 'name', 'image', 'description', 'price', 'minimum_wait_time', 'created_at']
 
 
-class TableConfigSerializer(serializers.ModelSerializer):  
+class TableConfigSerializer(SparseFieldsetMixin, serializers.ModelSerializer):  
     class Meta:
         model = TableConfig
         fields = ['id', 'restaurant', 'total_tables']
@@ -163,7 +165,7 @@ class TableConfigSerializer(serializers.ModelSerializer):
         return value
 
 
-class TableSerializer(serializers.ModelSerializer):
+class TableSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     table_number = serializers.CharField(max_length=20, required=True)
 
     class Meta:
@@ -176,7 +178,7 @@ class TableSerializer(serializers.ModelSerializer):
         return value
 
 
-class SeatSerializer(serializers.ModelSerializer):
+class SeatSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = Seats
         fields = ['id', 'total_seats', 'start_time', 'end_time', 'interval_minutes']
@@ -203,7 +205,7 @@ class SeatSerializer(serializers.ModelSerializer):
 
         return data
 
-class PaymentSerializer(serializers.ModelSerializer):
+class PaymentSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     upi_id = serializers.CharField(max_length=255, required=True)
     restaurant_name = serializers.CharField(source='restaurant.name', read_only=True)
 
@@ -218,7 +220,7 @@ class PaymentSerializer(serializers.ModelSerializer):
         return value
 
 
-class TimingSerializer(serializers.ModelSerializer):
+class TimingSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     restaurant_name = serializers.CharField(source='restaurant.name', read_only=True)
     open_time = serializers.TimeField()
     close_time = serializers.TimeField()
@@ -237,38 +239,42 @@ class TimingSerializer(serializers.ModelSerializer):
         return data
 
 
-class SeatSlotSerializer(serializers.ModelSerializer):
+class SeatSlotSerializer(ValuesFastPathMixin, serializers.ModelSerializer):
     class Meta:
         model = SeatSlot
         fields = ['id', 'restaurant', 'date', 'start_time', 'end_time', 'available_seats']
         read_only_fields = ['restaurant']
 
 
-class GallerySerializer(serializers.ModelSerializer):
+class GallerySerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = Gallery
         fields = ['id', 'restaurant','image', 'uploaded_at']
         read_only_fields = ['restaurant']
 
 
-class Performanceserializer(serializers.ModelSerializer):
+class Performanceserializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = Performance
         fields = ['id', 'restaurant', 'entry','theme', 'date', 'entry_fee', 'start_time','image']
         read_only_fields = ['restaurant']
 
 
-class OfferSerializer(serializers.ModelSerializer):
+class OfferSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = Offer
-        fields = ['id', 'restaurant', 'title', 'discount_percentage', 'description', 'valid_from', 'valid_until', 'start_time','end_time', 'is_active']
-        read_only_fields = ['restaurant']
+        fields = ['id', 'restaurant', 'title', 'discount_percentage', 'description', 'valid_from', 'valid_until', 'start_time','end_time', 'is_enabled', 'is_active']
+        read_only_fields = ['restaurant', 'is_active']
 
 
-class DiningOfferSerializer(serializers.ModelSerializer):
+class DiningOfferSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = DiningOffer
         fields = ['id', 'restaurant', 'title', 'description', 'amount']
         read_only_fields = ['restaurant']
 
 
+class DailyRestaurantStatsSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    class Meta:
+        model = DailyRestaurantStats
+        fields = ['date', 'covers', 'seat_bookings', 'bills', 'revenue', 'average_bill']
@@ -1,11 +1,13 @@
 import qrcode
 from io import BytesIO
 from django.core.files.base import ContentFile
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from django.utils import timezone
 from datetime import datetime, timedelta
-from .models import Seats, SeatSlot, Table, TableConfig
+from .models import Seats, SeatSlot, Table, TableConfig, Menu, Restaurant, Timing, OpeningWindow, Payment, Offer, DiningOffer, Gallery, Performance, offers_refreshed
+from .search import get_search_backend, RESTAURANT_SEARCH_FIELDS
+from . import bootstrap
 from user_management.models import MenuBooking
 
 @receiver(post_save, sender=Seats)
@@ -68,4 +70,50 @@ def generate_or_trim_tables(sender, instance, created, **kwargs):
     elif target_count < existing_count:
         tables_to_delete = existing_tables.reverse()[:existing_count - target_count]
         for table in tables_to_delete:
-            table.delete()
\ No newline at end of file
+            table.delete()
+
+
+@receiver(post_save, sender=Menu)
+def index_menu(sender, instance, **kwargs):
+    get_search_backend().index_menu(instance)
+
+
+@receiver(post_save, sender=Restaurant)
+def index_restaurant(sender, instance, update_fields=None, **kwargs):
+    # Rating and other bookkeeping saves don't touch the indexed text.
+    if update_fields is not None and not RESTAURANT_SEARCH_FIELDS.intersection(update_fields):
+        return
+    get_search_backend().index_restaurant(instance)
+
+
+@receiver(post_delete, sender=Menu)
+def unindex_menu(sender, instance, **kwargs):
+    get_search_backend().remove('menu', instance.pk)
+
+
+@receiver(post_delete, sender=Restaurant)
+def unindex_restaurant(sender, instance, **kwargs):
+    get_search_backend().remove('restaurant', instance.pk)
+
+
+@receiver(post_delete, sender=Timing)
+def clear_opening_windows(sender, instance, **kwargs):
+    OpeningWindow.objects.filter(restaurant_id=instance.restaurant_id).delete()
+
+
+BOOTSTRAP_MODELS = (Menu, Timing, Seats, Payment, Offer, DiningOffer, Gallery, Performance, TableConfig)
+
+
+def invalidate_bootstrap(sender, instance, **kwargs):
+    bootstrap.invalidate(instance.pk if sender is Restaurant else instance.restaurant_id)
+
+
+for model in (Restaurant,) + BOOTSTRAP_MODELS:
+    post_save.connect(invalidate_bootstrap, sender=model, dispatch_uid=f'bootstrap-save-{model.__name__}')
+    post_delete.connect(invalidate_bootstrap, sender=model, dispatch_uid=f'bootstrap-delete-{model.__name__}')
+
+
+@receiver(offers_refreshed)
+def invalidate_bootstrap_for_offers(sender, restaurant_ids, **kwargs):
+    for restaurant_id in restaurant_ids:
+        bootstrap.invalidate(restaurant_id)
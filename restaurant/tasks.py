@@ -0,0 +1,13 @@
+from celery import shared_task
+from .analytics import rollup_recent
+from .models import Offer
+
+@shared_task
+def rollup_restaurant_analytics(days=2):
+    count = rollup_recent(days)
+    return f"{count} restaurant daily rollups refreshed."
+
+@shared_task
+def refresh_offer_activity():
+    activated, deactivated = Offer.objects.refresh_activity()
+    return f"{activated} offers activated, {deactivated} deactivated."
@@ -1,3 +1,630 @@
-from django.test import TestCase
+import asyncio
+import datetime
+import gzip
+import io
+import json
+import math
+import uuid
+import zlib
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.http import StreamingHttpResponse
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework import serializers
+from rest_framework.authtoken.models import Token
+from rest_framework.renderers import JSONRenderer
+
+from config.metrics import registry
+from config.middleware import CompressionMiddleware, PerformanceMiddleware
+from config.parsers import FastJSONParser
+from config.renderers import FastJSONRenderer
+
+from .analytics import rollup_day
+from .bootstrap import LOCAL_VERSION_TIMEOUT, get_version, version_timeout
+from .discovery import KM_PER_DEGREE, nearby_restaurants
+from .models import (
+    Restaurant, Menu, Table, SeatSlot, RestaurantStaffProfile, Server, Offer, Gallery,
+    DailyRestaurantStats, DailyMenuItemStats, Timing, OpeningWindow, MINUTES_PER_DAY, MINUTES_PER_WEEK,
+)
+from .search import SEARCH_TABLE
+from .serializers import RestaurantSerializer, SeatSlotSerializer
+from user_management.serializers import NotificationSerializer
+from user_management.models import Notification
+from user_management.models import Billing, CustomerProfile, SeatBooking, MenuBooking, SpecialRequestMessage
+
+ROW_COUNTS = (1, 10, 1000)
+
+
+class RestaurantFixtureMixin:
+    """An owner with a restaurant, a menu item and a seat slot, plus a customer; both with tokens."""
+
+    def setUp(self):
+        owner = User.objects.create_user('owner@example.com', password='Secret#123')
+        self.restaurant = Restaurant.objects.create(
+            user=owner, name='Monkey Bar', image='restaurants/r.jpg', location='MG Road',
+            map_link='https://maps.example.com/r', phone_number='9876543210', owner_name='Owner',
+        )
+        RestaurantStaffProfile.objects.create(user=owner, restaurant=self.restaurant, role='owner')
+        self.auth = {'HTTP_AUTHORIZATION': f'Token {Token.objects.create(user=owner).key}'}
+
+        customer_user = User.objects.create(username='9123456780')
+        self.customer = CustomerProfile.objects.create(user=customer_user, full_name='Diner')
+        self.customer_auth = {'HTTP_AUTHORIZATION': f'Token {Token.objects.create(user=customer_user).key}'}
+
+        self.menu = Menu.objects.create(restaurant=self.restaurant, name='Dosa', description='Crispy', price=Decimal('120.00'))
+        self.slot = SeatSlot.objects.create(
+            restaurant=self.restaurant, date=datetime.date(2026, 1, 1),
+            start_time=datetime.time(19, 0), end_time=datetime.time(20, 0), available_seats=10000,
+        )
+
+    def add_seat_bookings(self, count):
+        return SeatBooking.objects.bulk_create([
+            SeatBooking(user=self.customer, restaurant=self.restaurant, seat_slot=self.slot, number_of_guests=2)
+            for _ in range(count)
+        ])
+
+
+class QueryBudgetTestCase(RestaurantFixtureMixin, TestCase):
+    """List endpoints must cost a constant number of queries regardless of row count."""
+
+    def setUp(self):
+        super().setUp()
+        self.created = 0
+
+    def assertConstantQueries(self, url, auth, add_rows):
+        counts = []
+        for total in ROW_COUNTS:
+            add_rows(total - self.created)
+            self.created = total
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.get(url, **auth)
+            self.assertEqual(response.status_code, 200, response.content)
+            counts.append(len(ctx.captured_queries))
+        self.assertEqual(len(set(counts)), 1, f"{url} query counts grew with rows: {dict(zip(ROW_COUNTS, counts))}")
+
+
+class RestaurantListQueryTests(QueryBudgetTestCase):
+    def test_table_orders(self):
+        def add_rows(count):
+            table = Table.objects.create(restaurant=self.restaurant, table_number=f'TBL-{self.created}')
+            bookings = self.add_seat_bookings(count)
+            items = MenuBooking.objects.bulk_create([
+                MenuBooking(booking=booking, table=table, menu=self.menu, quantity=1,
+                            unit_price=self.menu.price, line_total=self.menu.price)
+                for booking in bookings
+            ])
+            SpecialRequestMessage.objects.create(booking=items[0], message='No onions')
+
+        self.assertConstantQueries('/restaurant/table-orders/', self.auth, add_rows)
+
+    def test_seat_orders(self):
+        self.assertConstantQueries('/restaurant/seat-booking-list/', self.auth, self.add_seat_bookings)
+
+    def test_servers(self):
+        def add_rows(count):
+            users = User.objects.bulk_create([
+                User(username=f'server{self.created + i}@example.com', email=f'server{self.created + i}@example.com')
+                for i in range(count)
+            ])
+            profiles = RestaurantStaffProfile.objects.bulk_create([
+                RestaurantStaffProfile(user=user, restaurant=self.restaurant, role='server') for user in users
+            ])
+            Server.objects.bulk_create([
+                Server(profile=profile, full_name='Server', phone_number=str(9000000000 + profile.id))
+                for profile in profiles
+            ])
+
+        self.assertConstantQueries('/restaurant/server/', self.auth, add_rows)
+
+    def test_menus(self):
+        def add_rows(count):
+            Menu.objects.bulk_create([
+                Menu(restaurant=self.restaurant, name='Idli', description='Soft', price=Decimal('60.00'))
+                for _ in range(count)
+            ])
+
+        self.assertConstantQueries('/restaurant/menu/', self.auth, add_rows)
+
+    def test_bootstrap(self):
+        def add_rows(count):
+            Menu.objects.bulk_create([
+                Menu(restaurant=self.restaurant, name='Idli', description='Soft', price=Decimal('60.00'))
+                for _ in range(count)
+            ])
+            Offer.objects.bulk_create([
+                Offer(restaurant=self.restaurant, title='Happy hour', discount_percentage=Decimal('10.00'),
+                      valid_from=datetime.date(2026, 1, 1), valid_until=datetime.date(2026, 12, 31))
+                for _ in range(count)
+            ])
+            Gallery.objects.bulk_create([Gallery(restaurant=self.restaurant, image='gallery/g.jpg') for _ in range(count)])
+            # bulk_create skips the signals that bump the bootstrap version.
+            cache.clear()
+
+        self.assertConstantQueries('/restaurant/bootstrap/', self.auth, add_rows)
+
+
+class RestaurantAnalyticsTests(RestaurantFixtureMixin, TestCase):
+    def test_rollup_feeds_the_dashboard(self):
+        today = timezone.localdate()
+        slot = SeatSlot.objects.create(
+            restaurant=self.restaurant, date=today,
+            start_time=datetime.time(19, 0), end_time=datetime.time(20, 0), available_seats=10,
+        )
+        SeatBooking.objects.bulk_create([
+            SeatBooking(user=self.customer, restaurant=self.restaurant, seat_slot=slot, number_of_guests=guests, payment_status=status)
+            for guests, status in ((2, 'success'), (3, 'success'), (4, 'failed'))
+        ])
+        table = Table.objects.create(restaurant=self.restaurant, table_number='TBL-1')
+        MenuBooking.objects.create(table=table, menu=self.menu, quantity=2)
+        billing = Billing.objects.create(table=table)
+        billing.payment_status, billing.complete_order = 'paid', True
+        billing.save(update_fields=['payment_status', 'complete_order', 'updated_at'])
+        # The next diner's order isn't paid yet, so it isn't sold either.
+        MenuBooking.objects.create(table=table, menu=self.menu, quantity=5)
+        Billing.objects.create(table=table)
+
+        self.assertEqual(rollup_day(today), 1)
+        # Re-running a day replaces its rows rather than adding to them.
+        self.assertEqual(rollup_day(today), 1)
+
+        stats = DailyRestaurantStats.objects.get(restaurant=self.restaurant, date=today)
+        self.assertEqual((stats.covers, stats.seat_bookings, stats.bills), (5, 2, 1))
+        self.assertEqual((stats.revenue, stats.average_bill), (Decimal('240.00'), Decimal('240.00')))
+        self.assertEqual(DailyMenuItemStats.objects.filter(date=today).count(), 1)
+
+        response = self.client.get('/restaurant/analytics/', **self.auth)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['totals'], {'covers': 5, 'bills': 1, 'revenue': '240.00', 'average_bill': '240.00'})
+        self.assertEqual(response.data['top_menu_items'], [
+            {'menu_id': self.menu.id, 'menu_name': 'Dosa', 'quantity': 2, 'revenue': '240.00'},
+        ])
+
+    def test_rejects_inverted_range(self):
+        response = self.client.get('/restaurant/analytics/?from=2026-02-01&to=2026-01-01', **self.auth)
+        self.assertEqual(response.status_code, 400)
+
+
+class NearbyRestaurantsTests(RestaurantFixtureMixin, TestCase):
+    ORIGIN = (12.9716, 77.5946)
+
+    def add_restaurant(self, name, north_km, east_km):
+        lat = self.ORIGIN[0] + north_km / KM_PER_DEGREE
+        lng = self.ORIGIN[1] + east_km / (KM_PER_DEGREE * math.cos(math.radians(self.ORIGIN[0])))
+        return Restaurant.objects.create(
+            user=User.objects.create(username=f'{name}@example.com'), name=name, image='restaurants/r.jpg',
+            location='MG Road', map_link='https://maps.example.com/r', phone_number='9876543210', owner_name='Owner',
+            latitude=Decimal(f'{lat:.6f}'), longitude=Decimal(f'{lng:.6f}'),
+        )
+
+    def test_radius_is_applied_before_the_limit(self):
+        # Inside the 5 km bounding box, but ~5.7 km away.
+        self.add_restaurant('Corner', 4, 4)
+        for km in (1, 2, 3):
+            self.add_restaurant(f'At {km}', km, 0)
+        self.add_restaurant('Far', 20, 0)
+
+        names = [entry['name'] for entry in nearby_restaurants(*self.ORIGIN, radius_km=5, limit=2)]
+        self.assertEqual(names, ['At 1', 'At 2'])
+        names = [entry['name'] for entry in nearby_restaurants(*self.ORIGIN, radius_km=5, limit=10)]
+        self.assertEqual(names, ['At 1', 'At 2', 'At 3'])
+        self.assertEqual(len(nearby_restaurants(*self.ORIGIN, limit=10)), 6)
+
+
+class OpeningWindowTests(RestaurantFixtureMixin, TestCase):
+    def at(self, day, hour, minute=0):
+        # 2026-01-04 is a Sunday, 2026-01-05 a Monday.
+        return timezone.make_aware(datetime.datetime(2026, 1, day, hour, minute))
+
+    def is_open(self, moment):
+        return Restaurant.objects.open_at(moment).filter(pk=self.restaurant.pk).exists()
+
+    def test_windows_past_midnight_wrap_the_week(self):
+        timing = Timing(restaurant=self.restaurant, open_time=datetime.time(18, 0), close_time=datetime.time(2, 0))
+        windows = timing.weekly_windows()
+        self.assertEqual(windows[0], (18 * 60, 26 * 60))
+        # Sunday's window runs into Monday morning and is split at the end of the week.
+        self.assertEqual(windows[-2:], [(6 * MINUTES_PER_DAY + 18 * 60, MINUTES_PER_WEEK), (0, 2 * 60)])
+
+        full_day = Timing(restaurant=self.restaurant, open_time=datetime.time(0, 0), close_time=datetime.time(0, 0))
+        self.assertEqual(full_day.weekly_windows()[0], (0, MINUTES_PER_DAY))
+
+    def test_open_at_follows_the_timing(self):
+        timing = Timing.objects.create(restaurant=self.restaurant, open_time=datetime.time(18, 0), close_time=datetime.time(2, 0))
+        self.assertEqual(OpeningWindow.objects.filter(restaurant=self.restaurant).count(), 8)
+        self.assertTrue(self.is_open(self.at(4, 23, 30)))
+        self.assertTrue(self.is_open(self.at(5, 1, 59)))
+        self.assertFalse(self.is_open(self.at(5, 2, 0)))
+        self.assertFalse(self.is_open(self.at(5, 17, 59)))
+        self.assertTrue(self.is_open(self.at(5, 18, 0)))
+
+        # Saving rebuilds the windows rather than adding to them.
+        timing.close_time = datetime.time(23, 0)
+        timing.save()
+        self.assertEqual(OpeningWindow.objects.filter(restaurant=self.restaurant).count(), 7)
+        self.assertFalse(self.is_open(self.at(5, 1, 30)))
+        self.assertTrue(self.is_open(self.at(5, 22, 59)))
+
+        timing.delete()
+        self.assertFalse(OpeningWindow.objects.filter(restaurant=self.restaurant).exists())
+        self.assertFalse(self.is_open(self.at(5, 22, 0)))
+
+
+class OfferActivityTests(RestaurantFixtureMixin, TestCase):
+    def test_owner_switch_survives_the_schedule_refresh(self):
+        today = timezone.localdate()
+        offer = Offer.objects.create(
+            restaurant=self.restaurant, title='Happy hour', discount_percentage=Decimal('10.00'),
+            valid_from=today - datetime.timedelta(days=1), valid_until=today + datetime.timedelta(days=1),
+        )
+
+        response = self.client.put(
+            f'/restaurant/offer/{offer.pk}/', {'is_enabled': False, 'is_active': False},
+            content_type='application/json', **self.auth,
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data['offer']['is_enabled'], response.data['offer']['is_active']), (False, True))
+
+        Offer.objects.refresh_activity()
+        self.assertFalse(Offer.objects.currently_applicable().exists())
+
+        self.client.put(f'/restaurant/offer/{offer.pk}/', {'is_enabled': True}, content_type='application/json', **self.auth)
+        self.assertEqual(list(Offer.objects.currently_applicable()), [offer])
+
+
+class OfferSwitchMigrationTests(TransactionTestCase):
+    before = [('restaurant', '0038_openingwindow')]
+    after = [('restaurant', '0040_backfill_offer_is_enabled')]
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def test_switched_off_offers_stay_off(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.before)
+        old_apps = executor.loader.project_state(self.before).apps
+
+        restaurant = Restaurant.objects.create(
+            user=User.objects.create_user('owner@example.com'), name='Monkey Bar', image='restaurants/r.jpg',
+            location='MG Road', map_link='https://maps.example.com/r', phone_number='9876543210', owner_name='Owner',
+        )
+        OldOffer = old_apps.get_model('restaurant', 'Offer')
+        today = datetime.date(2026, 1, 1)
+        on, off = [
+            OldOffer.objects.create(
+                restaurant_id=restaurant.id, title=title, discount_percentage=Decimal('10.00'),
+                valid_from=today, valid_until=today, is_active=is_active,
+            )
+            for title, is_active in (('On', True), ('Off', False))
+        ]
+
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(self.after)
+        NewOffer = executor.loader.project_state(self.after).apps.get_model('restaurant', 'Offer')
+        self.assertTrue(NewOffer.objects.get(pk=on.pk).is_enabled)
+        self.assertFalse(NewOffer.objects.get(pk=off.pk).is_enabled)
+
+
+class RestaurantBootstrapTests(RestaurantFixtureMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+    def test_cached_until_a_section_changes(self):
+        response = self.client.get('/restaurant/bootstrap/', **self.auth)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+        self.assertEqual([menu['name'] for menu in response.data['menu']], ['Dosa'])
+
+        self.assertEqual(self.client.get('/restaurant/bootstrap/', HTTP_IF_NONE_MATCH=etag, **self.auth).status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Menu.objects.create(restaurant=self.restaurant, name='Idli', description='Soft', price=Decimal('60.00'))
+
+        response = self.client.get('/restaurant/bootstrap/', HTTP_IF_NONE_MATCH=etag, **self.auth)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(len(response.data['menu']), 2)
+
+    def test_version_expires_in_a_process_local_cache(self):
+        # Tests run on LocMemCache, where other workers' invalidations are invisible.
+        self.assertEqual(version_timeout(), LOCAL_VERSION_TIMEOUT)
+        with mock.patch('restaurant.bootstrap.cache.add', return_value=True) as add:
+            get_version(self.restaurant.id)
+        self.assertEqual(add.call_args.kwargs['timeout'], LOCAL_VERSION_TIMEOUT)
+
+
+class SparseFieldsetTests(RestaurantFixtureMixin, TestCase):
+    def test_fields_param_trims_payload_and_columns(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/restaurant/menu/?fields=name,price', **self.auth)
+        self.assertEqual(response.json(), [{'name': 'Dosa', 'price': '120.00'}])
+        menu_query = [q['sql'] for q in ctx.captured_queries if q['sql'].startswith('SELECT "restaurant_menu"."id"')][-1]
+        self.assertNotIn('"description"', menu_query)
+
+    def test_unknown_fields_keep_everything(self):
+        response = self.client.get('/restaurant/menu/?fields=nope', **self.auth)
+        self.assertIn('description', response.json()[0])
+
+
+class SearchTests(RestaurantFixtureMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.chai = Menu.objects.create(restaurant=self.restaurant, name='Masala Chai', description='Goes well with dosa', price=Decimal('30.00'))
+
+    def search(self, query, **params):
+        response = self.client.get('/restaurant/search/', {'q': query, **params}, **self.customer_auth)
+        self.assertEqual(response.status_code, 200, response.content)
+        return [(hit['type'], hit['name']) for hit in response.json()]
+
+    def test_index_is_created_by_the_migration(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT sql FROM sqlite_master WHERE name = %s", [SEARCH_TABLE])
+            self.assertIn('fts5', cursor.fetchone()[0])
+
+    def test_prefix_match_ranks_names_first(self):
+        self.assertEqual(self.search('dos'), [('menu', 'Dosa'), ('menu', 'Masala Chai')])
+        self.assertEqual(self.search('masala dos'), [('menu', 'Masala Chai')])
+        self.assertEqual(self.search('monkey', type='restaurant'), [('restaurant', 'Monkey Bar')])
+        self.assertEqual(self.client.get('/restaurant/search/?q=dos&type=table', **self.customer_auth).status_code, 400)
+
+    def test_index_follows_saves_and_deletes(self):
+        self.menu.name = 'Idli'
+        self.menu.save()
+        self.assertEqual(self.search('dos'), [('menu', 'Masala Chai')])
+        self.assertEqual(self.search('idl'), [('menu', 'Idli')])
+
+        self.chai.delete()
+        self.assertEqual(self.search('chai'), [])
+
+        # Menus carry the restaurant name as a tag, so a rename reaches them too.
+        self.restaurant.name = 'Tiffin House'
+        self.restaurant.save()
+        self.assertEqual(self.search('tiffin'), [('restaurant', 'Tiffin House'), ('menu', 'Idli')])
+        self.assertEqual(self.search('monkey'), [])
+
+    def test_limited_query_keeps_restaurant_hits(self):
+        self.assertEqual(self.search('monkey', limit=1), [('restaurant', 'Monkey Bar')])
+
+    @override_settings(SEARCH_BACKEND='restaurant.search.BasicSearchBackend')
+    def test_basic_backend_falls_back_to_icontains(self):
+        # Substrings match without a full-text index; name hits still lead.
+        self.assertEqual(self.search('risp'), [('menu', 'Dosa')])
+        self.assertEqual(self.search('dosa'), [('menu', 'Dosa'), ('menu', 'Masala Chai')])
+        self.assertEqual(self.search('monkey', type='menu'), [('menu', 'Dosa'), ('menu', 'Masala Chai')])
+        self.assertEqual(self.search('monkey', limit=1), [('restaurant', 'Monkey Bar')])
+
+
+class FastJSONTests(TestCase):
+    def test_output_matches_drf_renderer(self):
+        data = {
+            'price': Decimal('149.50'),
+            'created_at': timezone.now(),
+            'naive': datetime.datetime(2026, 1, 1, 19, 30, 0, 123456),
+            'date': datetime.date(2026, 1, 1),
+            'time': datetime.time(19, 30),
+            'duration': datetime.timedelta(minutes=90),
+            'id': uuid.uuid4(),
+            'label': gettext_lazy('Pending'),
+            'text': 'Dosa \u2028 — ₹120',
+            1: [None, True, 1.5],
+        }
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+        self.assertEqual(
+            FastJSONRenderer().render(data, 'application/json; indent=4'),
+            JSONRenderer().render(data, 'application/json; indent=4'),
+        )
+        # Beyond orjson's 64-bit integers: falls back to the stdlib encoder.
+        self.assertEqual(FastJSONRenderer().render({'big': 2 ** 70}), b'{"big":1180591620717411303424}')
+
+    def test_exponent_floats_differ_only_in_spelling(self):
+        data = {'large': 1e16, 'small': 1e-7}
+        self.assertEqual(json.loads(FastJSONRenderer().render(data)), json.loads(JSONRenderer().render(data)))
+
+    def test_non_finite_floats_follow_strict_json(self):
+        data = {'rating': [1.5, {'avg': float('nan')}], 'missing': None}
+        with self.assertRaises(ValueError):
+            FastJSONRenderer().render(data)
+
+        fast, stdlib = FastJSONRenderer(), JSONRenderer()
+        fast.strict = stdlib.strict = False
+        self.assertEqual(fast.render({'max': float('inf')}), stdlib.render({'max': float('inf')}))
+
+    def test_parser_round_trip(self):
+        body = JSONRenderer().render({'items': [{'menu': 1, 'quantity': 2}], 'note': 'no onions ₹'})
+        self.assertEqual(FastJSONParser().parse(io.BytesIO(body)), {'items': [{'menu': 1, 'quantity': 2}], 'note': 'no onions ₹'})
+
+
+class ValuesFastPathTests(RestaurantFixtureMixin, TestCase):
+    def test_matches_serializer_output(self):
+        self.restaurant.food_type, self.restaurant.average_bill_for_two = 'veg', Decimal('850.00')
+        self.restaurant.latitude, self.restaurant.longitude = Decimal('12.971600'), Decimal('77.594600')
+        self.restaurant.save()
+        User.objects.create_user('empty@example.com')
+        Restaurant.objects.create(
+            user=User.objects.get(username='empty@example.com'), name='No Image', image='', location='HSR',
+            map_link='https://maps.example.com/n', phone_number='9876500001', owner_name='Owner',
+        )
+        Notification.objects.create(restaurant=self.restaurant, title='Order', message='Table 4')
+
+        cases = [
+            (RestaurantSerializer, Restaurant.objects.order_by('id'), None),
+            (RestaurantSerializer, Restaurant.objects.order_by('id'), ['name', 'image', 'bogus']),
+            (SeatSlotSerializer, SeatSlot.objects.order_by('id'), None),
+            (NotificationSerializer, Notification.objects.order_by('id'), None),
+        ]
+        for serializer_class, queryset, fields in cases:
+            with self.subTest(serializer=serializer_class.__name__, fields=fields):
+                self.assertIsNotNone(serializer_class.values_plan(fields))
+                self.assertEqual(
+                    FastJSONRenderer().render(serializer_class.values_data(queryset, fields)),
+                    FastJSONRenderer().render(serializer_class(queryset, many=True, fields=fields).data),
+                )
+
+    def test_plans_are_keyed_on_known_fields(self):
+        plan = RestaurantSerializer.values_plan(['name', 'image'])
+        self.assertIs(RestaurantSerializer.values_plan(['image', 'name', 'bogus', 'name']), plan)
+        self.assertIs(RestaurantSerializer.values_plan(['bogus']), RestaurantSerializer.values_plan(None))
+
+    def test_falls_back_for_method_fields(self):
+        class DetailedNotificationSerializer(NotificationSerializer):
+            preview = serializers.SerializerMethodField()
+
+            class Meta(NotificationSerializer.Meta):
+                fields = NotificationSerializer.Meta.fields + ['preview']
+
+            def get_preview(self, obj):
+                return obj.message[:10]
+
+        Notification.objects.create(restaurant=self.restaurant, title='Order', message='Table 4, no onions')
+        self.assertIsNone(DetailedNotificationSerializer.values_plan())
+        self.assertEqual(
+            DetailedNotificationSerializer.values_data(Notification.objects.all()),
+            DetailedNotificationSerializer(Notification.objects.all(), many=True).data,
+        )
+
+
+class CompressionTests(RestaurantFixtureMixin, TestCase):
+    def test_large_json_is_gzipped(self):
+        Menu.objects.bulk_create([
+            Menu(restaurant=self.restaurant, name=f'Dish {i}', description='Crispy', price=Decimal('60.00'))
+            for i in range(50)
+        ])
+        plain = self.client.get('/restaurant/menu/', **self.auth)
+        response = self.client.get('/restaurant/menu/', HTTP_ACCEPT_ENCODING='gzip', **self.auth)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content), plain.content)
+        # The weakened ETag still matches.
+        self.assertEqual(
+            self.client.get('/restaurant/menu/', HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=response['ETag'], **self.auth).status_code,
+            304,
+        )
+
+    def test_small_responses_are_left_alone(self):
+        response = self.client.get('/restaurant/menu/', HTTP_ACCEPT_ENCODING='gzip', **self.auth)
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_streaming_export_is_compressed(self):
+        self.add_seat_bookings(200)
+        response = self.client.get('/restaurant/seat-booking-list/?export=ndjson', HTTP_ACCEPT_ENCODING='gzip', **self.auth)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(len(gzip.decompress(b''.join(response.streaming_content)).splitlines()), 200)
+
+
+class FakeBrotli:
+    """Stands in for the optional brotli package with the same API over zlib."""
+
+    @staticmethod
+    def compress(data, quality):
+        return zlib.compress(data)
+
+    class Compressor:
+        def __init__(self, quality):
+            self.compressor = zlib.compressobj()
+
+        def process(self, data):
+            return self.compressor.compress(data)
+
+        def finish(self):
+            return self.compressor.flush()
+
+
+@mock.patch('config.middleware.brotli', FakeBrotli)
+class BrotliCompressionTests(RestaurantFixtureMixin, TestCase):
+    def test_brotli_preferred_when_accepted(self):
+        Menu.objects.bulk_create([
+            Menu(restaurant=self.restaurant, name=f'Dish {i}', description='Crispy', price=Decimal('60.00'))
+            for i in range(50)
+        ])
+        plain = self.client.get('/restaurant/menu/', **self.auth)
+        response = self.client.get('/restaurant/menu/', HTTP_ACCEPT_ENCODING='gzip, br', **self.auth)
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertTrue(response['ETag'].startswith('W/'))
+        self.assertEqual(zlib.decompress(response.content), plain.content)
+
+        response = self.client.get('/restaurant/menu/', HTTP_ACCEPT_ENCODING='gzip, br;q=0', **self.auth)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        with override_settings(COMPRESSION_BROTLI=False):
+            response = self.client.get('/restaurant/menu/', HTTP_ACCEPT_ENCODING='br, gzip', **self.auth)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+
+    def test_streaming_export(self):
+        self.add_seat_bookings(200)
+        response = self.client.get('/restaurant/seat-booking-list/?export=ndjson', HTTP_ACCEPT_ENCODING='br', **self.auth)
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertEqual(len(zlib.decompress(b''.join(response.streaming_content)).splitlines()), 200)
+
+    def test_async_streaming(self):
+        async def rows():
+            for i in range(100):
+                yield f'{{"row": {i}}}\n'.encode()
+
+        response = StreamingHttpResponse(rows(), content_type='application/x-ndjson')
+        request = RequestFactory().get('/', HTTP_ACCEPT_ENCODING='br')
+        response = CompressionMiddleware(lambda request: response).process_response(request, response)
+        self.assertEqual(response['Content-Encoding'], 'br')
+
+        async def consume():
+            return b''.join([chunk async for chunk in response.streaming_content])
+
+        self.assertEqual(len(zlib.decompress(asyncio.run(consume())).splitlines()), 100)
+
+
+class PerformanceMetricsTests(RestaurantFixtureMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        registry.reset()
+
+    @override_settings(PERFORMANCE_SERVER_TIMING=True)
+    def test_requests_are_recorded_per_route(self):
+        response = self.client.get('/restaurant/menu/', **self.auth)
+        self.assertRegex(response['Server-Timing'], r'^app;dur=[\d.]+, db;dur=[\d.]+;desc="\d+ queries", http;dur=[\d.]+;desc="0 calls"$')
+
+        self.assertEqual(self.client.get('/metrics/', **self.auth).status_code, 403)
+        staff = User.objects.create_user('ops@example.com', is_staff=True)
+        metrics = self.client.get('/metrics/', HTTP_AUTHORIZATION=f'Token {Token.objects.create(user=staff).key}').json()
+        menu = metrics['GET /restaurant/menu/']
+        self.assertEqual(menu['requests'], 1)
+        self.assertEqual(menu['response_bytes']['max'], len(response.content))
+        self.assertGreater(menu['db_queries']['max'], 0)
+
+    def test_streaming_recorded_after_the_body(self):
+        self.add_seat_bookings(200)
+        response = self.client.get('/restaurant/seat-booking-list/?export=ndjson', **self.auth)
+        self.assertNotIn('GET /restaurant/seat-booking-list/', registry.snapshot())
+
+        body = b''.join(response.streaming_content)
+        export = registry.snapshot()['GET /restaurant/seat-booking-list/']
+        self.assertEqual(export['requests'], 1)
+        self.assertEqual(export['response_bytes']['max'], len(body))
+        # The rows are fetched while the body streams; those queries count too.
+        self.assertGreater(export['db_queries']['max'], 2)
+
+    def test_async_streaming_recorded_after_the_body(self):
+        async def rows():
+            for i in range(10):
+                yield b'row\n'
+
+        request = RequestFactory().get('/')
+        response = PerformanceMiddleware(lambda request: StreamingHttpResponse(rows()))(request)
+
+        async def consume():
+            return b''.join([chunk async for chunk in response.streaming_content])
+
+        self.assertEqual(registry.snapshot(), {})
+        asyncio.run(consume())
+        self.assertEqual(registry.snapshot()['GET <unmatched>']['response_bytes']['max'], 40)
+
+    @override_settings(PERFORMANCE_SERVER_TIMING=False)
+    def test_header_can_be_turned_off(self):
+        self.assertFalse(self.client.get('/restaurant/menu/', **self.auth).has_header('Server-Timing'))
@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.urls import path
-from .views import RestaurantRegisterView, RestaurantLoginView, MenuCreateListView, TableCreateView, PaymentCreateView, TimingView, SeatsCreateView, SeatSlotView, GalleryView, PerformanceView, OfferView, DiningOfferView, TableConfigView, CreateServerView, ServerDetailView, TableOrderListView, SeatOrderListView, SeatBookingDetailView, NearbyRestaurantsView, RestaurantForgotPasswordView, RestaurantVerifyResetCodeView, RestaurantResetPasswordView
+from .views import RestaurantRegisterView, RestaurantLoginView, MenuCreateListView, TableCreateView, PaymentCreateView, TimingView, SeatsCreateView, SeatSlotView, GalleryView, PerformanceView, OfferView, DiningOfferView, TableConfigView, CreateServerView, ServerDetailView, TableOrderListView, SeatOrderListView, BillingExportView, RestaurantAnalyticsView, SeatBookingDetailView, NearbyRestaurantsView, RestaurantForgotPasswordView, RestaurantVerifyResetCodeView, RestaurantResetPasswordView, SearchView, RestaurantBootstrapView
 
 urlpatterns = [
     path('signup/', RestaurantRegisterView.as_view(), name="restaurants"),
@@ -36,6 +36,10 @@ urlpatterns = [
     path('table-orders/', TableOrderListView.as_view(), name='table-order-list'),
     path('seat-booking-list/', SeatOrderListView.as_view(), name='seat-booking-list'),
     path('seat-booking-list/<int:pk>/', SeatBookingDetailView.as_view(), name='seat-booking-list'),
+    path('billing-export/', BillingExportView.as_view(), name='billing-export'),
+    path('analytics/', RestaurantAnalyticsView.as_view(), name='restaurant-analytics'),
     path('nearby/', NearbyRestaurantsView.as_view(), name='nearby-restaurants'),
+    path('search/', SearchView.as_view(), name='search'),
+    path('bootstrap/', RestaurantBootstrapView.as_view(), name='restaurant-bootstrap'),
     
 ]
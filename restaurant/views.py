@@ -10,10 +10,17 @@ from django.utils import timezone
 from django.utils.timezone import localtime
 from datetime import datetime, timedelta
 from django.shortcuts import get_object_or_404
-from .models import Restaurant, Menu, Table, TableConfig, Payment, Timing, Seats, SeatSlot, Gallery, Performance, Offer, DiningOffer, TableConfig, RestaurantStaffProfile, Server
-from .serializers import RestaurantSerializer, MenuSerializer, TableSerializer, PaymentSerializer, TimingSerializer, SeatSerializer, SeatSlotSerializer, GallerySerializer, Performanceserializer, OfferSerializer, DiningOfferSerializer, TableConfigSerializer, serverSerializer, RestaurantForgotPasswordSerializer, RestaurantResetPasswordSerializer
-from user_management.models import MenuBooking, SpecialRequestMessage, SeatBooking, SpecialRequestForSeat
-from math import radians, sin, cos, sqrt, atan2
+from django.utils.http import quote_etag
+from django.db.models import Q, Sum
+from decimal import Decimal
+from .models import Restaurant, Menu, Table, TableConfig, Payment, Timing, Seats, SeatSlot, Gallery, Performance, Offer, DiningOffer, TableConfig, RestaurantStaffProfile, Server, DailyRestaurantStats, DailyMenuItemStats
+from .serializers import RestaurantSerializer, MenuSerializer, TableSerializer, PaymentSerializer, TimingSerializer, SeatSerializer, SeatSlotSerializer, GallerySerializer, Performanceserializer, OfferSerializer, DiningOfferSerializer, TableConfigSerializer, serverSerializer, RestaurantForgotPasswordSerializer, RestaurantResetPasswordSerializer, DailyRestaurantStatsSerializer
+from user_management.models import MenuBooking, SpecialRequestMessage, SeatBooking, SpecialRequestForSeat, Billing, TableSession
+from .mixins import ConditionalListMixin, QuerysetOptimizerMixin, requested_fields
+from .exports import EXPORT_CHUNK_SIZE, EXPORT_CONTENT_TYPES, export_response
+from .discovery import nearby_restaurants, DEFAULT_NEARBY_LIMIT, MAX_NEARBY_LIMIT
+from .search import search, SEARCH_KINDS, DEFAULT_SEARCH_LIMIT, MAX_SEARCH_LIMIT
+from .bootstrap import get_bootstrap, get_version
 
 from user_management.models import OTP
 from user_management.utils import send_otp_via_messagecentral, _get_auth_token
@@ -39,8 +46,9 @@ class RestaurantRegisterView(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
     def get(self, request):
-        restaurants = Restaurant.objects.all()
-        serializer = RestaurantSerializer(restaurants, many=True)
+        fields = requested_fields(request)
+        restaurants = RestaurantSerializer.narrow(Restaurant.objects.all(), fields)
+        serializer = RestaurantSerializer(restaurants, many=True, fields=fields)
         return Response(serializer.data)
 
     def put(self, request, pk=None):
@@ -226,16 +234,17 @@ class RestaurantResetPasswordView(APIView):
 
         return Response({"message": "Password reset successfully. Please log in."}, status=status.HTTP_200_OK)
 
-class CreateServerView(APIView):
+class CreateServerView(QuerysetOptimizerMixin, APIView):
     authentication_classes = [TokenAuthentication]
     permission_classes = [IsAuthenticated]
+    list_select_related = ('profile__user',)
 
     def get(self, request):
         if not hasattr(request.user, 'staff_profile') or request.user.staff_profile.role not in ['owner', 'manager']:
             return Response({'error': 'Only owners or managers can view servers.'}, status=status.HTTP_403_FORBIDDEN)
 
         restaurant = request.user.staff_profile.restaurant
-        servers = Server.objects.filter(profile__restaurant=restaurant)
+        servers = self.optimize_queryset(Server.objects.filter(profile__restaurant=restaurant))
         data = [{
             'id': s.profile.user.id,
             'full_name': s.full_name,
@@ -321,7 +330,7 @@ class ServerDetailView(APIView):
         return Response({"message": "Server account deleted."}, status=status.HTTP_204_NO_CONTENT)
 
 
-class MenuCreateListView(APIView):
+class MenuCreateListView(ConditionalListMixin, APIView):
     authentication_classes = [TokenAuthentication]
     permission_classes = [IsAuthenticated]
 
@@ -343,9 +352,9 @@ class MenuCreateListView(APIView):
         except Restaurant.DoesNotExist:
             return Response({"error": "Restaurant profile not found."}, status=status.HTTP_404_NOT_FOUND)
 
-        menus = Menu.objects.filter(restaurant=restaurant)
-        serializer = MenuSerializer(menus, many=True)
-        return Response(serializer.data)
+        fields = requested_fields(request)
+        menus = MenuSerializer.narrow(Menu.objects.filter(restaurant=restaurant), fields)
+        return self.conditional_list_response(request, menus, lambda: MenuSerializer(menus, many=True, fields=fields).data)
 
 
     def put(self, request, pk=None):
@@ -471,8 +480,9 @@ class TableCreateView(APIView):
         except Restaurant.DoesNotExist:
             return Response({"error": "Restaurant profile not found."}, status=status.HTTP_404_NOT_FOUND)
 
-        tables = Table.objects.filter(restaurant=restaurant)
-        serializer = TableSerializer(tables, many=True)
+        fields = requested_fields(request)
+        tables = TableSerializer.narrow(Table.objects.filter(restaurant=restaurant), fields)
+        serializer = TableSerializer(tables, many=True, fields=fields)
         return Response(serializer.data)
    
     def put(self, request, pk=None):
@@ -488,6 +498,9 @@ class TableCreateView(APIView):
 
         serializer = TableSerializer(table, data=request.data, partial=True)
         if serializer.is_valid():
+            if serializer.validated_data.get('booking_status') is False:
+                # Freeing the table by hand also ends the diner's session.
+                TableSession.release(table.id)
             serializer.save()
             return Response({
                 "message": "Table updated successfully",
@@ -537,8 +550,9 @@ class PaymentCreateView(APIView):
         except Restaurant.DoesNotExist:
             return Response({"error": "Restaurant profile not found."}, status=status.HTTP_404_NOT_FOUND)   
 
-        payments = Payment.objects.filter(restaurant=restaurant)
-        serializer = PaymentSerializer(payments, many=True) 
+        fields = requested_fields(request)
+        payments = PaymentSerializer.narrow(Payment.objects.filter(restaurant=restaurant), fields)
+        serializer = PaymentSerializer(payments, many=True, fields=fields)
         return Response(serializer.data)
    
     def put(self, request, pk=None):
@@ -685,8 +699,9 @@ class SeatsCreateView(APIView):
         except Restaurant.DoesNotExist:
             return Response({"error": "Restaurant profile not found."}, status=status.HTTP_404_NOT_FOUND)
 
-        seats = Seats.objects.filter(restaurant=restaurant)
-        serializer = SeatSerializer(seats, many=True)
+        fields = requested_fields(request)
+        seats = SeatSerializer.narrow(Seats.objects.filter(restaurant=restaurant), fields)
+        serializer = SeatSerializer(seats, many=True, fields=fields)
         return Response(serializer.data)
 
     def put(self, request, pk=None):
@@ -723,7 +738,7 @@ class SeatsCreateView(APIView):
         return Response({"message": "Seat configuration deleted successfully."}, status=status.HTTP_204_NO_CONTENT)
 
 
-class SeatSlotView(APIView):
+class SeatSlotView(ConditionalListMixin, APIView):
     authentication_classes = [TokenAuthentication]
     permission_classes = [IsAuthenticated]
 
@@ -733,9 +748,9 @@ class SeatSlotView(APIView):
         except Restaurant.DoesNotExist:
             return Response({"error": "Restaurant profile not found."}, status=status.HTTP_404_NOT_FOUND)
 
+        fields = requested_fields(request)
         slots = SeatSlot.objects.filter(restaurant=restaurant)
-        serializer = SeatSlotSerializer(slots, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return self.conditional_list_response(request, slots, lambda: SeatSlotSerializer.values_data(slots, fields))
 
     def put(self, request, pk=None):
         if not pk:
@@ -771,7 +786,7 @@ class SeatSlotView(APIView):
         return Response({"message": "Slot deleted successfully."}, status=status.HTTP_204_NO_CONTENT)
 
 
-class GalleryView(APIView):
+class GalleryView(ConditionalListMixin, APIView):
     authentication_classes = [TokenAuthentication]
     permission_classes = [IsAuthenticated]
 
@@ -793,9 +808,9 @@ class GalleryView(APIView):
         except Restaurant.DoesNotExist:
             return Response({"error": "Restaurant profile not found."}, status=status.HTTP_404_NOT_FOUND)
 
-        gallery = Gallery.objects.filter(restaurant=restaurant)
-        serializer = GallerySerializer(gallery, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        fields = requested_fields(request)
+        gallery = GallerySerializer.narrow(Gallery.objects.filter(restaurant=restaurant), fields)
+        return self.conditional_list_response(request, gallery, lambda: GallerySerializer(gallery, many=True, fields=fields).data)
 
     def delete(self, request, pk=None):
         if not pk:
@@ -833,8 +848,9 @@ class PerformanceView(APIView):
         except Restaurant.DoesNotExist:
             return Response({"error": "Restaurant profile not found."}, status=status.HTTP_404_NOT_FOUND)
 
-        performances = Performance.objects.filter(restaurant=restaurant)
-        serializer = Performanceserializer(performances, many=True)
+        fields = requested_fields(request)
+        performances = Performanceserializer.narrow(Performance.objects.filter(restaurant=restaurant), fields)
+        serializer = Performanceserializer(performances, many=True, fields=fields)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
     def delete(self, request, pk=None):
@@ -871,7 +887,7 @@ class PerformanceView(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-class OfferView(APIView):
+class OfferView(ConditionalListMixin, APIView):
     authentication_classes = [TokenAuthentication]
     permission_classes = [IsAuthenticated]
 
@@ -893,9 +909,9 @@ class OfferView(APIView):
         except Restaurant.DoesNotExist:
             return Response({"error": "Restaurant profile not found."}, status=status.HTTP_404_NOT_FOUND)
 
-        offers = Offer.objects.filter(restaurant=restaurant)
-        serializer = OfferSerializer(offers, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        fields = requested_fields(request)
+        offers = OfferSerializer.narrow(Offer.objects.filter(restaurant=restaurant), fields)
+        return self.conditional_list_response(request, offers, lambda: OfferSerializer(offers, many=True, fields=fields).data)
 
     def delete(self, request, pk=None):
         if not pk:
@@ -953,8 +969,9 @@ class DiningOfferView(APIView):
         except Restaurant.DoesNotExist:
             return Response({"error": "Restaurant profile not found."}, status=status.HTTP_404_NOT_FOUND)
 
-        dining_offers = DiningOffer.objects.filter(restaurant=restaurant)
-        serializer = DiningOfferSerializer(dining_offers, many=True)
+        fields = requested_fields(request)
+        dining_offers = DiningOfferSerializer.narrow(DiningOffer.objects.filter(restaurant=restaurant), fields)
+        serializer = DiningOfferSerializer(dining_offers, many=True, fields=fields)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
     def delete(self, request, pk=None):
@@ -992,9 +1009,11 @@ class DiningOfferView(APIView):
 
 
 
-class TableOrderListView(APIView):
+class TableOrderListView(QuerysetOptimizerMixin, APIView):
     authentication_classes = [TokenAuthentication]
     permission_classes = [IsAuthenticated]
+    list_select_related = ('booking__user__user', 'menu', 'table')
+    export_fields = ['table_no', 'user', 'user_phone', 'created_at', 'special_request', 'items', 'total_bill']
 
     def get(self, request):
         try:
@@ -1002,44 +1021,82 @@ class TableOrderListView(APIView):
         except Restaurant.DoesNotExist:
             return Response({"error": "Restaurant not found."}, status=404)
 
-        menu_bookings = MenuBooking.objects.filter(table__restaurant=restaurant).select_related(
-            'booking__user__user', 'menu', 'table'
-        )
+        export_format = request.query_params.get('export')
+        if export_format and export_format not in EXPORT_CONTENT_TYPES:
+            return Response({"error": "export must be 'ndjson' or 'csv'."}, status=status.HTTP_400_BAD_REQUEST)
+
+        menu_bookings = self.optimize_queryset(MenuBooking.objects.filter(table__restaurant=restaurant))
+
+        # First special request per table, fetched once instead of once per order group.
+        special_requests = {}
+        for table_id, message in SpecialRequestMessage.objects.filter(
+            booking__table__restaurant=restaurant
+        ).order_by('id').values_list('booking__table_id', 'message'):
+            special_requests.setdefault(table_id, message)
+
+        if export_format:
+            # Ordered by group key, so each group is complete once the next one starts.
+            rows = self.iter_order_groups(
+                menu_bookings.order_by('table_id', 'booking_id', 'id').iterator(chunk_size=EXPORT_CHUNK_SIZE),
+                special_requests,
+            )
+            if export_format == 'csv':
+                rows = (self.flatten_order_group(group) for group in rows)
+            return export_response(rows, export_format, 'table-orders', self.export_fields)
 
         grouped_orders = {}
 
         for booking in menu_bookings:
-            key = f"{booking.table.id}_{booking.booking.id if booking.booking else 'null'}"
-
+            key = (booking.table_id, booking.booking_id)
             if key not in grouped_orders:
-                special_request = SpecialRequestMessage.objects.filter(booking__table=booking.table).first()
-
-                grouped_orders[key] = {
-                    "table_no": booking.table.table_number,
-                    "user": booking.booking.user.user.username if booking.booking else None,
-                    "user_phone": booking.booking.user.user.username if booking.booking else None,
-                    "created_at": localtime(booking.created_at).strftime("%Y-%m-%d %H:%M:%S"),
-                    "special_request": special_request.message if special_request else "",
-                    "menu": [],
-                    "total_bill": 0
-                }
+                grouped_orders[key] = self.new_order_group(booking, special_requests)
+            self.add_order_item(grouped_orders[key], booking)
 
-            grouped_orders[key]["menu"].append({
-                "menu_name": booking.menu.name,
-                "qty": booking.quantity,
-                "price": booking.menu.price,
-                "total": booking.quantity * booking.menu.price
-            })
+        return Response(list(grouped_orders.values()), status=200)
 
-            grouped_orders[key]["total_bill"] += booking.quantity * booking.menu.price
+    def new_order_group(self, booking, special_requests):
+        return {
+            "table_no": booking.table.table_number,
+            "user": booking.booking.user.user.username if booking.booking else None,
+            "user_phone": booking.booking.user.user.username if booking.booking else None,
+            "created_at": localtime(booking.created_at).strftime("%Y-%m-%d %H:%M:%S"),
+            "special_request": special_requests.get(booking.table_id, ""),
+            "menu": [],
+            "total_bill": 0
+        }
 
-        return Response(list(grouped_orders.values()), status=200)
+    def add_order_item(self, group, booking):
+        group["menu"].append({
+            "menu_name": booking.menu.name,
+            "qty": booking.quantity,
+            "price": booking.unit_price,
+            "total": booking.line_total
+        })
+        group["total_bill"] += booking.line_total
+
+    def iter_order_groups(self, menu_bookings, special_requests):
+        group, key = None, None
+        for booking in menu_bookings:
+            if (booking.table_id, booking.booking_id) != key:
+                if group:
+                    yield group
+                key = (booking.table_id, booking.booking_id)
+                group = self.new_order_group(booking, special_requests)
+            self.add_order_item(group, booking)
+        if group:
+            yield group
 
+    def flatten_order_group(self, group):
+        row = dict(group)
+        row["items"] = "; ".join(f"{item['qty']} x {item['menu_name']}" for item in group["menu"])
+        return row
 
 
 class SeatOrderListView(APIView):
     authentication_classes = [TokenAuthentication]
     permission_classes = [IsAuthenticated]
+    export_fields = ['booking_id', 'number_of_guests', 'date', 'time_slot', 'user_phone_number']
+    row_columns = ('id', 'number_of_guests', 'seat_slot__date', 'seat_slot__start_time', 'seat_slot__end_time', 'user__user__username')
 
     def get(self, request):
         try:
@@ -1047,21 +1104,127 @@ class SeatOrderListView(APIView):
         except Restaurant.DoesNotExist:
             return Response({"error": "Restaurant not found."}, status=404)
 
-        seat_bookings = SeatBooking.objects.filter(restaurant=restaurant).select_related(
-            'user__user', 'seat_slot'
-        )
+        export_format = request.query_params.get('export')
+        if export_format and export_format not in EXPORT_CONTENT_TYPES:
+            return Response({"error": "export must be 'ndjson' or 'csv'."}, status=status.HTTP_400_BAD_REQUEST)
 
-        data = []
-        for booking in seat_bookings:
-            data.append({
-                "booking_id": booking.id,
-                "number_of_guests": booking.number_of_guests,
-                "date": booking.seat_slot.date.strftime("%Y-%m-%d"),
-                "time_slot": f"{booking.seat_slot.start_time.strftime('%H:%M')} - {booking.seat_slot.end_time.strftime('%H:%M')}",
-                "user_phone_number": booking.user.user.username
-            })
+        # Plain tuples: each row needs six columns, not three model instances.
+        rows = SeatBooking.objects.filter(restaurant=restaurant).values_list(*self.row_columns)
+
+        if export_format:
+            rows = (
+                self.seat_order_row(row)
+                for row in rows.order_by('id').iterator(chunk_size=EXPORT_CHUNK_SIZE)
+            )
+            return export_response(rows, export_format, 'seat-bookings', self.export_fields)
+
+        data = [self.seat_order_row(row) for row in rows]
         return Response(data, status=200)
 
+    def seat_order_row(self, row):
+        booking_id, number_of_guests, date, start_time, end_time, username = row
+        return {
+            "booking_id": booking_id,
+            "number_of_guests": number_of_guests,
+            "date": date.strftime("%Y-%m-%d"),
+            "time_slot": f"{start_time.strftime('%H:%M')} - {end_time.strftime('%H:%M')}",
+            "user_phone_number": username
+        }
+
+
+class BillingExportView(APIView):
+    authentication_classes = [TokenAuthentication]
+    permission_classes = [IsAuthenticated]
+    export_fields = [
+        'billing_id', 'table_no', 'booking_id', 'total_menu_price', 'final_amount_to_pay',
+        'payment_status', 'complete_order', 'created_at',
+    ]
+
+    def get(self, request):
+        try:
+            restaurant = Restaurant.objects.get(user=request.user)
+        except Restaurant.DoesNotExist:
+            return Response({"error": "Restaurant not found."}, status=404)
+
+        export_format = request.query_params.get('export', 'ndjson')
+        if export_format not in EXPORT_CONTENT_TYPES:
+            return Response({"error": "export must be 'ndjson' or 'csv'."}, status=status.HTTP_400_BAD_REQUEST)
+
+        billings = Billing.objects.filter(
+            Q(table__restaurant=restaurant) | Q(booking__restaurant=restaurant)
+        ).select_related('table').order_by('created_at', 'id')
+
+        rows = (
+            {
+                "billing_id": billing.id,
+                "table_no": billing.table.table_number if billing.table else None,
+                "booking_id": billing.booking_id,
+                "total_menu_price": str(billing.total_menu_price),
+                "final_amount_to_pay": str(billing.final_amount_to_pay),
+                "payment_status": billing.payment_status,
+                "complete_order": billing.complete_order,
+                "created_at": localtime(billing.created_at).strftime("%Y-%m-%d %H:%M:%S"),
+            }
+            for billing in billings.iterator(chunk_size=EXPORT_CHUNK_SIZE)
+        )
+        return export_response(rows, export_format, 'billing-history', self.export_fields)
+
+
+class RestaurantAnalyticsView(APIView):
+    """Owner dashboard; reads only the daily rollup tables, never bookings or bills."""
+    authentication_classes = [TokenAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        try:
+            restaurant = Restaurant.objects.get(user=request.user)
+        except Restaurant.DoesNotExist:
+            return Response({"error": "Restaurant not found."}, status=404)
+
+        today = timezone.localdate()
+        try:
+            date_to = datetime.strptime(request.query_params['to'], "%Y-%m-%d").date() if 'to' in request.query_params else today
+            date_from = datetime.strptime(request.query_params['from'], "%Y-%m-%d").date() if 'from' in request.query_params else date_to - timedelta(days=29)
+        except ValueError:
+            return Response({"error": "from and to must be in YYYY-MM-DD format."}, status=status.HTTP_400_BAD_REQUEST)
+
+        if date_from > date_to:
+            return Response({"error": "from must not be after to."}, status=status.HTTP_400_BAD_REQUEST)
+
+        daily = DailyRestaurantStats.objects.filter(
+            restaurant=restaurant, date__range=(date_from, date_to)
+        ).order_by('date')
+        totals = daily.aggregate(covers=Sum('covers'), revenue=Sum('revenue'), bills=Sum('bills'))
+        revenue = (totals['revenue'] or Decimal('0')).quantize(Decimal('0.01'))
+        bills = totals['bills'] or 0
+
+        top_items = DailyMenuItemStats.objects.filter(
+            restaurant=restaurant, date__range=(date_from, date_to)
+        ).values('menu_id', 'menu_name').annotate(
+            quantity=Sum('quantity'), revenue=Sum('revenue')
+        ).order_by('-quantity', 'menu_name')[:10]
+
+        return Response({
+            "from": date_from.strftime("%Y-%m-%d"),
+            "to": date_to.strftime("%Y-%m-%d"),
+            "totals": {
+                "covers": totals['covers'] or 0,
+                "bills": bills,
+                "revenue": str(revenue),
+                "average_bill": str((revenue / bills).quantize(Decimal('0.01')) if bills else Decimal('0.00')),
+            },
+            "daily": DailyRestaurantStatsSerializer(daily, many=True).data,
+            "top_menu_items": [
+                {
+                    "menu_id": item['menu_id'],
+                    "menu_name": item['menu_name'],
+                    "quantity": item['quantity'],
+                    "revenue": str(item['revenue'].quantize(Decimal('0.01'))),
+                }
+                for item in top_items
+            ],
+        }, status=status.HTTP_200_OK)
+
 
 class SeatBookingDetailView(APIView):
     authentication_classes = [TokenAuthentication]
@@ -1109,38 +1272,66 @@ class NearbyRestaurantsView(APIView):
         except ValueError:
             return Response({"error": "Invalid coordinates."}, status=status.HTTP_400_BAD_REQUEST)
 
-        def haversine(lat1, lon1, lat2, lon2):
-            R = 6371
-            lat1, lon1, lat2, lon2 = map(radians, [lat1, lon1, lat2, lon2])
-            dlat = lat2 - lat1
-            dlon = lon2 - lon1
-            a = sin(dlat/2)**2 + cos(lat1)*cos(lat2)*sin(dlon/2)**2
-            return R * 2 * atan2(sqrt(a), sqrt(1-a))
-
-        located = []
-        unlocated = []
-
-        for r in Restaurant.objects.all():
-            entry = {
-                "id": r.id,
-                "name": r.name,
-                "location": r.location,
-                "image": r.image.url if r.image else None,
-                "food_type": r.food_type,
-                "average_bill_for_two": r.average_bill_for_two,
-                "map_link": r.map_link,
-            }
-            if r.latitude is not None and r.longitude is not None:
-                distance = haversine(user_lat, user_lng, float(r.latitude), float(r.longitude))
-                entry.update({
-                    "distance_km": round(distance, 1),
-                    "latitude": float(r.latitude),
-                    "longitude": float(r.longitude),
-                })
-                located.append(entry)
-            else:
-                entry.update({"distance_km": None, "latitude": None, "longitude": None})
-                unlocated.append(entry)
-
-        located.sort(key=lambda x: x['distance_km'])
-        return Response(located + unlocated, status=status.HTTP_200_OK)
\ No newline at end of file
+        params = request.query_params
+        try:
+            food_types = [value.strip() for value in params.get('food_type', '').split(',') if value.strip()]
+            min_bill = Decimal(params['min_bill']) if params.get('min_bill') else None
+            max_bill = Decimal(params['max_bill']) if params.get('max_bill') else None
+            radius_km = float(params['radius_km']) if params.get('radius_km') else None
+            limit = min(int(params.get('limit', DEFAULT_NEARBY_LIMIT)), MAX_NEARBY_LIMIT)
+        except (ValueError, ArithmeticError):
+            return Response({"error": "Invalid filter value."}, status=status.HTTP_400_BAD_REQUEST)
+        if limit < 1:
+            return Response({"error": "limit must be positive."}, status=status.HTTP_400_BAD_REQUEST)
+
+        results = nearby_restaurants(
+            user_lat, user_lng,
+            food_types=food_types,
+            min_bill=min_bill,
+            max_bill=max_bill,
+            open_now=params.get('open_now', '').lower() in ('1', 'true'),
+            has_offer=params.get('has_offer', '').lower() in ('1', 'true'),
+            radius_km=radius_km,
+            limit=limit,
+        )
+        return Response(results, status=status.HTTP_200_OK)
+
+
+class SearchView(APIView):
+    authentication_classes = [TokenAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            return Response({"error": "q is required."}, status=status.HTTP_400_BAD_REQUEST)
+
+        kind = request.query_params.get('type') or None
+        if kind is not None and kind not in SEARCH_KINDS:
+            return Response({"error": "type must be 'menu' or 'restaurant'."}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            limit = min(int(request.query_params.get('limit', DEFAULT_SEARCH_LIMIT)), MAX_SEARCH_LIMIT)
+        except ValueError:
+            return Response({"error": "limit must be an integer."}, status=status.HTTP_400_BAD_REQUEST)
+        if limit < 1:
+            return Response({"error": "limit must be positive."}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(search(query, kind=kind, limit=limit), status=status.HTTP_200_OK)
+
+
+class RestaurantBootstrapView(ConditionalListMixin, APIView):
+    """
+    Everything the owner app loads at startup in one response. The payload is
+    cached per restaurant version, and the version doubles as the ETag.
+    """
+    authentication_classes = [TokenAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        restaurant_id = Restaurant.objects.filter(user=request.user).values_list('pk', flat=True).first()
+        if restaurant_id is None:
+            return Response({"error": "Restaurant profile not found."}, status=status.HTTP_404_NOT_FOUND)
+
+        version = get_version(restaurant_id)
+        return self.conditional_response(request, quote_etag(version), lambda: get_bootstrap(restaurant_id, version))
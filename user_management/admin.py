@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import CustomerProfile, Booking, MenuBooking, Billing, SeatBooking, SpecialRequestForSeat, SpecialRequestMessage, Review, Notification, Address
+from .models import CustomerProfile, Booking, MenuBooking, Billing, SeatBooking, SpecialRequestForSeat, SpecialRequestMessage, Review, Notification, Address, WebhookEvent, TableSession, IdempotencyRecord
 
 admin.site.register(CustomerProfile)
 admin.site.register(Booking)
@@ -11,5 +11,8 @@ admin.site.register(SpecialRequestMessage)
 admin.site.register(Review)
 admin.site.register(Notification)
 admin.site.register(Address)
+admin.site.register(WebhookEvent)
+admin.site.register(TableSession)
+admin.site.register(IdempotencyRecord)
 # admin.site.register(server)
 
@@ -0,0 +1,80 @@
+import hashlib
+
+from django.core.cache import cache
+from django.db.models import Q
+from django.utils import timezone
+
+from restaurant.discovery import nearby_restaurants, haversine
+from restaurant.models import Offer
+from restaurant.serializers import OfferSerializer
+
+from .models import SeatBooking
+from .serializers import SeatBookingSerializer
+
+HOME_NEARBY_LIMIT = 20
+HOME_RADIUS_KM = 10
+HOME_BOOKINGS_LIMIT = 10
+# Three decimals is ~110m: close enough that nearby users share one cache entry.
+COORDINATE_PRECISION = 3
+NEARBY_CACHE_TIMEOUT = 5 * 60
+# Offers switch on and off on their daily time windows, so keep this short.
+OFFERS_CACHE_TIMEOUT = 60
+
+
+def get_nearby(latitude, longitude):
+    """
+    The nearby section, computed once per coordinate cell and shared by every user
+    in it. Distances are then recomputed from the caller's exact position.
+    """
+    cell = (round(latitude, COORDINATE_PRECISION), round(longitude, COORDINATE_PRECISION))
+    key = f'customer-home:nearby:{cell[0]}:{cell[1]}'
+    restaurants = cache.get(key)
+    if restaurants is None:
+        restaurants = nearby_restaurants(*cell, radius_km=HOME_RADIUS_KM, limit=HOME_NEARBY_LIMIT)
+        cache.set(key, restaurants, timeout=NEARBY_CACHE_TIMEOUT)
+
+    results = []
+    for entry in restaurants:
+        entry = dict(entry)
+        entry['distance_km'] = round(haversine(latitude, longitude, entry['latitude'], entry['longitude']), 1)
+        results.append(entry)
+    results.sort(key=lambda entry: entry['distance_km'])
+    return results
+
+
+def get_offers(restaurant_ids):
+    """Currently applicable offers for the given restaurants, in one query."""
+    if not restaurant_ids:
+        return []
+    ids = sorted(restaurant_ids)
+    key = 'customer-home:offers:' + hashlib.md5(
+        ','.join(map(str, ids)).encode('utf-8'), usedforsecurity=False,
+    ).hexdigest()
+    offers = cache.get(key)
+    if offers is None:
+        queryset = Offer.objects.currently_applicable().filter(restaurant_id__in=ids).order_by('restaurant_id', '-discount_percentage')
+        offers = OfferSerializer(queryset, many=True).data
+        cache.set(key, offers, timeout=OFFERS_CACHE_TIMEOUT)
+    return offers
+
+
+def get_upcoming_bookings(profile, now=None):
+    """The personalized section; never cached."""
+    local = timezone.localtime(now or timezone.now())
+    bookings = (
+        SeatBooking.objects
+        .filter(user=profile)
+        .exclude(payment_status='failed')
+        .filter(Q(seat_slot__date__gt=local.date()) | Q(seat_slot__date=local.date(), seat_slot__end_time__gt=local.time()))
+        .order_by('seat_slot__date', 'seat_slot__start_time')[:HOME_BOOKINGS_LIMIT]
+    )
+    return SeatBookingSerializer(bookings, many=True).data
+
+
+def build_home(profile, latitude, longitude):
+    nearby = get_nearby(latitude, longitude)
+    return {
+        'nearby': nearby,
+        'offers': get_offers([entry['id'] for entry in nearby]),
+        'upcoming_bookings': get_upcoming_bookings(profile),
+    }
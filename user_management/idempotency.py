@@ -0,0 +1,131 @@
+import hashlib
+import json
+from datetime import timedelta
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+
+from .models import IdempotencyRecord
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+MAX_KEY_LENGTH = 255
+CACHE_PREFIX = 'idempotency:'
+
+
+def _ttl():
+    return getattr(settings, 'IDEMPOTENCY_TTL', 24 * 60 * 60)
+
+
+def _lock_timeout():
+    return getattr(settings, 'IDEMPOTENCY_LOCK_TIMEOUT', 60)
+
+
+def _reclaimable(now):
+    """Expired records, and in-flight ones whose request died without finishing."""
+    abandoned = Q(status_code__isnull=True, created_at__lte=now - timedelta(seconds=_lock_timeout()))
+    return Q(expires_at__lte=now) | abandoned
+
+
+def _cache_key(user_id, method, path, key):
+    scope = f"{user_id}:{method}:{path}:{key}"
+    return CACHE_PREFIX + hashlib.sha256(scope.encode('utf-8')).hexdigest()
+
+
+def _replay(entry, request_hash):
+    if entry['request_hash'] != request_hash:
+        return Response(
+            {"error": f"{IDEMPOTENCY_HEADER} was already used with a different request."},
+            status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        )
+    if entry['status_code'] is None:
+        return Response(
+            {"error": f"A request with this {IDEMPOTENCY_HEADER} is still being processed."},
+            status=status.HTTP_409_CONFLICT,
+        )
+    return Response(entry['response_body'], status=entry['status_code'], headers={'Idempotent-Replayed': 'true'})
+
+
+def _entry(record):
+    return {
+        'request_hash': record.request_hash,
+        'status_code': record.status_code,
+        'response_body': record.response_body,
+    }
+
+
+def idempotent(view_method):
+    """
+    For APIView POST handlers. A request carrying an Idempotency-Key runs once per
+    user, endpoint and key; retries within IDEMPOTENCY_TTL get the stored response
+    back (cache first, database as the durable fallback) without running the
+    handler again. 5xx responses and exceptions are not stored, so those can be
+    retried; so can a key whose request died mid-flight, after
+    IDEMPOTENCY_LOCK_TIMEOUT.
+    """
+    @wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        if not key:
+            return view_method(self, request, *args, **kwargs)
+        if len(key) > MAX_KEY_LENGTH:
+            return Response({"error": f"{IDEMPOTENCY_HEADER} is too long."}, status=status.HTTP_400_BAD_REQUEST)
+
+        user_id, method, path = request.user.pk, request.method, request.path
+        request_hash = hashlib.sha256(request.body).hexdigest()
+        cache_key = _cache_key(user_id, method, path, key)
+        now = timezone.now()
+
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return _replay(cached, request_hash)
+
+        # Reserve the key; the unique constraint makes concurrent retries lose here.
+        try:
+            with transaction.atomic():
+                IdempotencyRecord.objects.filter(
+                    _reclaimable(now), user_id=user_id, method=method, path=path, key=key,
+                ).delete()
+                record = IdempotencyRecord.objects.create(
+                    user_id=user_id, method=method, path=path, key=key,
+                    request_hash=request_hash, expires_at=now + timedelta(seconds=_ttl()),
+                )
+        except IntegrityError:
+            existing = IdempotencyRecord.objects.filter(user_id=user_id, method=method, path=path, key=key).first()
+            if existing is None:
+                return Response(
+                    {"error": f"A request with this {IDEMPOTENCY_HEADER} is still being processed."},
+                    status=status.HTTP_409_CONFLICT,
+                )
+            if existing.status_code is not None:
+                cache.set(cache_key, _entry(existing), timeout=max(int((existing.expires_at - now).total_seconds()), 1))
+            return _replay(_entry(existing), request_hash)
+
+        try:
+            response = view_method(self, request, *args, **kwargs)
+        except Exception:
+            record.delete()
+            raise
+
+        if response.status_code >= 500 or not hasattr(response, 'data'):
+            record.delete()
+            return response
+
+        record.status_code = response.status_code
+        record.response_body = json.loads(json.dumps(response.data, cls=JSONEncoder))
+        record.save(update_fields=['status_code', 'response_body'])
+        cache.set(cache_key, _entry(record), timeout=_ttl())
+        return response
+
+    return wrapper
+
+
+def purge_expired():
+    deleted, _ = IdempotencyRecord.objects.filter(_reclaimable(timezone.now())).delete()
+    return deleted
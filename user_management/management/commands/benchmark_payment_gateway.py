@@ -0,0 +1,85 @@
+import json
+import statistics
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import razorpay
+from django.core.management.base import BaseCommand
+from user_management.payments import RazorpayGateway
+
+
+class _StubOrdersHandler(BaseHTTPRequestHandler):
+    """Answers every POST like Razorpay's /v1/orders, over keep-alive connections."""
+    protocol_version = 'HTTP/1.1'
+    # Headers and body go out as separate writes; without this, Nagle + delayed ACK add ~40ms per keep-alive request.
+    disable_nagle_algorithm = True
+    latency = 0
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+        if self.latency:
+            time.sleep(self.latency)
+        body = json.dumps({'id': f"order_{uuid.uuid4().hex[:14]}", 'entity': 'order', 'status': 'created', **payload}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare order creation with a new razorpay.Client per request against the shared pooled '
+        'gateway, using a local stub of the Razorpay orders API (no network or credentials needed).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=300)
+        parser.add_argument('--concurrency', type=int, default=8)
+        parser.add_argument('--latency', type=float, default=0.0, help='Simulated server time per order, in seconds.')
+
+    def handle(self, *args, **options):
+        handler = type('Handler', (_StubOrdersHandler,), {'latency': options['latency']})
+        server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base_url = f"http://127.0.0.1:{server.server_address[1]}/v1"
+        auth = ('rzp_test_bench', 'secret')
+
+        def per_request_client(i):
+            client = razorpay.Client(auth=auth, base_url=base_url)
+            return client.order.create({'amount': 10000, 'currency': 'INR', 'receipt': f'bench_{i}', 'notes': {}})
+
+        gateway = RazorpayGateway(key_id=auth[0], key_secret=auth[1], base_url=base_url, pool_size=options['concurrency'])
+
+        def shared_gateway(i):
+            return gateway.create_order(amount=10000, receipt=f'bench_{i}', notes={})
+
+        try:
+            for label, create in (('new client per request', per_request_client), ('shared pooled gateway', shared_gateway)):
+                self.run(label, create, options['requests'], options['concurrency'])
+        finally:
+            server.shutdown()
+
+        self.stdout.write(f"Gateway metrics: {gateway.metrics.snapshot()}")
+
+    def run(self, label, create, total, concurrency):
+        def timed(i):
+            started = time.perf_counter()
+            create(i)
+            return time.perf_counter() - started
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            latencies = sorted(pool.map(timed, range(total)))
+        wall = time.perf_counter() - started
+
+        self.stdout.write(
+            f"{label}: {total / wall:.0f} orders/s, p50={statistics.median(latencies) * 1000:.2f}ms "
+            f"p95={latencies[int(total * 0.95) - 1] * 1000:.2f}ms"
+        )
@@ -0,0 +1,23 @@
+import time
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from user_management.webhooks import process_pending_events, WEBHOOK_BATCH_SIZE
+
+
+class Command(BaseCommand):
+    help = 'Process stored payment webhook events (once, or continuously with --loop)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help='Keep polling for new events.')
+        parser.add_argument('--interval', type=float, default=1.0, help='Seconds to sleep when nothing is due.')
+        parser.add_argument('--limit', type=int, default=WEBHOOK_BATCH_SIZE, help='Events per batch.')
+
+    def handle(self, *args, **options):
+        while True:
+            counts = process_pending_events(limit=options['limit'])
+            if counts:
+                self.stdout.write(f"[{timezone.now()}] {counts}")
+            if not options['loop']:
+                break
+            if not counts:
+                time.sleep(options['interval'])
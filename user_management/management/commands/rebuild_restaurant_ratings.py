@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, Sum
+from restaurant.models import Restaurant
+from user_management.models import Review
+
+
+class Command(BaseCommand):
+    help = 'Recompute the stored rating_avg/rating_count of every restaurant from its reviews'
+
+    def handle(self, *args, **options):
+        totals = {
+            row['restaurant']: (row['total'], row['count'])
+            for row in Review.objects.values('restaurant').annotate(total=Sum('stars'), count=Count('id'))
+        }
+
+        restaurants = list(Restaurant.objects.only('id', 'rating_avg', 'rating_count', 'rating_total'))
+        for restaurant in restaurants:
+            total, count = totals.get(restaurant.id, (0, 0))
+            restaurant.set_rating(total, count)
+
+        Restaurant.objects.bulk_update(restaurants, ['rating_avg', 'rating_count', 'rating_total'], batch_size=500)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt ratings for {len(restaurants)} restaurants."))
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from user_management.models import WebhookEvent
+
+
+class Command(BaseCommand):
+    help = 'Re-queue stored webhook events so the worker processes them again'
+
+    def add_arguments(self, parser):
+        parser.add_argument('event_ids', nargs='*', help='Event ids to replay.')
+        parser.add_argument('--status', choices=['processed', 'rejected', 'failed'], help='Replay every event with this status.')
+        parser.add_argument('--since', help='Only events received at or after this ISO timestamp.')
+
+    def handle(self, *args, **options):
+        if not options['event_ids'] and not options['status']:
+            raise CommandError("Pass event ids or --status.")
+
+        events = WebhookEvent.objects.exclude(status__in=['pending', 'processing'])
+        if options['event_ids']:
+            events = events.filter(event_id__in=options['event_ids'])
+        if options['status']:
+            events = events.filter(status=options['status'])
+        if options['since']:
+            since = parse_datetime(options['since'])
+            if since is None:
+                raise CommandError("--since must be an ISO timestamp.")
+            events = events.filter(received_at__gte=since)
+
+        count = events.update(status='pending', attempts=0, result='', processed_at=None, next_attempt_at=timezone.now())
+        self.stdout.write(self.style.SUCCESS(f"Re-queued {count} webhook events."))
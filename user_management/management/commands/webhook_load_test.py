@@ -0,0 +1,114 @@
+import hashlib
+import hmac
+import json
+import random
+import statistics
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import requests as req
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.urls import reverse
+from user_management.models import WebhookEvent
+from user_management.webhooks import process_pending_events
+
+LOAD_TEST_PREFIX = 'loadtest-'
+
+
+class Command(BaseCommand):
+    help = (
+        'Fire bursts of signed Razorpay-style webhook events at the webhook endpoint and report '
+        'ingest latency, then optionally time the worker draining them. Events use the '
+        '"loadtest.ping" type, which the worker acknowledges without touching bookings or bills.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', help='Webhook URL of a running server. Defaults to an in-process test client.')
+        parser.add_argument('--bursts', type=int, default=5)
+        parser.add_argument('--burst-size', type=int, default=200)
+        parser.add_argument('--concurrency', type=int, default=8, help='Parallel senders (only with --url).')
+        parser.add_argument('--duplicate-rate', type=float, default=0.1, help='Share of events redelivered.')
+        parser.add_argument('--keys', type=int, default=50, help='Distinct booking ids to spread events over.')
+        parser.add_argument('--process', action='store_true', help='Drain the inbox afterwards and time it.')
+        parser.add_argument('--cleanup', action='store_true', help='Delete load-test events at the end.')
+
+    def handle(self, *args, **options):
+        if not settings.RAZORPAY_WEBHOOK_SECRET:
+            raise CommandError("RAZORPAY_WEBHOOK_SECRET must be set to sign events.")
+
+        url = options['url']
+        client = None if url else Client()
+        path = reverse('razorpay-webhook')
+
+        def deliver(delivery):
+            event_id, body = delivery
+            signature = hmac.new(settings.RAZORPAY_WEBHOOK_SECRET.encode('utf-8'), body, hashlib.sha256).hexdigest()
+            headers = {'X-Razorpay-Signature': signature, 'X-Razorpay-Event-Id': event_id}
+            started = time.perf_counter()
+            if url:
+                status_code = req.post(url, data=body, headers={**headers, 'Content-Type': 'application/json'}, timeout=10).status_code
+            else:
+                status_code = client.post(
+                    path, data=body, content_type='application/json',
+                    HTTP_X_RAZORPAY_SIGNATURE=signature, HTTP_X_RAZORPAY_EVENT_ID=event_id,
+                ).status_code
+            return time.perf_counter() - started, status_code
+
+        latencies, errors, sent = [], 0, 0
+        wall_started = time.perf_counter()
+        for _ in range(options['bursts']):
+            burst = [self.make_event(options['keys']) for _ in range(options['burst_size'])]
+            burst += random.sample(burst, int(len(burst) * options['duplicate_rate']))
+            random.shuffle(burst)
+
+            if url:
+                with ThreadPoolExecutor(max_workers=options['concurrency']) as pool:
+                    results = list(pool.map(deliver, burst))
+            else:
+                results = [deliver(delivery) for delivery in burst]
+
+            sent += len(burst)
+            latencies += [elapsed for elapsed, _ in results]
+            errors += sum(1 for _, status_code in results if status_code != 200)
+        wall = time.perf_counter() - wall_started
+
+        latencies.sort()
+        stored = WebhookEvent.objects.filter(event_id__startswith=LOAD_TEST_PREFIX).count()
+        self.stdout.write(
+            f"Sent {sent} deliveries in {wall:.2f}s ({sent / wall:.0f}/s), {errors} non-200, {stored} stored events. "
+            f"Ingest latency p50={self.ms(statistics.median(latencies))} "
+            f"p95={self.ms(latencies[int(len(latencies) * 0.95) - 1])} max={self.ms(latencies[-1])}"
+        )
+
+        if options['process']:
+            started = time.perf_counter()
+            totals = {}
+            while True:
+                counts = process_pending_events(limit=500)
+                if not counts:
+                    break
+                for outcome, count in counts.items():
+                    totals[outcome] = totals.get(outcome, 0) + count
+            self.stdout.write(f"Worker drained the inbox in {time.perf_counter() - started:.2f}s: {totals}")
+
+        if options['cleanup']:
+            deleted, _ = WebhookEvent.objects.filter(event_id__startswith=LOAD_TEST_PREFIX).delete()
+            self.stdout.write(f"Deleted {deleted} load-test events.")
+
+    def make_event(self, keys):
+        payload = {
+            'event': 'loadtest.ping',
+            'payload': {'payment': {'entity': {
+                'id': f"pay_{uuid.uuid4().hex[:14]}",
+                'amount': 10000,
+                'notes': {'booking_id': f"{LOAD_TEST_PREFIX}{random.randint(1, keys)}"},
+            }}},
+        }
+        return f"{LOAD_TEST_PREFIX}{uuid.uuid4().hex}", json.dumps(payload).encode('utf-8')
+
+    @staticmethod
+    def ms(seconds):
+        return f"{seconds * 1000:.1f}ms"
@@ -0,0 +1,47 @@
+# Generated by Django 5.1.7
+
+from django.db import migrations, models
+
+BATCH_SIZE = 500
+
+
+def backfill_price_snapshots(apps, schema_editor):
+    MenuBooking = apps.get_model('user_management', 'MenuBooking')
+    pending = (
+        MenuBooking.objects.filter(unit_price__isnull=True)
+        .select_related('menu')
+        .only('id', 'quantity', 'menu__price')
+        .order_by('pk')
+    )
+
+    batch = []
+    for item in pending.iterator(chunk_size=BATCH_SIZE):
+        item.unit_price = item.menu.price
+        item.line_total = item.menu.price * item.quantity
+        batch.append(item)
+        if len(batch) >= BATCH_SIZE:
+            MenuBooking.objects.bulk_update(batch, ['unit_price', 'line_total'])
+            batch = []
+    if batch:
+        MenuBooking.objects.bulk_update(batch, ['unit_price', 'line_total'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user_management', '0031_alter_billing_table'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='menubooking',
+            name='unit_price',
+            field=models.DecimalField(decimal_places=2, max_digits=10, null=True),
+        ),
+        migrations.AddField(
+            model_name='menubooking',
+            name='line_total',
+            field=models.DecimalField(decimal_places=2, max_digits=12, null=True),
+        ),
+        migrations.RunPython(backfill_price_snapshots, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.7
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user_management', '0032_menubooking_unit_price_menubooking_line_total'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='menubooking',
+            name='unit_price',
+            field=models.DecimalField(decimal_places=2, max_digits=10),
+        ),
+        migrations.AlterField(
+            model_name='menubooking',
+            name='line_total',
+            field=models.DecimalField(decimal_places=2, max_digits=12),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.7
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user_management', '0033_alter_menubooking_unit_price_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='notification',
+            name='type',
+            field=models.CharField(choices=[('special_request', 'Special Request'), ('refund_request', 'Refund Request'), ('kitchen_order', 'Kitchen Order')], default='special_request', max_length=20),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.1.7 on 2026-10-19 13:29
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('restaurant', '0038_openingwindow'),
+        ('user_management', '0035_webhookevent'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TableSession',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('is_active', models.BooleanField(default=True)),
+                ('started_at', models.DateTimeField(auto_now_add=True)),
+                ('ended_at', models.DateTimeField(blank=True, null=True)),
+                ('customer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='table_sessions', to='user_management.customerprofile')),
+                ('table', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sessions', to='restaurant.table')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['table', 'customer', 'is_active'], name='user_manage_table_i_52b7bb_idx')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('is_active', True)), fields=('table',), name='unique_active_table_session')],
+            },
+        ),
+    ]
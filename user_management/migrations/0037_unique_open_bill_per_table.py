@@ -0,0 +1,35 @@
+# Generated by Django 5.1.7 on 2026-10-19 13:31
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def close_duplicate_open_bills(apps, schema_editor):
+    """
+    Keep one open bill per table (a paid one if any, else the oldest, which is the
+    one .first() used to return) and close the rest so the constraint can be added.
+    """
+    Billing = apps.get_model('user_management', 'Billing')
+    duplicated = (
+        Billing.objects.filter(complete_order=False, table__isnull=False)
+        .values('table_id').annotate(n=Count('id')).filter(n__gt=1).values_list('table_id', flat=True)
+    )
+    for table_id in list(duplicated):
+        bills = list(Billing.objects.filter(table_id=table_id, complete_order=False).order_by('id'))
+        keep = next((bill for bill in bills if bill.payment_status == 'success'), bills[0])
+        Billing.objects.filter(pk__in=[bill.pk for bill in bills if bill.pk != keep.pk]).update(complete_order=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user_management', '0036_tablesession'),
+    ]
+
+    operations = [
+        migrations.RunPython(close_duplicate_open_bills, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='billing',
+            constraint=models.UniqueConstraint(condition=models.Q(('complete_order', False)), fields=('table',), name='unique_open_bill_per_table'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.1.7 on 2026-10-19 13:56
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user_management', '0038_idempotencyrecord'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='review',
+            name='stars',
+            field=models.PositiveIntegerField(validators=[django.core.validators.MinValueValidator(1), django.core.validators.MaxValueValidator(5)]),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.1.7 on 2026-10-19 14:03
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def pin_items_to_completed_bills(apps, schema_editor):
+    """
+    Walk-in items ordered before a completed table bill was closed belong to it;
+    oldest bill first, so each takes only what the previous one left.
+    """
+    Billing = apps.get_model('user_management', 'Billing')
+    MenuBooking = apps.get_model('user_management', 'MenuBooking')
+    completed = Billing.objects.filter(complete_order=True, booking__isnull=True, table__isnull=False).order_by('updated_at', 'id')
+    for bill in completed.iterator():
+        MenuBooking.objects.filter(
+            table_id=bill.table_id, booking__isnull=True, billing__isnull=True, created_at__lte=bill.updated_at,
+        ).update(billing=bill)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user_management', '0039_review_stars_range'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='menubooking',
+            name='billing',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='items', to='user_management.billing'),
+        ),
+        migrations.RunPython(pin_items_to_completed_bills, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,7 @@
-from django.db import models
+from django.db import models, transaction, IntegrityError
+from django.db.models import Sum
 from django.contrib.auth.models import User
+from django.core.validators import MinValueValidator, MaxValueValidator
 from restaurant.models import Restaurant, Table, Menu, Payment, Timing, SeatSlot, Offer, Payment
 from decimal import Decimal
 from django.utils import timezone
@@ -80,7 +82,7 @@ class SeatBooking(models.Model):
 
         total = per_guest * self.number_of_guests
 
-        if self.offer and self.offer.is_active:
+        if self.offer_id and Offer.objects.currently_applicable().filter(pk=self.offer_id, restaurant_id=self.restaurant_id).exists():
             total -= total * (self.offer.discount_percentage / Decimal(100))
 
         self.total_advance_payment = total
@@ -103,19 +105,82 @@ class MenuBooking(models.Model):
     booking = models.ForeignKey(SeatBooking, on_delete=models.CASCADE, related_name='menu_items', null=True, blank=True)
     table = models.ForeignKey(Table, on_delete=models.CASCADE, related_name='menu_bookings')
     menu = models.ForeignKey(Menu, on_delete=models.CASCADE, related_name='menu_bookings')
+    # Set when the bill is completed, so the table's next bill starts empty.
+    billing = models.ForeignKey('Billing', on_delete=models.SET_NULL, related_name='items', null=True, blank=True)
     quantity = models.PositiveIntegerField(default=1)
     special_note = models.TextField(blank=True, null=True)
+    # Snapshotted at order time so bills don't change (or need a Menu join) when prices do.
+    unit_price = models.DecimalField(max_digits=10, decimal_places=2)
+    line_total = models.DecimalField(max_digits=12, decimal_places=2)
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    def snapshot_price(self, menu_price=None):
+        if self.unit_price is None:
+            self.unit_price = menu_price if menu_price is not None else self.menu.price
+        self.line_total = Decimal(self.unit_price) * self.quantity
+
+    def save(self, *args, **kwargs):
+        self.snapshot_price()
+        super().save(*args, **kwargs)
+
     def total_price(self):
-        return self.menu.price * self.quantity
+        return self.line_total
 
     def __str__(self):
         return f"{self.quantity} x {self.menu.name}"
 
 
+class TableSession(models.Model):
+    """The diner who claimed a table by scanning its QR; other phones are refused until it ends."""
+    table = models.ForeignKey(Table, on_delete=models.CASCADE, related_name='sessions')
+    customer = models.ForeignKey(CustomerProfile, on_delete=models.CASCADE, related_name='table_sessions')
+    is_active = models.BooleanField(default=True)
+    started_at = models.DateTimeField(auto_now_add=True)
+    ended_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['table'], condition=models.Q(is_active=True), name='unique_active_table_session'),
+        ]
+        indexes = [models.Index(fields=['table', 'customer', 'is_active'])]
+
+    def __str__(self):
+        return f"Table {self.table_id} session for {self.customer_id}"
+
+    @classmethod
+    def claim(cls, table_id, customer):
+        """
+        True if `customer` may order on the table: either they already hold its
+        session (one indexed lookup) or they just won it with a conditional UPDATE.
+        Winning means the table was free, so any session still marked active was
+        left behind (e.g. booking_status cleared by hand) and is ended.
+        """
+        if cls.objects.filter(table_id=table_id, customer=customer, is_active=True).exists():
+            return True
+        try:
+            with transaction.atomic():
+                now = timezone.now()
+                won = Table.objects.filter(pk=table_id, booking_status=False).update(
+                    booking_status=True, updated_at=now
+                )
+                if not won:
+                    return False
+                cls.objects.filter(table_id=table_id, is_active=True).update(is_active=False, ended_at=now)
+                cls.objects.create(table_id=table_id, customer=customer)
+        except IntegrityError:
+            return False
+        return True
+
+    @classmethod
+    def release(cls, table_id):
+        now = timezone.now()
+        with transaction.atomic():
+            cls.objects.filter(table_id=table_id, is_active=True).update(is_active=False, ended_at=now)
+            Table.objects.filter(pk=table_id).update(booking_status=False, updated_at=now)
+
+
 class Billing(models.Model):
     PAYMENT_STATUS_CHOICES = [
         ('pending', 'Pending'),
@@ -133,11 +198,28 @@ class Billing(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    AMOUNT_FIELDS = {'total_menu_price', 'final_amount_to_pay'}
+
+    class Meta:
+        constraints = [
+            # A table has at most one open bill; booking is already one-to-one.
+            models.UniqueConstraint(fields=['table'], condition=models.Q(complete_order=False), name='unique_open_bill_per_table'),
+        ]
+
+    def line_items(self):
+        """
+        A booking's items, else the table's walk-in items: the ones pinned to this
+        bill once it's completed, or the not yet billed ones while it's open.
+        """
+        if self.booking_id:
+            return MenuBooking.objects.filter(booking_id=self.booking_id)
+        if self.complete_order:
+            return MenuBooking.objects.filter(billing=self)
+        return MenuBooking.objects.filter(table_id=self.table_id, booking__isnull=True, billing__isnull=True)
+
     def calculate_total_menu_price(self):
-        if self.booking:
-            total = sum(item.total_price() for item in self.booking.menu_items.all())
-        else:
-            total = sum(item.total_price() for item in self.table.menu_bookings.all())
+        total = self.line_items().aggregate(total=Sum('line_total'))['total'] or Decimal('0.00')
+        total = Decimal(total).quantize(Decimal('0.01'))
         self.total_menu_price = total
         return total
 
@@ -150,15 +232,89 @@ class Billing(models.Model):
         return self.final_amount_to_pay
 
     def release_table_if_completed(self):
-        if self.complete_order:
-            table = self.table
-            table.booking_status = False
-            table.save()
+        if self.complete_order and self.table_id:
+            with transaction.atomic():
+                if not self.booking_id:
+                    MenuBooking.objects.filter(
+                        table_id=self.table_id, booking__isnull=True, billing__isnull=True
+                    ).update(billing=self)
+                TableSession.release(self.table_id)
 
     def save(self, *args, **kwargs):
-        self.calculate_final_amount()
+        # Status-only saves (update_fields without amounts) skip the line-item aggregate.
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or self.AMOUNT_FIELDS.intersection(update_fields):
+            self.calculate_final_amount()
         super().save(*args, **kwargs)
-        self.release_table_if_completed()
+        if update_fields is None or 'complete_order' in update_fields:
+            self.release_table_if_completed()
+
+    def refresh_totals(self):
+        self.save(update_fields=['total_menu_price', 'final_amount_to_pay', 'updated_at'])
+
+    @classmethod
+    def refresh_open(cls, booking_id=None, table_id=None):
+        """
+        Recompute the unpaid, open bills that a change to these line items affects.
+        Pass table_id only for table-scoped items (no booking): a booking's items
+        are billed on the booking's bill alone.
+        """
+        lookup = models.Q(pk__in=[])
+        if booking_id:
+            lookup |= models.Q(booking_id=booking_id)
+        if table_id:
+            lookup |= models.Q(table_id=table_id)
+        bills = cls.objects.filter(lookup, complete_order=False).exclude(payment_status='success')
+        for billing in bills:
+            billing.refresh_totals()
+
+    @classmethod
+    def find_open(cls, booking_id=None, table_id=None):
+        """
+        The booking's bill, else the table's open bill, in one indexed query. For a
+        booking, the table's bill only counts if no other booking owns it.
+        """
+        lookup = models.Q(pk__in=[])
+        if booking_id:
+            lookup |= models.Q(booking_id=booking_id)
+        if table_id:
+            table_bill = models.Q(table_id=table_id, complete_order=False)
+            if booking_id:
+                table_bill &= models.Q(booking__isnull=True)
+            lookup |= table_bill
+        return cls.objects.filter(lookup).order_by(
+            models.Case(models.When(booking_id=booking_id, then=0), default=1) if booking_id else 'pk', 'pk'
+        ).first()
+
+    @classmethod
+    def get_or_create_open(cls, booking=None, table=None):
+        """
+        Returns (billing, created). Concurrent callers racing to create the same bill
+        hit the unique constraints; the loser re-reads the winner's row.
+        """
+        booking_id = booking.id if booking else None
+        table_id = table.id if table else None
+        billing = cls.find_open(booking_id, table_id)
+        if billing is None:
+            try:
+                with transaction.atomic():
+                    return cls.objects.create(booking=booking, table=table), True
+            except IntegrityError:
+                billing = cls.find_open(booking_id, table_id)
+            if billing is None and booking and table:
+                # The table's open bill is another booking's; this booking is billed apart from it.
+                return cls.get_or_create_open(booking=booking)
+
+        update_fields = []
+        if booking and not billing.booking_id:
+            billing.booking = booking
+            update_fields.append('booking')
+        if table and not billing.table_id and not cls.objects.filter(table=table, complete_order=False).exists():
+            billing.table = table
+            update_fields.append('table')
+        if update_fields:
+            billing.save(update_fields=update_fields + ['updated_at'])
+        return billing, False
 
     # def __str__(self):
     #     return f"Billing for table #{self.table.id} - Final: ₹{self.final_amount_to_pay}"
@@ -170,7 +326,7 @@ class Billing(models.Model):
 class Review(models.Model):
     user = models.ForeignKey(CustomerProfile, on_delete=models.CASCADE, related_name='reviews')
     restaurant = models.ForeignKey(Restaurant, on_delete=models.CASCADE, related_name='reviews')
-    stars = models.PositiveIntegerField()
+    stars = models.PositiveIntegerField(validators=[MinValueValidator(1), MaxValueValidator(5)])
     description = models.TextField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
@@ -200,6 +356,7 @@ class Notification(models.Model):
     NOTIFICATION_TYPE_CHOICES = [
     ('special_request', 'Special Request'),
     ('refund_request', 'Refund Request'),
+    ('kitchen_order', 'Kitchen Order'),
     ]
 
     restaurant = models.ForeignKey(Restaurant, on_delete=models.CASCADE, related_name='notifications')
@@ -272,3 +429,54 @@ class PlatformSettings(models.Model):
         obj, created = cls.objects.get_or_create(pk=1)
         return obj
 
+
+
+class WebhookEvent(models.Model):
+    """Inbox for payment webhooks: stored on receipt, processed later by the worker."""
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('processing', 'Processing'),
+        ('processed', 'Processed'),
+        ('rejected', 'Rejected'),
+        ('failed', 'Failed'),
+    ]
+
+    event_id = models.CharField(max_length=100, unique=True)
+    event_type = models.CharField(max_length=50, blank=True)
+    # Events sharing a key (e.g. "booking:12") are processed strictly in arrival order.
+    ordering_key = models.CharField(max_length=64, blank=True, db_index=True)
+    body = models.TextField()
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    result = models.TextField(blank=True)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    received_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['status', 'next_attempt_at'])]
+
+    def __str__(self):
+        return f"{self.event_type} {self.event_id} ({self.status})"
+
+
+class IdempotencyRecord(models.Model):
+    """First response to a POST carrying an Idempotency-Key, replayed for retries until it expires."""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='idempotency_records')
+    key = models.CharField(max_length=255)
+    method = models.CharField(max_length=10)
+    path = models.CharField(max_length=255)
+    request_hash = models.CharField(max_length=64)
+    # Null while the first request is still running.
+    status_code = models.PositiveSmallIntegerField(null=True, blank=True)
+    response_body = models.JSONField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'method', 'path', 'key'], name='unique_idempotency_key'),
+        ]
+
+    def __str__(self):
+        return f"{self.method} {self.path} [{self.key}]"
@@ -0,0 +1,170 @@
+import threading
+import time
+import uuid
+from collections import deque
+
+import razorpay
+import requests
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+DEFAULT_GATEWAY = 'user_management.payments.RazorpayGateway'
+# (connect, read) seconds; Razorpay order creation normally answers well under a second.
+DEFAULT_TIMEOUT = (3.05, 10)
+DEFAULT_POOL_SIZE = 20
+LATENCY_WINDOW = 1000
+
+
+class GatewayMetrics:
+    """Thread-safe call counts and a rolling latency window per operation."""
+
+    def __init__(self, window=LATENCY_WINDOW):
+        self._lock = threading.Lock()
+        self._window = window
+        self._ops = {}
+
+    def record(self, operation, seconds, ok=True):
+        with self._lock:
+            op = self._ops.setdefault(operation, {'calls': 0, 'errors': 0, 'latencies': deque(maxlen=self._window)})
+            op['calls'] += 1
+            op['errors'] += 0 if ok else 1
+            op['latencies'].append(seconds)
+
+    def snapshot(self):
+        with self._lock:
+            ops = {name: (op['calls'], op['errors'], sorted(op['latencies'])) for name, op in self._ops.items()}
+
+        def pct(values, q):
+            return round(values[min(int(len(values) * q), len(values) - 1)] * 1000, 2) if values else None
+
+        return {
+            name: {
+                'calls': calls,
+                'errors': errors,
+                'p50_ms': pct(latencies, 0.50),
+                'p95_ms': pct(latencies, 0.95),
+                'max_ms': round(latencies[-1] * 1000, 2) if latencies else None,
+            }
+            for name, (calls, errors, latencies) in ops.items()
+        }
+
+
+class _TimeoutSession(requests.Session):
+    """razorpay.Client never passes a timeout, so the session supplies one."""
+
+    def __init__(self, timeout):
+        super().__init__()
+        self.timeout = timeout
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault('timeout', self.timeout)
+        return super().request(method, url, **kwargs)
+
+
+def build_session(timeout=DEFAULT_TIMEOUT, pool_size=DEFAULT_POOL_SIZE):
+    """
+    Keep-alive session with a connection pool. Connection failures are retried for
+    every method (nothing reached Razorpay); read errors and 5xx only for GETs, so
+    an order POST is never sent twice.
+    """
+    retry = Retry(
+        total=3, connect=3, read=2, status=2,
+        backoff_factor=0.2,
+        status_forcelist=(502, 503, 504),
+        allowed_methods=frozenset({'GET'}),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=2, pool_maxsize=pool_size, max_retries=retry)
+    session = _TimeoutSession(timeout)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+class RazorpayGateway:
+    def __init__(self, key_id=None, key_secret=None, timeout=None, pool_size=None, base_url=None):
+        self.key_id = key_id or settings.RAZORPAY_KEY_ID
+        self.metrics = GatewayMetrics()
+        options = {'base_url': base_url} if base_url else {}
+        self.client = razorpay.Client(
+            session=build_session(
+                timeout=timeout or getattr(settings, 'PAYMENT_GATEWAY_TIMEOUT', DEFAULT_TIMEOUT),
+                pool_size=pool_size or getattr(settings, 'PAYMENT_GATEWAY_POOL_SIZE', DEFAULT_POOL_SIZE),
+            ),
+            auth=(self.key_id, key_secret or settings.RAZORPAY_KEY_SECRET),
+            **options,
+        )
+
+    def create_order(self, amount, receipt, notes, currency='INR'):
+        started = time.perf_counter()
+        ok = False
+        try:
+            order = self.client.order.create({
+                "amount": amount,
+                "currency": currency,
+                "receipt": receipt,
+                "notes": notes,
+            })
+            ok = True
+            return order
+        finally:
+            self.metrics.record('create_order', time.perf_counter() - started, ok)
+
+
+class FakeGateway:
+    """In-memory gateway for tests and offline load tests; `latency` simulates the network."""
+
+    def __init__(self, latency=None, **kwargs):
+        self.key_id = getattr(settings, 'RAZORPAY_KEY_ID', None) or 'rzp_test_fake'
+        self.latency = latency if latency is not None else getattr(settings, 'FAKE_GATEWAY_LATENCY', 0)
+        self.metrics = GatewayMetrics()
+        self.orders = {}
+        self._lock = threading.Lock()
+
+    def create_order(self, amount, receipt, notes, currency='INR'):
+        started = time.perf_counter()
+        if self.latency:
+            time.sleep(self.latency)
+        order = {
+            'id': f"order_{uuid.uuid4().hex[:14]}",
+            'entity': 'order',
+            'amount': amount,
+            'currency': currency,
+            'receipt': receipt,
+            'notes': notes,
+            'status': 'created',
+        }
+        with self._lock:
+            self.orders[order['id']] = order
+        self.metrics.record('create_order', time.perf_counter() - started)
+        return order
+
+
+_gateway = None
+_gateway_lock = threading.Lock()
+
+
+def get_gateway():
+    """The process-wide gateway named by settings.PAYMENT_GATEWAY, built on first use."""
+    global _gateway
+    if _gateway is None:
+        with _gateway_lock:
+            if _gateway is None:
+                _gateway = import_string(getattr(settings, 'PAYMENT_GATEWAY', DEFAULT_GATEWAY))()
+    return _gateway
+
+
+def reset_gateway():
+    global _gateway
+    with _gateway_lock:
+        _gateway = None
+
+
+@receiver(setting_changed)
+def _reset_gateway_on_settings_change(setting, **kwargs):
+    if setting.startswith(('PAYMENT_GATEWAY', 'RAZORPAY_', 'FAKE_GATEWAY')):
+        reset_gateway()
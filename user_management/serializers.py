@@ -1,10 +1,12 @@
 import re
 from rest_framework import serializers
 from django.contrib.auth.models import User
+from restaurant.mixins import SparseFieldsetMixin, ValuesFastPathMixin
+from restaurant.models import Menu, Table
 from .models import CustomerProfile, Booking, MenuBooking, Billing, SeatBooking, Review, SpecialRequestForSeat, SpecialRequestMessage, Notification, Address
 
 
-class CustomerProfileSerializer(serializers.ModelSerializer):
+class CustomerProfileSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     phone_number = serializers.CharField(write_only=True)  # Incoming phone number
     username = serializers.CharField(source='user.username', read_only=True)  # Show username in response
 
@@ -28,7 +30,7 @@ class CustomerProfileSerializer(serializers.ModelSerializer):
         return profile
 
 
-class BookingSerializer(serializers.ModelSerializer):
+class BookingSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     customer_name = serializers.CharField(source='user.full_name', read_only=True)
     restaurant_name = serializers.CharField(source='restaurant.name', read_only=True)
     table_number = serializers.CharField(source='table.table_number', read_only=True)
@@ -42,60 +44,88 @@ class BookingSerializer(serializers.ModelSerializer):
         ]
         
 
-class MenuBookingSerializer(serializers.ModelSerializer):
+class MenuBookingSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     menu_name = serializers.CharField(source='menu.name', read_only=True)
     total_price = serializers.SerializerMethodField()
+    sparse_sources = {'total_price': ['line_total']}
 
     class Meta:
         model = MenuBooking
-        fields = ['id','booking','menu','menu_name','quantity','special_note','table','total_price','created_at','updated_at']
+        fields = ['id','booking','menu','menu_name','quantity','special_note','table','unit_price','total_price','created_at','updated_at']
+        read_only_fields = ['unit_price']
 
     def get_total_price(self, obj):
-        return obj.quantity * obj.menu.price\
+        return obj.line_total
 
 
-class BillingSerializer(serializers.ModelSerializer):
+class MenuCartItemSerializer(serializers.Serializer):
+    menu = serializers.IntegerField()
+    quantity = serializers.IntegerField(min_value=1, default=1)
+    special_note = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+
+
+class MenuCartSerializer(serializers.Serializer):
+    booking = serializers.PrimaryKeyRelatedField(queryset=SeatBooking.objects.all(), required=False, allow_null=True)
+    table = serializers.PrimaryKeyRelatedField(queryset=Table.objects.all())
+    items = MenuCartItemSerializer(many=True, allow_empty=False)
+
+    def validate(self, data):
+        # One query resolves every menu in the cart; items from another restaurant are rejected.
+        menu_ids = {item['menu'] for item in data['items']}
+        menus = Menu.objects.filter(
+            pk__in=menu_ids, restaurant_id=data['table'].restaurant_id
+        ).only('id', 'name', 'price').in_bulk()
+
+        missing = sorted(menu_ids - set(menus))
+        if missing:
+            raise serializers.ValidationError({"items": f"Menu items not available at this restaurant: {missing}"})
+
+        data['menus'] = menus
+        return data
+
+
+class BillingSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = Billing
         fields = ['id', 'booking', 'table', 'total_menu_price', 'final_amount_to_pay', 'payment_status', 'complete_order', 'created_at']
         read_only_fields = ['total_menu_price','final_amount_to_pay','created_at',]
 
 
-class SeatBookingSerializer(serializers.ModelSerializer):
+class SeatBookingSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = SeatBooking
         fields = '__all__'
         read_only_fields = ['total_advance_payment', 'user', 'queue_priority']
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+class ReviewSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = Review
         fields = ['id', 'restaurant', 'stars', 'description']
 
 
-class SpecialRequestForSeatSerializer(serializers.ModelSerializer):
+class SpecialRequestForSeatSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = SpecialRequestForSeat
         fields = ['id', 'message', 'booking']
         read_only_fields = ['id', 'booking']
 
 
-class SpecialRequestMessageSerializer(serializers.ModelSerializer):
+class SpecialRequestMessageSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = SpecialRequestMessage
         fields = ['id', 'message', 'booking']
         read_only_fields = ['id', 'booking']
 
 
-class NotificationSerializer(serializers.ModelSerializer):
+class NotificationSerializer(ValuesFastPathMixin, serializers.ModelSerializer):
     class Meta:
         model = Notification
         fields=['id','restaurant','title','message','is_read']
         read_only_fields=['id','restaurant']
 
 
-class AddressSerializer(serializers.ModelSerializer):
+class AddressSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = Address
         fields = ['id', 'user', 'address_type', 'street_address', 'city', 'state', 'postal_code']
@@ -1,6 +1,8 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
-from .models import Notification, SpecialRequestMessage
+from restaurant.models import Restaurant
+
+from .models import Notification, SpecialRequestMessage, MenuBooking, Billing, Review
 
 
 
@@ -20,3 +22,20 @@ def create_notification(sender, instance, created, **kwargs):
             message=message,
         )
 
+
+@receiver([post_save, post_delete], sender=MenuBooking)
+def refresh_billing_totals(sender, instance, **kwargs):
+    Billing.refresh_open(booking_id=instance.booking_id, table_id=None if instance.booking_id else instance.table_id)
+
+
+# Every way a review comes or goes (API, admin, cascades from a deleted customer
+# or restaurant) keeps the restaurant's stored rating in step.
+@receiver(post_save, sender=Review)
+def add_review_to_rating(sender, instance, created, **kwargs):
+    if created:
+        Restaurant.apply_review(instance.restaurant_id, instance.stars)
+
+
+@receiver(post_delete, sender=Review)
+def remove_review_from_rating(sender, instance, **kwargs):
+    Restaurant.apply_review(instance.restaurant_id, instance.stars, removed=True)
@@ -26,3 +26,14 @@ def cleanup_expired_bookings():
         booking.save()
 
     return f"{count} expired bookings released."
+
+@shared_task
+def process_webhook_events():
+    from user_management.webhooks import process_pending_events
+    counts = process_pending_events()
+    return f"Webhook events: {counts or 'none due'}."
+
+@shared_task
+def purge_idempotency_records():
+    from user_management.idempotency import purge_expired
+    return f"{purge_expired()} expired idempotency records deleted."
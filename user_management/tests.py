@@ -1,3 +1,517 @@
-from django.test import TestCase
+import datetime
+import hashlib
+import hmac
+import json
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from restaurant.models import Restaurant, Menu, Table, SeatSlot, Offer
+from restaurant.tests import QueryBudgetTestCase, RestaurantFixtureMixin
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+from .models import Billing, CustomerProfile, IdempotencyRecord, MenuBooking, Notification, SeatBooking, TableSession, WebhookEvent
+from .payments import FakeGateway, get_gateway, reset_gateway
+from .webhooks import process_pending_events
+
+
+class CustomerListQueryTests(QueryBudgetTestCase):
+    def test_menu_bookings(self):
+        table = Table.objects.create(restaurant=self.restaurant, table_number='TBL-001')
+
+        def add_rows(count):
+            MenuBooking.objects.bulk_create([
+                MenuBooking(table=table, menu=self.menu, quantity=2,
+                            unit_price=self.menu.price, line_total=self.menu.price * 2)
+                for _ in range(count)
+            ])
+
+        self.assertConstantQueries(f'/user_management/menu_bookings/{table.id}/', self.customer_auth, add_rows)
+
+    def test_seat_bookings(self):
+        self.assertConstantQueries('/user_management/seat_booking/', self.customer_auth, self.add_seat_bookings)
+
+    def test_confirm_payment_list(self):
+        self.assertConstantQueries('/user_management/confirm-payment/', self.customer_auth, self.add_seat_bookings)
+
+    def test_notifications(self):
+        def add_rows(count):
+            Notification.objects.bulk_create([
+                Notification(restaurant=self.restaurant, title='New Special Request', message='Extra spicy')
+                for _ in range(count)
+            ])
+
+        self.assertConstantQueries('/user_management/notification/', self.auth, add_rows)
+
+    def test_restaurant_list(self):
+        def add_rows(count):
+            users = User.objects.bulk_create([
+                User(username=f'owner{self.created + i}@example.com') for i in range(count)
+            ])
+            Restaurant.objects.bulk_create([
+                Restaurant(user=user, name='Cafe', image='restaurants/c.jpg', location='Indiranagar',
+                           map_link='https://maps.example.com/c', phone_number='9876500000', owner_name='Owner')
+                for user in users
+            ])
+
+        self.assertConstantQueries('/user_management/restaurant_list/', self.customer_auth, add_rows)
+
+
+@override_settings(RAZORPAY_WEBHOOK_SECRET='whsec')
+class WebhookInboxTests(RestaurantFixtureMixin, TestCase):
+    def deliver(self, event, booking, amount, event_id):
+        body = json.dumps({
+            'event': event,
+            'payload': {'payment': {'entity': {'amount': amount, 'notes': {'booking_id': str(booking.id)}}}},
+        }).encode('utf-8')
+        signature = hmac.new(b'whsec', body, hashlib.sha256).hexdigest()
+        return self.client.post('/user_management/payment/webhook/', data=body, content_type='application/json',
+                                HTTP_X_RAZORPAY_SIGNATURE=signature, HTTP_X_RAZORPAY_EVENT_ID=event_id)
+
+    def test_store_dedupe_and_process_in_order(self):
+        booking = SeatBooking.objects.create(
+            user=self.customer, restaurant=self.restaurant, seat_slot=self.slot, number_of_guests=2,
+            total_advance_payment=Decimal('200.00'), locked=True, lock_expiry=timezone.now() + timezone.timedelta(minutes=3),
+        )
+
+        # A failed first attempt followed by a successful retry must be applied in that order.
+        self.assertEqual(self.deliver('payment.failed', booking, 20000, 'evt_1').json(), {'status': 'Event received.'})
+        self.assertEqual(self.deliver('payment.failed', booking, 20000, 'evt_1').json(), {'status': 'Duplicate event.'})
+        self.deliver('payment.captured', booking, 20000, 'evt_2')
+
+        booking.refresh_from_db()
+        self.assertEqual(booking.payment_status, 'pending')
+        self.assertEqual(WebhookEvent.objects.count(), 2)
+
+        self.assertEqual(process_pending_events(), {'processed': 2})
+        booking.refresh_from_db()
+        self.assertEqual(booking.payment_status, 'success')
+        self.assertEqual(process_pending_events(), {})
+
+    def test_rejected_event_is_not_retried(self):
+        booking = SeatBooking.objects.create(
+            user=self.customer, restaurant=self.restaurant, seat_slot=self.slot, number_of_guests=2,
+            total_advance_payment=Decimal('200.00'), locked=True, lock_expiry=timezone.now() + timezone.timedelta(minutes=3),
+        )
+        self.deliver('payment.captured', booking, 100, 'evt_short')
+
+        self.assertEqual(process_pending_events(), {'rejected': 1})
+        event = WebhookEvent.objects.get(event_id='evt_short')
+        self.assertIn('Amount mismatch', event.result)
+        self.assertEqual(event.attempts, 1)
+
+
+class CustomerHomeTests(RestaurantFixtureMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.restaurant.latitude, self.restaurant.longitude = Decimal('12.971600'), Decimal('77.594600')
+        self.restaurant.save()
+
+    def test_sections(self):
+        today = timezone.localdate()
+        Offer.objects.create(restaurant=self.restaurant, title='Lunch', discount_percentage=Decimal('15.00'),
+                             valid_from=today, valid_until=today)
+        upcoming = SeatSlot.objects.create(
+            restaurant=self.restaurant, date=today + timezone.timedelta(days=1),
+            start_time=datetime.time(19, 0), end_time=datetime.time(20, 0), available_seats=10,
+        )
+        booking = SeatBooking.objects.create(user=self.customer, restaurant=self.restaurant, seat_slot=upcoming, number_of_guests=2)
+        self.add_seat_bookings(1)  # on the past slot from setUp
+
+        url = '/user_management/home/?latitude=12.9717&longitude=77.5947'
+        data = self.client.get(url, **self.customer_auth).json()
+        self.assertEqual([r['id'] for r in data['nearby']], [self.restaurant.id])
+        self.assertEqual([o['title'] for o in data['offers']], ['Lunch'])
+        self.assertEqual([b['id'] for b in data['upcoming_bookings']], [booking.id])
+
+        # Shared sections come from the cache; only the customer's bookings hit the database.
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(url, **self.customer_auth)
+        self.assertFalse([q for q in ctx.captured_queries if 'restaurant_offer' in q['sql'] or 'restaurant_restaurant' in q['sql']])
+
+
+class ReviewTests(RestaurantFixtureMixin, TestCase):
+    def test_stars_must_be_one_to_five(self):
+        for stars in (0, 6, 10):
+            response = self.client.post('/user_management/review/', {'restaurant': self.restaurant.id, 'stars': stars}, **self.customer_auth)
+            self.assertEqual(response.status_code, 400, stars)
+
+        response = self.client.post('/user_management/review/', {'restaurant': self.restaurant.id, 'stars': 5}, **self.customer_auth)
+        self.assertEqual(response.status_code, 201, response.content)
+        self.restaurant.refresh_from_db()
+        self.assertEqual(self.restaurant.rating_avg, Decimal('5.00'))
+
+    def rating(self):
+        self.restaurant.refresh_from_db()
+        return self.restaurant.rating_count, self.restaurant.rating_total, self.restaurant.rating_avg
+
+    def test_deletes_take_stars_off_once(self):
+        first = self.client.post('/user_management/review/', {'restaurant': self.restaurant.id, 'stars': 5}, **self.customer_auth)
+        self.client.post('/user_management/review/', {'restaurant': self.restaurant.id, 'stars': 2}, **self.customer_auth)
+        self.assertEqual(self.rating(), (2, 7, Decimal('3.50')))
+
+        url = f"/user_management/review/{first.data['id']}/"
+        self.assertEqual(self.client.delete(url, **self.customer_auth).status_code, 204)
+        self.assertEqual(self.client.delete(url, **self.customer_auth).status_code, 404)
+        self.assertEqual(self.rating(), (1, 2, Decimal('2.00')))
+
+        # Reviews removed by a cascade come off the rating too.
+        self.customer.user.delete()
+        self.assertEqual(self.rating(), (0, 0, Decimal('0.00')))
+
+
+class BillingRefreshTests(RestaurantFixtureMixin, TestCase):
+    def test_booking_items_leave_the_table_bill_alone(self):
+        table = Table.objects.create(restaurant=self.restaurant, table_number='TBL-001')
+        table_bill = Billing.objects.create(table=table)
+        booking = SeatBooking.objects.get(pk=self.add_seat_bookings(1)[0].pk)
+        booking_bill = Billing.objects.create(booking=booking)
+        stamp = Billing.objects.filter(pk=table_bill.pk).values_list('updated_at', flat=True).get()
+
+        MenuBooking.objects.create(booking=booking, table=table, menu=self.menu, quantity=2)
+
+        self.assertEqual(Billing.objects.filter(pk=table_bill.pk).values_list('updated_at', flat=True).get(), stamp)
+        booking_bill.refresh_from_db()
+        self.assertEqual(booking_bill.total_menu_price, Decimal('240.00'))
+
+    def test_next_diner_gets_a_fresh_bill(self):
+        table = Table.objects.create(restaurant=self.restaurant, table_number='TBL-001')
+        next_user = User.objects.create(username='9123456781')
+        next_diner = CustomerProfile.objects.create(user=next_user, full_name='Next')
+        next_auth = {'HTTP_AUTHORIZATION': f'Token {Token.objects.create(user=next_user).key}'}
+
+        self.assertTrue(TableSession.claim(table.id, self.customer))
+        MenuBooking.objects.create(table=table, menu=self.menu, quantity=2)
+        response = self.client.post('/user_management/billing/', {'table': table.id}, **self.customer_auth)
+        first_bill = Billing.objects.get(pk=response.data['data']['id'])
+        self.assertEqual(first_bill.total_menu_price, Decimal('240.00'))
+        Billing.objects.filter(pk=first_bill.pk).update(payment_status='success')
+        response = self.client.post('/user_management/complete_order/', {'table': table.id}, **self.customer_auth)
+        self.assertEqual(response.status_code, 200, response.content)
+
+        self.assertTrue(TableSession.claim(table.id, next_diner))
+        MenuBooking.objects.create(table=table, menu=self.menu, quantity=1)
+        response = self.client.post('/user_management/billing/', {'table': table.id}, **next_auth)
+        self.assertNotEqual(response.data['data']['id'], first_bill.pk)
+        self.assertEqual(Decimal(response.data['data']['total_menu_price']), Decimal('120.00'))
+        response = self.client.get(f'/user_management/billing/{table.id}/', **next_auth)
+        self.assertEqual((response.status_code, response.data['total_menu_price']), (200, '120.00'))
+
+        first_bill.refresh_from_db()
+        first_bill.refresh_totals()
+        self.assertEqual(first_bill.total_menu_price, Decimal('240.00'))
+
+    def test_bookings_at_one_table_get_their_own_bills(self):
+        table = Table.objects.create(restaurant=self.restaurant, table_number='TBL-001')
+        first, second = self.add_seat_bookings(2)
+        MenuBooking.objects.create(booking=first, table=table, menu=self.menu, quantity=1)
+        MenuBooking.objects.create(booking=second, table=table, menu=self.menu, quantity=3)
+
+        first_bill = self.client.post('/user_management/billing/', {'booking': first.id, 'table': table.id}, **self.customer_auth).data['data']
+        second_bill = self.client.post('/user_management/billing/', {'booking': second.id, 'table': table.id}, **self.customer_auth).data['data']
+        self.assertNotEqual(first_bill['id'], second_bill['id'])
+        self.assertEqual((first_bill['total_menu_price'], second_bill['total_menu_price']), ('120.00', '360.00'))
+
+        self.assertEqual(Billing.find_open(booking_id=second.id, table_id=table.id).pk, second_bill['id'])
+        self.assertEqual(Billing.get_or_create_open(booking=second, table=table), (Billing.objects.get(pk=second_bill['id']), False))
+        self.assertEqual(Billing.objects.get(pk=first_bill['id']).booking_id, first.id)
+
+
+class TableSessionTests(RestaurantFixtureMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.table = Table.objects.create(restaurant=self.restaurant, table_number='TBL-001')
+        self.next_diner = CustomerProfile.objects.create(user=User.objects.create(username='9123456781'), full_name='Next')
+
+    def test_owner_freeing_the_table_ends_the_session(self):
+        self.assertTrue(TableSession.claim(self.table.id, self.customer))
+
+        response = self.client.put(
+            f'/restaurant/table/{self.table.id}/', {'booking_status': False},
+            content_type='application/json', **self.auth,
+        )
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertFalse(TableSession.objects.filter(table=self.table, is_active=True).exists())
+        self.assertTrue(TableSession.claim(self.table.id, self.next_diner))
+
+    def test_claim_ends_a_session_left_behind(self):
+        self.assertTrue(TableSession.claim(self.table.id, self.customer))
+        Table.objects.filter(pk=self.table.id).update(booking_status=False)
+
+        self.assertTrue(TableSession.claim(self.table.id, self.next_diner))
+        self.assertEqual(list(TableSession.objects.filter(table=self.table, is_active=True).values_list('customer', flat=True)), [self.next_diner.id])
+
+
+class IdempotencyTests(RestaurantFixtureMixin, TestCase):
+    url = '/user_management/billing/'
+
+    def setUp(self):
+        super().setUp()
+        self.table = Table.objects.create(restaurant=self.restaurant, table_number='TBL-001')
+        self.body = json.dumps({'table': self.table.id})
+        cache.clear()
+
+    def post(self, key, body=None):
+        return self.client.post(
+            self.url, body or self.body, content_type='application/json', HTTP_IDEMPOTENCY_KEY=key, **self.customer_auth,
+        )
+
+    def test_retry_replays_the_first_response(self):
+        first = self.post('k1')
+        self.assertEqual(first.status_code, 201)
+        cache.clear()  # the database copy must be enough
+
+        retry = self.post('k1')
+        self.assertEqual(retry.status_code, 201)
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+        self.assertEqual(retry.json(), first.json())
+        self.assertEqual(Billing.objects.count(), 1)
+
+    def test_conflicts(self):
+        self.post('k1')
+        other_table = Table.objects.create(restaurant=self.restaurant, table_number='TBL-002')
+        self.assertEqual(self.post('k1', json.dumps({'table': other_table.id})).status_code, 422)
+
+        IdempotencyRecord.objects.create(
+            user=self.customer.user, method='POST', path=self.url, key='k2',
+            request_hash=hashlib.sha256(self.body.encode()).hexdigest(),
+            expires_at=timezone.now() + datetime.timedelta(days=1),
+        )
+        self.assertEqual(self.post('k2').status_code, 409)
+
+    def test_crashed_request_can_be_retried(self):
+        with mock.patch.object(Billing, 'get_or_create_open', side_effect=RuntimeError('boom')):
+            with self.assertRaises(RuntimeError):
+                self.post('k1')
+        self.assertFalse(IdempotencyRecord.objects.exists())
+        self.assertEqual(self.post('k1').status_code, 201)
+
+        # A worker that died mid-request leaves its record in flight; it's reclaimed after the lock timeout.
+        record = IdempotencyRecord.objects.create(
+            user=self.customer.user, method='POST', path=self.url, key='k2',
+            request_hash=hashlib.sha256(self.body.encode()).hexdigest(),
+            expires_at=timezone.now() + datetime.timedelta(days=1),
+        )
+        self.assertEqual(self.post('k2').status_code, 409)
+        IdempotencyRecord.objects.filter(pk=record.pk).update(created_at=timezone.now() - datetime.timedelta(minutes=5))
+        response = self.post('k2')
+        self.assertEqual(response.status_code, 201)
+        self.assertNotIn('Idempotent-Replayed', response)
+
+
+class FailingGateway(FakeGateway):
+    def create_order(self, amount, receipt, notes, currency='INR'):
+        raise ConnectionError('gateway unreachable')
+
+
+@override_settings(PAYMENT_GATEWAY='user_management.payments.FakeGateway', RAZORPAY_KEY_ID='rzp_test_key')
+class PaymentOrderTests(RestaurantFixtureMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        # The gateway is process-wide; each test starts with an empty one.
+        reset_gateway()
+        self.booking = self.add_seat_bookings(1)[0]
+        SeatBooking.objects.filter(pk=self.booking.pk).update(total_advance_payment=Decimal('250.50'))
+        self.table = Table.objects.create(restaurant=self.restaurant, table_number='TBL-001')
+
+    def create_order(self, **data):
+        return self.client.post('/user_management/payment/create-order/', data, **self.customer_auth)
+
+    def create_bill_order(self, **data):
+        return self.client.post('/user_management/payment/create-bill-order/', data, **self.customer_auth)
+
+    def test_booking_order_goes_through_the_gateway(self):
+        response = self.create_order(booking_id=self.booking.pk)
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual((response.data['amount'], response.data['razorpay_key']), (25050, 'rzp_test_key'))
+
+        gateway = get_gateway()
+        order = gateway.orders[response.data['razorpay_order_id']]
+        self.assertEqual((order['receipt'], order['notes']['booking_id']), (f'booking_{self.booking.pk}', str(self.booking.pk)))
+        self.assertEqual(gateway.metrics.snapshot()['create_order']['calls'], 1)
+
+    def test_booking_order_errors(self):
+        self.assertEqual(self.create_order().status_code, 400)
+        self.assertEqual(self.create_order(booking_id=self.booking.pk + 1).status_code, 404)
+
+        SeatBooking.objects.filter(pk=self.booking.pk).update(lock_expiry=timezone.now() - datetime.timedelta(minutes=1))
+        response = self.create_order(booking_id=self.booking.pk)
+        self.assertEqual((response.status_code, response.data['error']), (400, 'Booking lock expired. Please book again.'))
+        self.assertEqual(self.create_order(booking_id=self.booking.pk).data['error'], 'Booking is already failed.')
+        self.assertEqual(get_gateway().orders, {})
+
+    @override_settings(PAYMENT_GATEWAY='user_management.tests.FailingGateway')
+    def test_gateway_failure_is_a_500(self):
+        response = self.create_order(booking_id=self.booking.pk)
+        self.assertEqual((response.status_code, response.data['details']), (500, 'gateway unreachable'))
+
+        MenuBooking.objects.create(table=self.table, menu=self.menu, quantity=2)
+        Billing.objects.create(table=self.table)
+        response = self.create_bill_order(table_id=self.table.pk)
+        self.assertEqual(response.status_code, 500)
+        self.assertIsNone(Billing.objects.get(table=self.table).razorpay_order_id)
+
+    def test_bill_order_charges_the_stored_total(self):
+        MenuBooking.objects.create(table=self.table, menu=self.menu, quantity=2)
+        bill = Billing.objects.create(table=self.table)
+        bill.refresh_from_db()
+        self.assertGreater(bill.final_amount_to_pay, 0)
+
+        response = self.create_bill_order(table_id=self.table.pk, amount=1)
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(response.data['amount'], int(round(bill.final_amount_to_pay * 100)))
+        self.assertIn(response.data['razorpay_order_id'], get_gateway().orders)
+        bill.refresh_from_db()
+        self.assertEqual(bill.razorpay_order_id, response.data['razorpay_order_id'])
+
+    def test_bill_order_errors(self):
+        self.assertEqual(self.create_bill_order().status_code, 400)
+        self.assertEqual(self.create_bill_order(table_id=self.table.pk).status_code, 404)
+        self.assertEqual(self.create_bill_order(booking_id=self.booking.pk + 1).status_code, 404)
+
+        bill = Billing.objects.create(table=self.table)
+        response = self.create_bill_order(table_id=self.table.pk)
+        self.assertEqual((response.status_code, response.data['error']), (400, 'Nothing to pay for this bill.'))
+
+        MenuBooking.objects.create(table=self.table, menu=self.menu, quantity=1)
+        Billing.objects.filter(pk=bill.pk).update(payment_status='success')
+        response = self.create_bill_order(table_id=self.table.pk)
+        self.assertEqual((response.status_code, response.data['error']), (400, 'This bill has already been paid.'))
+        self.assertEqual(get_gateway().orders, {})
+
+
+class PriceSnapshotTests(RestaurantFixtureMixin, TestCase):
+    def test_menu_price_change_leaves_orders_alone(self):
+        table = Table.objects.create(restaurant=self.restaurant, table_number='TBL-001')
+        item = MenuBooking.objects.create(table=table, menu=self.menu, quantity=3)
+        billing = Billing.objects.create(table=table)
+
+        self.menu.price = Decimal('200.00')
+        self.menu.save()
+        billing.refresh_totals()
+
+        item.refresh_from_db()
+        self.assertEqual((item.unit_price, item.line_total), (Decimal('120.00'), Decimal('360.00')))
+        self.assertEqual(billing.total_menu_price, Decimal('360.00'))
+        # New orders take the new price.
+        self.assertEqual(MenuBooking.objects.create(table=table, menu=self.menu, quantity=1).line_total, Decimal('200.00'))
+
+
+class CustomerProfileViewTests(RestaurantFixtureMixin, TestCase):
+    url = '/user_management/login/'
+
+    def test_listing_is_paginated_and_never_creates_tokens(self):
+        CustomerProfile.objects.bulk_create([
+            CustomerProfile(user=user, full_name='Diner')
+            for user in User.objects.bulk_create([User(username=f'98765{i:05d}') for i in range(5)])
+        ])
+        admin = User.objects.create_user('ops@example.com', is_staff=True)
+        admin_auth = {'HTTP_AUTHORIZATION': f'Token {Token.objects.create(user=admin).key}'}
+        tokens = Token.objects.count()
+
+        self.assertEqual(self.client.get(self.url, **self.customer_auth).status_code, 403)
+        response = self.client.get(self.url, {'page_size': 4}, **admin_auth)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 6)
+        self.assertEqual(len(response.data['results']), 4)
+        self.assertEqual(response.data['results'][0]['token'], Token.objects.get(user=self.customer.user).key)
+        self.assertIsNone(response.data['results'][1]['token'])
+        self.assertEqual(len(self.client.get(self.url, {'page_size': 4, 'page': 2}, **admin_auth).data['results']), 2)
+        self.assertEqual(Token.objects.count(), tokens)
+
+    def test_signup_ignores_a_stale_token(self):
+        response = self.client.post(self.url, {'phone_number': '9876512345', 'full_name': 'New'}, HTTP_AUTHORIZATION='Token stale')
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(response.data['token'], Token.objects.get(user__username='9876512345').key)
+
+
+class MenuCartTests(RestaurantFixtureMixin, TestCase):
+    url = '/user_management/menu_bookings/cart/'
+
+    def setUp(self):
+        super().setUp()
+        self.table = Table.objects.create(restaurant=self.restaurant, table_number='TBL-001')
+        self.idli = Menu.objects.create(restaurant=self.restaurant, name='Idli', description='Soft', price=Decimal('60.00'))
+
+    def post(self, items, auth=None):
+        body = json.dumps({'table': self.table.id, 'items': items})
+        return self.client.post(self.url, body, content_type='application/json', **(auth or self.customer_auth))
+
+    def test_whole_order_in_one_request(self):
+        bill = Billing.objects.create(table=self.table)
+        response = self.post([
+            {'menu': self.menu.id, 'quantity': 2, 'special_note': 'Extra chutney'},
+            {'menu': self.idli.id},
+        ])
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual([(item['menu_name'], item['quantity']) for item in response.data['data']], [('Dosa', 2), ('Idli', 1)])
+        self.assertEqual(
+            sorted(MenuBooking.objects.values_list('unit_price', 'line_total')),
+            [(Decimal('60.00'), Decimal('60.00')), (Decimal('120.00'), Decimal('240.00'))],
+        )
+        notification = Notification.objects.get(type='kitchen_order')
+        self.assertEqual(notification.message, 'Table TBL-001 ordered: 2 x Dosa, 1 x Idli')
+        bill.refresh_from_db()
+        self.assertEqual(bill.total_menu_price, Decimal('300.00'))
+        self.table.refresh_from_db()
+        self.assertTrue(self.table.booking_status)
+
+    def test_menus_must_belong_to_the_tables_restaurant(self):
+        other = Restaurant.objects.create(
+            user=User.objects.create(username='other@example.com'), name='Other', image='restaurants/o.jpg',
+            location='HSR', map_link='https://maps.example.com/o', phone_number='9876500001', owner_name='Owner',
+        )
+        foreign = Menu.objects.create(restaurant=other, name='Pizza', description='Cheese', price=Decimal('300.00'))
+
+        response = self.post([{'menu': self.menu.id}, {'menu': foreign.id}, {'menu': 999999}])
+        self.assertEqual(response.status_code, 400)
+        self.assertIn(str(foreign.id), str(response.data['items']))
+        self.assertIn('999999', str(response.data['items']))
+        self.assertFalse(MenuBooking.objects.exists())
+
+        self.assertEqual(self.post([]).status_code, 400)
+
+    def test_table_held_by_another_diner(self):
+        other = CustomerProfile.objects.create(user=User.objects.create(username='9123456781'), full_name='Other')
+        self.assertTrue(TableSession.claim(self.table.id, other))
+        self.assertEqual(self.post([{'menu': self.menu.id}]).status_code, 400)
+        self.assertFalse(MenuBooking.objects.exists())
+
+
+class PriceSnapshotMigrationTests(TransactionTestCase):
+    before = [('user_management', '0031_alter_billing_table')]
+    after = [('user_management', '0033_alter_menubooking_unit_price_and_more')]
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def test_backfill_copies_menu_prices(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.before)
+        old_apps = executor.loader.project_state(self.before).apps
+
+        owner = User.objects.create_user('owner@example.com')
+        restaurant = Restaurant.objects.create(
+            user=owner, name='Monkey Bar', image='restaurants/r.jpg', location='MG Road',
+            map_link='https://maps.example.com/r', phone_number='9876543210', owner_name='Owner',
+        )
+        menu = old_apps.get_model('restaurant', 'Menu').objects.create(
+            restaurant_id=restaurant.id, name='Dosa', description='Crispy', price=Decimal('120.00'),
+        )
+        table = old_apps.get_model('restaurant', 'Table').objects.create(restaurant_id=restaurant.id, table_number='TBL-001')
+        item = old_apps.get_model('user_management', 'MenuBooking').objects.create(table_id=table.id, menu_id=menu.id, quantity=2)
+
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(self.after)
+        new_apps = executor.loader.project_state(self.after).apps
+        item = new_apps.get_model('user_management', 'MenuBooking').objects.get(pk=item.pk)
+        self.assertEqual((item.unit_price, item.line_total), (Decimal('120.00'), Decimal('240.00')))
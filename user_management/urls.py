@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.urls import path
-from .views import CustomerProfileView, EditProfile, MenuBookingView, BillingView, RestaurantListView, SeatBookingView, ReviewView, ConfirmPaymentView, SpecialRequestForSeatView, SpecialRequestMessageView, NotificationView, AddressView, CompleteOrderView, CancelSeatBookingView, SendOTPView, VerifyOTPView, CreateRazorpayOrderView, RazorpayWebhookView, CreateBillPaymentOrderView, ConfirmBillPaymentView
+from .views import CustomerProfileView, EditProfile, MenuBookingView, MenuCartView, BillingView, RestaurantListView, SeatBookingView, ReviewView, ConfirmPaymentView, SpecialRequestForSeatView, SpecialRequestMessageView, NotificationView, AddressView, CompleteOrderView, CancelSeatBookingView, SendOTPView, VerifyOTPView, CreateRazorpayOrderView, RazorpayWebhookView, CreateBillPaymentOrderView, ConfirmBillPaymentView, CustomerHomeView
 
 urlpatterns = [
     path('login/', CustomerProfileView.as_view(), name="login"),
@@ -8,6 +8,7 @@ urlpatterns = [
     path('restaurant_list/', RestaurantListView.as_view(), name='restaurant_list'),
     path('menu_bookings/', MenuBookingView.as_view(), name='menu-bookings'),
     path('menu_bookings/<int:pk>/', MenuBookingView.as_view(), name='menu-bookings-detail'),
+    path('menu_bookings/cart/', MenuCartView.as_view(), name='menu-bookings-cart'),
     path('billing/', BillingView.as_view(), name='billing'),
     path('billing/<int:pk>/', BillingView.as_view(), name='billing-detail'),
     path('seat_booking/', SeatBookingView.as_view(), name='seat-booking'),
@@ -29,4 +30,5 @@ urlpatterns = [
     path('payment/create-bill-order/', CreateBillPaymentOrderView.as_view(), name='create-bill-payment-order'),
     path('payment/webhook/', RazorpayWebhookView.as_view(), name='razorpay-webhook'),
     path('payment/confirm-bill/', ConfirmBillPaymentView.as_view(), name='confirm-bill-payment'),
+    path('home/', CustomerHomeView.as_view(), name='customer-home'),
 ]
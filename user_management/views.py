@@ -8,16 +8,18 @@ from django.shortcuts import get_object_or_404
 from rest_framework.authtoken.models import Token
 from decimal import Decimal
 
-from restaurant.models import Table, Restaurant, Payment
-from rest_framework.permissions import IsAuthenticated
+from restaurant.models import Table, Restaurant, Payment, Offer
+from rest_framework.permissions import IsAuthenticated, IsAdminUser, AllowAny
+from rest_framework.pagination import PageNumberPagination
 from rest_framework.authentication import TokenAuthentication
 from django.db.models import Max, Sum
 from django.db import transaction
 from django.utils import timezone
 from datetime import datetime, timedelta
-from .serializers import CustomerProfileSerializer, BookingSerializer, MenuBookingSerializer, BillingSerializer, BillingSerializer, SeatBookingSerializer, ReviewSerializer, SpecialRequestForSeatSerializer, SpecialRequestMessageSerializer, NotificationSerializer, AddressSerializer
+from .serializers import CustomerProfileSerializer, BookingSerializer, MenuBookingSerializer, MenuCartSerializer, BillingSerializer, BillingSerializer, SeatBookingSerializer, ReviewSerializer, SpecialRequestForSeatSerializer, SpecialRequestMessageSerializer, NotificationSerializer, AddressSerializer
 from restaurant.serializers import TableSerializer, RestaurantSerializer
-from .models import CustomerProfile, Booking, MenuBooking, Billing, SeatBooking, Review, SpecialRequestForSeat, SpecialRequestMessage, Notification, Address
+from restaurant.mixins import ConditionalListMixin, QuerysetOptimizerMixin, requested_fields
+from .models import CustomerProfile, Booking, MenuBooking, Billing, SeatBooking, Review, SpecialRequestForSeat, SpecialRequestMessage, Notification, Address, TableSession
 
 import re
 import os
@@ -25,8 +27,11 @@ import requests as req
 from urllib.parse import urlencode
 from .models import OTP
 from .utils import send_otp_via_messagecentral, _get_auth_token
+from .webhooks import verify_signature, store_event
+from .payments import get_gateway
+from .idempotency import idempotent
+from .home import build_home
 
-import razorpay
 from django.conf import settings
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
@@ -254,7 +259,27 @@ class VerifyOTPView(APIView):
             status=status.HTTP_201_CREATED
         )
 
+class CustomerProfilePagination(PageNumberPagination):
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+
+
 class CustomerProfileView(APIView):
+    authentication_classes = [TokenAuthentication]
+
+    def get_authenticators(self):
+        # Signup ignores credentials, so a stale Authorization header can't 401 it.
+        if self.request.method == 'POST':
+            return []
+        return super().get_authenticators()
+
+    def get_permissions(self):
+        # Signup stays open; the customer listing is for platform admins only.
+        if self.request.method == 'GET':
+            return [IsAdminUser()]
+        return [AllowAny()]
+
     def post(self, request):
         serializer = CustomerProfileSerializer(data=request.data)
         if serializer.is_valid():
@@ -269,15 +294,21 @@ class CustomerProfileView(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
     def get(self, request):
-        users = CustomerProfile.objects.all()
+        # Token rows are joined in, never created: a listing must not write.
+        profiles = CustomerProfile.objects.select_related('user', 'user__auth_token').order_by('id')
+        paginator = CustomerProfilePagination()
+        page = paginator.paginate_queryset(profiles, request, view=self)
+
         data = []
-        for user in users:
-            token, _ = Token.objects.get_or_create(user=user.user)
-            serialized_profile = CustomerProfileSerializer(user).data
-            serialized_profile["token"] = token.key
+        for profile in page:
+            serialized_profile = CustomerProfileSerializer(profile).data
+            try:
+                serialized_profile["token"] = profile.user.auth_token.key
+            except Token.DoesNotExist:
+                serialized_profile["token"] = None
             data.append(serialized_profile)
 
-        return Response(data, status=status.HTTP_200_OK)
+        return paginator.get_paginated_response(data)
 
 
 class EditProfile(APIView):
@@ -327,12 +358,14 @@ class RestaurantListView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
+        fields = requested_fields(request)
         restaurants = Restaurant.objects.all()
-        serializer = RestaurantSerializer(restaurants, many=True)
-        return Response(serializer.data)
+        if request.query_params.get('sort') == 'rating':
+            restaurants = restaurants.order_by('-rating_avg', '-rating_count')
+        return Response(RestaurantSerializer.values_data(restaurants, fields))
 
 
-class SeatBookingView(APIView):
+class SeatBookingView(ConditionalListMixin, APIView):
     authentication_classes = [TokenAuthentication]
     permission_classes = [IsAuthenticated]
 
@@ -342,10 +375,11 @@ class SeatBookingView(APIView):
         except CustomerProfile.DoesNotExist:
             return Response({"error": "Customer profile not found."}, status=status.HTTP_404_NOT_FOUND)
 
-        bookings = SeatBooking.objects.filter(user=profile).order_by('-created_at')
-        serializer = SeatBookingSerializer(bookings, many=True)
-        return Response(serializer.data)
+        fields = requested_fields(request)
+        bookings = SeatBookingSerializer.narrow(SeatBooking.objects.filter(user=profile).order_by('-created_at'), fields)
+        return self.conditional_list_response(request, bookings, lambda: SeatBookingSerializer(bookings, many=True, fields=fields).data)
 
+    @idempotent
     def post(self, request):
         try:
             profile = request.user.customer_profile
@@ -388,7 +422,7 @@ class SeatBookingView(APIView):
                 }, status=status.HTTP_400_BAD_REQUEST)
 
             total_payment = advance_per_guest * number_of_guests
-            if offer and offer.is_active:
+            if offer and Offer.objects.currently_applicable(now).filter(pk=offer.pk, restaurant=restaurant).exists():
                 total_payment -= total_payment * (offer.discount_percentage / Decimal(100))
 
             booking = SeatBooking.objects.create(
@@ -473,7 +507,7 @@ class ConfirmPaymentView(APIView):
             data = [
                 {
                     "booking_id": b.id,
-                    "seat_slot": b.seat_slot.id,
+                    "seat_slot": b.seat_slot_id,
                     "number_of_guests": b.number_of_guests,
                     "payment_status": b.payment_status,
                     "locked": b.locked,
@@ -582,14 +616,16 @@ class SpecialRequestForSeatView(APIView):
             return Response({"error": "Customer profile not found."}, status=status.HTTP_404_NOT_FOUND)
 
         # Filter special requests based on SeatBooking and user
-        special_requests = SpecialRequestForSeat.objects.filter(booking__user=profile)
-        serializer = SpecialRequestForSeatSerializer(special_requests, many=True)
+        fields = requested_fields(request)
+        special_requests = SpecialRequestForSeatSerializer.narrow(SpecialRequestForSeat.objects.filter(booking__user=profile), fields)
+        serializer = SpecialRequestForSeatSerializer(special_requests, many=True, fields=fields)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
-class MenuBookingView(APIView):
+class MenuBookingView(QuerysetOptimizerMixin, APIView):
     authentication_classes = [TokenAuthentication]
     permission_classes = [IsAuthenticated]
+    list_select_related = ('menu',)
 
     def get(self, request, pk=None):
         try:
@@ -606,9 +642,12 @@ class MenuBookingView(APIView):
         if not menu_bookings.exists():
             return Response({"error": "No menu bookings found for this Booking or Table."}, status=status.HTTP_404_NOT_FOUND)
 
-        serializer = MenuBookingSerializer(menu_bookings, many=True)
+        fields = requested_fields(request)
+        menu_bookings = MenuBookingSerializer.narrow(self.optimize_queryset(menu_bookings), fields)
+        serializer = MenuBookingSerializer(menu_bookings, many=True, fields=fields)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
+    @idempotent
     def post(self, request):
         serializer = MenuBookingSerializer(data=request.data)
         try:
@@ -622,13 +661,9 @@ class MenuBookingView(APIView):
 
             if not booking and not table:
                 return Response({"error": "Either Booking or Table must be provided."}, status=status.HTTP_400_BAD_REQUEST)
-            if table.booking_status == True:
+            if not TableSession.claim(table.id, profile):
                 return Response ({"error": "The Table already booked"}, status=status.HTTP_400_BAD_REQUEST)
-            else:
-                menu_booking = serializer.save()
-                if table:
-                    table.booking_status = True
-                    table.save()
+            menu_booking = serializer.save()
 
             return Response({
                 "message": "Menu item added successfully.",
@@ -639,6 +674,61 @@ class MenuBookingView(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+class MenuCartView(APIView):
+    authentication_classes = [TokenAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    @idempotent
+    def post(self, request):
+        try:
+            profile = request.user.customer_profile
+        except CustomerProfile.DoesNotExist:
+            return Response({"error": "Customer profile not found."}, status=status.HTTP_404_NOT_FOUND)
+
+        serializer = MenuCartSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        booking = serializer.validated_data.get('booking')
+        table = serializer.validated_data['table']
+        menus = serializer.validated_data['menus']
+
+        if not TableSession.claim(table.id, profile):
+            return Response({"error": "The Table already booked"}, status=status.HTTP_400_BAD_REQUEST)
+
+        items = []
+        for item in serializer.validated_data['items']:
+            menu = menus[item['menu']]
+            menu_booking = MenuBooking(
+                booking=booking,
+                table=table,
+                menu=menu,
+                quantity=item['quantity'],
+                special_note=item.get('special_note'),
+            )
+            menu_booking.snapshot_price(menu.price)
+            items.append(menu_booking)
+
+        with transaction.atomic():
+            # bulk_create skips MenuBooking signals, so the bill is refreshed once here instead.
+            created = MenuBooking.objects.bulk_create(items)
+            Billing.refresh_open(booking_id=booking.id if booking else None, table_id=None if booking else table.id)
+
+            summary = ", ".join(f"{item.quantity} x {item.menu.name}" for item in created)
+            Notification.objects.create(
+                restaurant_id=table.restaurant_id,
+                title="New Order",
+                message=f"Table {table.table_number} ordered: {summary}",
+                type='kitchen_order',
+            )
+
+        return Response({
+            "message": f"{len(created)} menu items added successfully.",
+            "user": profile.user.username,
+            "data": MenuBookingSerializer(created, many=True).data
+        }, status=status.HTTP_201_CREATED)
+
+
 class SpecialRequestMessageView(APIView):
     authentication_classes = [TokenAuthentication]
     permission_classes = [IsAuthenticated]
@@ -676,11 +766,12 @@ class SpecialRequestMessageView(APIView):
         except Restaurant.DoesNotExist:
             return Response({"error": "Restaurant not found."}, status=status.HTTP_404_NOT_FOUND)
 
-        messages = SpecialRequestMessage.objects.filter(
+        fields = requested_fields(request)
+        messages = SpecialRequestMessageSerializer.narrow(SpecialRequestMessage.objects.filter(
             booking__table__restaurant=restaurant
-        ).order_by('-created_at')
+        ).order_by('-created_at'), fields)
 
-        serializer = SpecialRequestMessageSerializer(messages, many=True)
+        serializer = SpecialRequestMessageSerializer(messages, many=True, fields=fields)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
@@ -692,16 +783,14 @@ class BillingView(APIView):
         if not pk:
             return Response({"error": "Booking ID or Table ID is required."}, status=status.HTTP_400_BAD_REQUEST)
 
-        try:
-            billing = Billing.objects.get(booking_id=pk)
-        except Billing.DoesNotExist:
-            try:
-                billing = Billing.objects.get(table_id=pk)
-            except Billing.DoesNotExist:
-                return Response({"error": "Billing not found for this booking."}, status=status.HTTP_404_NOT_FOUND)
+        # A reused table has a bill per diner: the open one, else the latest.
+        billing = Billing.find_open(booking_id=pk, table_id=pk) or Billing.objects.filter(table_id=pk).order_by('-pk').first()
+        if billing is None:
+            return Response({"error": "Billing not found for this booking."}, status=status.HTTP_404_NOT_FOUND)
         serializer = BillingSerializer(billing)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
+    @idempotent
     def post(self, request):
         try:
             profile = request.user.customer_profile
@@ -720,23 +809,7 @@ class BillingView(APIView):
                 booking = SeatBooking.objects.get(id=booking_id, user=request.user.customer_profile)
             if table_id:
                 table = Table.objects.get(id=table_id)
-            billing = None
-            if booking:
-                billing = Billing.objects.filter(booking=booking).first()
-            if not billing and table:
-                billing = Billing.objects.filter(table=table).first()
-            if billing:
-                if booking and not billing.booking:
-                    billing.booking = booking
-                if table and not billing.table:
-                    billing.table = table
-                billing.save()
-            else:
-                billing = Billing.objects.create(
-                    booking=booking,
-                    table=table
-                )
-
+            billing, _ = Billing.get_or_create_open(booking=booking, table=table)
 
             serializer = BillingSerializer(billing)
             return Response({
@@ -763,15 +836,10 @@ class CompleteOrderView(APIView):
         if not booking_id and not table_id:
             return Response({"error": "Booking ID ot Table ID is required."}, status=status.HTTP_400_BAD_REQUEST)
 
-        billing = None
-
         try:
             if booking_id:
-                booking = SeatBooking.objects.get(id=booking_id, user=request.user.customer_profile)
-                billing =  Billing.objects.filter(booking=booking).first()
-            if not billing and table_id:
-                table = Table.objects.get(id=table_id)
-                billing = Billing.objects.filter(table=table).first()
+                SeatBooking.objects.get(id=booking_id, user=request.user.customer_profile)
+            billing = Billing.find_open(booking_id=booking_id, table_id=table_id)
             if not billing:
                 return Response({"error": "Billing not found for this booking or table."}, status=status.HTTP_404_NOT_FOUND)
 
@@ -779,11 +847,8 @@ class CompleteOrderView(APIView):
                 return Response({"error": "Bill is not paid yet."}, status=400)
             billing.complete_order = True
             billing.payment_status = 'paid'
-            billing.save()
-            if billing.table:
-                table = billing.table
-                table.booking_status = False
-                table.save()
+            # save() releases the table and ends its session once complete_order is set.
+            billing.save(update_fields=['complete_order', 'payment_status', 'updated_at'])
 
             return Response({
                 "message": "Order marked as completed successfully.",
@@ -796,9 +861,6 @@ class CompleteOrderView(APIView):
         except SeatBooking.DoesNotExist:
             return Response({"error": "Booking not found."}, status=status.HTTP_404_NOT_FOUND)
 
-        except Table.DoesNotExist:
-            return Response({"error": "Table not found."}, status=status.HTTP_404_NOT_FOUND)
-
 
 class ReviewView(APIView):
     authentication_classes = [TokenAuthentication]
@@ -812,7 +874,9 @@ class ReviewView(APIView):
 
         serializer = ReviewSerializer(data=request.data)
         if serializer.is_valid():
-            serializer.save(user=profile)
+            # The post_save handler folds the stars into the restaurant's rating.
+            with transaction.atomic():
+                serializer.save(user=profile)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -823,8 +887,9 @@ class ReviewView(APIView):
         except CustomerProfile.DoesNotExist:
             return Response({"error": "Customer profile not found."}, status=status.HTTP_404_NOT_FOUND)
 
-        reviews = Review.objects.filter(user=profile)
-        serializer = ReviewSerializer(reviews, many=True)
+        fields = requested_fields(request)
+        reviews = ReviewSerializer.narrow(Review.objects.filter(user=profile), fields)
+        serializer = ReviewSerializer(reviews, many=True, fields=fields)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
     def delete(self, request, pk=None):
@@ -836,12 +901,15 @@ class ReviewView(APIView):
         except CustomerProfile.DoesNotExist:
             return Response({"error": "Customer profile not found."}, status=status.HTTP_404_NOT_FOUND)
             
-        review = get_object_or_404(Review, pk=pk, user=profile)
-        review.delete()
+        with transaction.atomic():
+            # Locked so a concurrent delete of the same review waits, then 404s,
+            # instead of taking its stars off the rating a second time.
+            review = get_object_or_404(Review.objects.select_for_update(), pk=pk, user=profile)
+            review.delete()
         return Response({"message": "Review deleted successfully."}, status=status.HTTP_204_NO_CONTENT)
 
 
-class NotificationView(APIView):
+class NotificationView(ConditionalListMixin, APIView):
     authentication_classes = [TokenAuthentication]
     permission_classes = [IsAuthenticated]
 
@@ -851,9 +919,9 @@ class NotificationView(APIView):
         except Restaurant.DoesNotExist:
             return Response({"error": "Restaurant not found"}, status=404)
 
+        fields = requested_fields(request)
         notifications = Notification.objects.filter(restaurant=restaurant).order_by('-created_at')
-        serializer = NotificationSerializer(notifications, many=True)
-        return Response(serializer.data, status=200)
+        return self.conditional_list_response(request, notifications, lambda: NotificationSerializer.values_data(notifications, fields))
 
 
 class AddressView(APIView):
@@ -866,8 +934,9 @@ class AddressView(APIView):
         except CustomerProfile.DoesNotExist:
             return Response({"error": "Customer profile not found."}, status=status.HTTP_404_NOT_FOUND)
 
-        addresses = Address.objects.filter(user=profile).order_by('-created_at')
-        serializer = AddressSerializer(addresses, many=True)
+        fields = requested_fields(request)
+        addresses = AddressSerializer.narrow(Address.objects.filter(user=profile).order_by('-created_at'), fields)
+        serializer = AddressSerializer(addresses, many=True, fields=fields)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
     def post(self, request):
@@ -957,6 +1026,7 @@ class CreateRazorpayOrderView(APIView):
     authentication_classes = [TokenAuthentication]
     permission_classes = [IsAuthenticated]
 
+    @idempotent
     def post(self, request):
         booking_id = request.data.get('booking_id')
 
@@ -993,25 +1063,20 @@ class CreateRazorpayOrderView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        # Create Razorpay order
-        client = razorpay.Client(
-            auth=(settings.RAZORPAY_KEY_ID, settings.RAZORPAY_KEY_SECRET)
-        )
-
         # Amount must be in paise (multiply by 100)
         amount_in_paise = int(booking.total_advance_payment * 100)
 
+        gateway = get_gateway()
         try:
-            razorpay_order = client.order.create({
-                "amount": amount_in_paise,
-                "currency": "INR",
-                "receipt": f"booking_{booking.id}",
-                "notes": {
+            razorpay_order = gateway.create_order(
+                amount=amount_in_paise,
+                receipt=f"booking_{booking.id}",
+                notes={
                     "booking_id": str(booking.id),
                     "restaurant": booking.restaurant.name,
                     "guests": str(booking.number_of_guests),
-                }
-            })
+                },
+            )
         except Exception as e:
             return Response(
                 {"error": "Failed to create payment order.", "details": str(e)},
@@ -1024,7 +1089,7 @@ class CreateRazorpayOrderView(APIView):
                 "amount": amount_in_paise,
                 "currency": "INR",
                 "booking_id": booking.id,
-                "razorpay_key": settings.RAZORPAY_KEY_ID,
+                "razorpay_key": gateway.key_id,
             },
             status=status.HTTP_200_OK
         )
@@ -1032,20 +1097,19 @@ class CreateRazorpayOrderView(APIView):
 
 @method_decorator(csrf_exempt, name='dispatch')
 class RazorpayWebhookView(APIView):
+    """
+    Verify, store and acknowledge. Processing happens in the webhook worker
+    (process_webhook_events task / process_webhooks command), so Razorpay never
+    waits on row locks and redeliveries are deduplicated by event id.
+    """
 
     def post(self, request):
-        webhook_secret = settings.RAZORPAY_WEBHOOK_SECRET  # fixed: separate secret, not API key secret
-
         razorpay_signature = request.headers.get('X-Razorpay-Signature')
         if not razorpay_signature:
             return Response({"error": "Missing signature."}, status=status.HTTP_400_BAD_REQUEST)
 
         body = request.body
-        expected_signature = hmac.new(
-            webhook_secret.encode('utf-8'), body, hashlib.sha256
-        ).hexdigest()
-
-        if not hmac.compare_digest(expected_signature, razorpay_signature):
+        if not verify_signature(body, razorpay_signature):
             return Response({"error": "Invalid signature."}, status=status.HTTP_400_BAD_REQUEST)
 
         try:
@@ -1053,104 +1117,11 @@ class RazorpayWebhookView(APIView):
         except Exception:
             return Response({"error": "Invalid JSON."}, status=status.HTTP_400_BAD_REQUEST)
 
-        event = payload.get('event')
-        payment_entity = payload.get('payload', {}).get('payment', {}).get('entity', {})
-        notes = payment_entity.get('notes', {})
-        payment_type = notes.get('type')  # 'bill_payment' if from CreateBillPaymentOrderView, else seat booking
-
-        if event == 'payment.captured':
-            if payment_type == 'bill_payment':
-                return self._handle_bill_payment_captured(payment_entity, notes)
-            return self._handle_seat_booking_captured(payment_entity, notes)
-
-        if event == 'payment.failed':
-            if payment_type == 'bill_payment':
-                return self._handle_bill_payment_failed(notes)
-            return self._handle_seat_booking_failed(notes)
-
+        event, created = store_event(body, payload, request.headers.get('X-Razorpay-Event-Id'))
+        if not created:
+            return Response({"status": "Duplicate event."}, status=200)
         return Response({"status": "Event received."}, status=200)
 
-    def _handle_seat_booking_captured(self, payment_entity, notes):
-        booking_id = notes.get('booking_id')
-        if not booking_id:
-            return Response({"error": "booking_id missing in notes."}, status=400)
-
-        with transaction.atomic():
-            try:
-                booking = SeatBooking.objects.select_for_update().get(id=booking_id)
-            except SeatBooking.DoesNotExist:
-                return Response({"error": "Booking not found."}, status=404)
-
-            if booking.payment_status == 'success':
-                return Response({"status": "Already confirmed."}, status=200)  # idempotent on retries
-
-            if booking.is_lock_expired():
-                booking.release_lock()
-                return Response({"error": "Booking expired."}, status=400)
-
-            expected_paise = int(round(booking.total_advance_payment * 100))
-            received_paise = int(payment_entity.get('amount', 0))
-            if received_paise != expected_paise:
-                return Response(
-                    {"error": "Amount mismatch.", "expected": expected_paise, "received": received_paise},
-                    status=400
-                )
-
-            booking.payment_status = 'success'
-            booking.locked = False
-            booking.lock_expiry = None
-            booking.save()
-
-        return Response({"status": "Booking confirmed."}, status=200)
-
-    def _handle_seat_booking_failed(self, notes):
-        booking_id = notes.get('booking_id')
-        if booking_id:
-            try:
-                booking = SeatBooking.objects.get(id=booking_id)
-                booking.release_lock()
-            except SeatBooking.DoesNotExist:
-                pass
-        return Response({"status": "Payment failed, booking released."}, status=200)
-
-    def _handle_bill_payment_captured(self, payment_entity, notes):
-        billing_id = notes.get('billing_id')
-        if not billing_id:
-            return Response({"error": "billing_id missing in notes."}, status=400)
-
-        with transaction.atomic():
-            try:
-                billing = Billing.objects.select_for_update().get(id=billing_id)
-            except Billing.DoesNotExist:
-                return Response({"error": "Billing not found."}, status=404)
-
-            if billing.payment_status == 'success':
-                return Response({"status": "Already paid."}, status=200)
-
-            expected_paise = int(round(billing.final_amount_to_pay * 100))
-            received_paise = int(payment_entity.get('amount', 0))
-            if received_paise != expected_paise:
-                return Response(
-                    {"error": "Amount mismatch.", "expected": expected_paise, "received": received_paise},
-                    status=400
-                )
-
-            billing.payment_status = 'success'
-            billing.save()
-
-        return Response({"status": "Bill payment confirmed."}, status=200)
-
-    def _handle_bill_payment_failed(self, notes):
-        billing_id = notes.get('billing_id')
-        if billing_id:
-            try:
-                billing = Billing.objects.get(id=billing_id)
-                billing.payment_status = 'failed'
-                billing.save()
-            except Billing.DoesNotExist:
-                pass
-        return Response({"status": "Bill payment failed."}, status=200)
-
 class CreateBillPaymentOrderView(APIView):
     """
     Creates a Razorpay order for the dining bill — amount is always looked up
@@ -1169,21 +1140,16 @@ class CreateBillPaymentOrderView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        billing = None
         try:
             if booking_id:
                 # Ownership check: only the customer who made this booking can pay it
-                booking = SeatBooking.objects.get(id=booking_id, user=request.user.customer_profile)
-                billing = Billing.objects.filter(booking=booking).first()
-            if not billing and table_id:
-                # Table-only bills are shared dine-in bills — any diner at that table can pay,
-                # which is intentional (no single "owner" of a walk-in table order)
-                table = Table.objects.get(id=table_id)
-                billing = Billing.objects.filter(table=table).first()
+                SeatBooking.objects.get(id=booking_id, user=request.user.customer_profile)
         except SeatBooking.DoesNotExist:
             return Response({"error": "Booking not found or unauthorized."}, status=status.HTTP_404_NOT_FOUND)
-        except Table.DoesNotExist:
-            return Response({"error": "Table not found."}, status=status.HTTP_404_NOT_FOUND)
+
+        # Table-only bills are shared dine-in bills — any diner at that table can pay,
+        # which is intentional (no single "owner" of a walk-in table order)
+        billing = Billing.find_open(booking_id=booking_id, table_id=table_id)
 
         if not billing:
             return Response({"error": "Bill not found. Generate the bill first."}, status=status.HTTP_404_NOT_FOUND)
@@ -1203,14 +1169,13 @@ class CreateBillPaymentOrderView(APIView):
             "customer": str(request.user.username),
         }
 
-        client = razorpay.Client(auth=(settings.RAZORPAY_KEY_ID, settings.RAZORPAY_KEY_SECRET))
+        gateway = get_gateway()
         try:
-            razorpay_order = client.order.create({
-                "amount": amount_in_paise,
-                "currency": "INR",
-                "receipt": f"bill_{billing.id}_{int(timezone.now().timestamp())}",
-                "notes": notes,
-            })
+            razorpay_order = gateway.create_order(
+                amount=amount_in_paise,
+                receipt=f"bill_{billing.id}_{int(timezone.now().timestamp())}",
+                notes=notes,
+            )
         except Exception as e:
             return Response(
                 {"error": "Failed to create bill payment order.", "details": str(e)},
@@ -1226,7 +1191,7 @@ class CreateBillPaymentOrderView(APIView):
                 "amount": amount_in_paise,
                 "currency": "INR",
                 "billing_id": billing.id,
-                "razorpay_key": settings.RAZORPAY_KEY_ID,
+                "razorpay_key": gateway.key_id,
             },
             status=status.HTTP_200_OK
         )
@@ -1272,6 +1237,32 @@ class ConfirmBillPaymentView(APIView):
             return Response({"status": "Bill already paid."})
 
         billing.payment_status = 'success'
-        billing.save()
+        billing.save(update_fields=['payment_status', 'updated_at'])
+
+        return Response({"status": "Bill payment confirmed!"}, status=status.HTTP_200_OK)
+
+
+class CustomerHomeView(APIView):
+    """
+    The home screen in one call: nearby restaurants and their live offers (cached
+    per coordinate cell) plus the customer's upcoming bookings (computed per request).
+    """
+    authentication_classes = [TokenAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        try:
+            profile = request.user.customer_profile
+        except CustomerProfile.DoesNotExist:
+            return Response({"error": "Customer profile not found."}, status=status.HTTP_404_NOT_FOUND)
+
+        latitude = request.query_params.get('latitude')
+        longitude = request.query_params.get('longitude')
+        if not latitude or not longitude:
+            return Response({"error": "latitude and longitude are required."}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            latitude, longitude = float(latitude), float(longitude)
+        except ValueError:
+            return Response({"error": "Invalid coordinates."}, status=status.HTTP_400_BAD_REQUEST)
 
-        return Response({"status": "Bill payment confirmed!"}, status=status.HTTP_200_OK)
\ No newline at end of file
+        return Response(build_home(profile, latitude, longitude), status=status.HTTP_200_OK)
@@ -0,0 +1,221 @@
+import hashlib
+import hmac
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import SeatBooking, Billing, WebhookEvent
+
+MAX_WEBHOOK_ATTEMPTS = 8
+WEBHOOK_BATCH_SIZE = 100
+# A claimed event whose worker died becomes visible again after this long.
+PROCESSING_LEASE = timedelta(minutes=5)
+
+
+class WebhookRejected(Exception):
+    """The event is valid but can never be applied (unknown booking, amount mismatch, ...)."""
+
+
+def verify_signature(body, signature):
+    expected = hmac.new(settings.RAZORPAY_WEBHOOK_SECRET.encode('utf-8'), body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, signature)
+
+
+def ordering_key(notes):
+    if notes.get('type') == 'bill_payment' and notes.get('billing_id'):
+        return f"billing:{notes['billing_id']}"
+    if notes.get('booking_id'):
+        return f"booking:{notes['booking_id']}"
+    return ''
+
+
+def store_event(body, payload, event_id=None):
+    """
+    Persist a verified delivery. Razorpay retries reuse X-Razorpay-Event-Id, so the
+    unique event_id turns redelivery into a no-op; returns (event, created).
+    """
+    notes = payload.get('payload', {}).get('payment', {}).get('entity', {}).get('notes', {}) or {}
+    event_id = event_id or hashlib.sha256(body).hexdigest()
+    try:
+        with transaction.atomic():
+            event = WebhookEvent.objects.create(
+                event_id=event_id,
+                event_type=payload.get('event') or '',
+                ordering_key=ordering_key(notes),
+                body=body.decode('utf-8'),
+            )
+        return event, True
+    except IntegrityError:
+        return WebhookEvent.objects.get(event_id=event_id), False
+
+
+def _seat_booking_captured(payment_entity, notes):
+    booking_id = notes.get('booking_id')
+    if not booking_id:
+        raise WebhookRejected("booking_id missing in notes.")
+
+    with transaction.atomic():
+        try:
+            booking = SeatBooking.objects.select_for_update().get(id=booking_id)
+        except SeatBooking.DoesNotExist:
+            raise WebhookRejected("Booking not found.")
+
+        if booking.payment_status == 'success':
+            return "Already confirmed."
+
+        expired = booking.is_lock_expired()
+        if expired:
+            # Released outside the rejection so the release is committed.
+            booking.release_lock()
+        else:
+            expected_paise = int(round(booking.total_advance_payment * 100))
+            received_paise = int(payment_entity.get('amount', 0))
+            if received_paise != expected_paise:
+                raise WebhookRejected(f"Amount mismatch: expected {expected_paise}, received {received_paise}.")
+
+            booking.payment_status = 'success'
+            booking.locked = False
+            booking.lock_expiry = None
+            booking.save()
+
+    if expired:
+        raise WebhookRejected("Booking expired.")
+    return "Booking confirmed."
+
+
+def _seat_booking_failed(notes):
+    booking_id = notes.get('booking_id')
+    if booking_id:
+        try:
+            booking = SeatBooking.objects.get(id=booking_id)
+            booking.release_lock()
+        except SeatBooking.DoesNotExist:
+            pass
+    return "Payment failed, booking released."
+
+
+def _bill_payment_captured(payment_entity, notes):
+    billing_id = notes.get('billing_id')
+    if not billing_id:
+        raise WebhookRejected("billing_id missing in notes.")
+
+    with transaction.atomic():
+        try:
+            billing = Billing.objects.select_for_update().get(id=billing_id)
+        except Billing.DoesNotExist:
+            raise WebhookRejected("Billing not found.")
+
+        if billing.payment_status == 'success':
+            return "Already paid."
+
+        expected_paise = int(round(billing.final_amount_to_pay * 100))
+        received_paise = int(payment_entity.get('amount', 0))
+        if received_paise != expected_paise:
+            raise WebhookRejected(f"Amount mismatch: expected {expected_paise}, received {received_paise}.")
+
+        billing.payment_status = 'success'
+        billing.save(update_fields=['payment_status', 'updated_at'])
+
+    return "Bill payment confirmed."
+
+
+def _bill_payment_failed(notes):
+    billing_id = notes.get('billing_id')
+    if billing_id:
+        try:
+            billing = Billing.objects.get(id=billing_id)
+            billing.payment_status = 'failed'
+            billing.save(update_fields=['payment_status', 'updated_at'])
+        except Billing.DoesNotExist:
+            pass
+    return "Bill payment failed."
+
+
+def handle_event(payload):
+    event = payload.get('event')
+    payment_entity = payload.get('payload', {}).get('payment', {}).get('entity', {})
+    notes = payment_entity.get('notes', {}) or {}
+    payment_type = notes.get('type')  # 'bill_payment' if from CreateBillPaymentOrderView, else seat booking
+
+    if event == 'payment.captured':
+        if payment_type == 'bill_payment':
+            return _bill_payment_captured(payment_entity, notes)
+        return _seat_booking_captured(payment_entity, notes)
+
+    if event == 'payment.failed':
+        if payment_type == 'bill_payment':
+            return _bill_payment_failed(notes)
+        return _seat_booking_failed(notes)
+
+    return "Event ignored."
+
+
+def _retry_delay(attempts):
+    return timedelta(seconds=min(2 ** attempts * 15, 3600))
+
+
+def _claim(event, now):
+    """Take the event with a conditional UPDATE so concurrent workers never both run it."""
+    claimed = WebhookEvent.objects.filter(
+        pk=event.pk, status=event.status, attempts=event.attempts,
+    ).update(status='processing', attempts=F('attempts') + 1, next_attempt_at=now + PROCESSING_LEASE)
+    return bool(claimed)
+
+
+def process_event(event, now=None):
+    now = now or timezone.now()
+    if not _claim(event, now):
+        return None
+    event.refresh_from_db()
+
+    try:
+        result = handle_event(json.loads(event.body))
+    except WebhookRejected as exc:
+        event.status, event.result, event.processed_at = 'rejected', str(exc), timezone.now()
+    except Exception as exc:
+        event.result = f"{type(exc).__name__}: {exc}"
+        if event.attempts >= MAX_WEBHOOK_ATTEMPTS:
+            event.status = 'failed'
+        else:
+            event.status = 'pending'
+            event.next_attempt_at = timezone.now() + _retry_delay(event.attempts)
+    else:
+        event.status, event.result, event.processed_at = 'processed', result, timezone.now()
+
+    event.save(update_fields=['status', 'result', 'next_attempt_at', 'processed_at'])
+    return event.status
+
+
+def process_pending_events(limit=WEBHOOK_BATCH_SIZE, now=None):
+    """
+    Drain due events oldest first. An event waits while an earlier event with the
+    same ordering key is unfinished, so a retried capture is never overtaken by a
+    later failure for the same booking or bill.
+    """
+    now = now or timezone.now()
+    due = list(WebhookEvent.objects.filter(
+        status__in=['pending', 'processing'], next_attempt_at__lte=now,
+    ).order_by('id')[:limit])
+
+    keys = {event.ordering_key for event in due if event.ordering_key}
+    unfinished = {}
+    for key, event_id in WebhookEvent.objects.filter(
+        ordering_key__in=keys, status__in=['pending', 'processing'],
+    ).order_by('id').values_list('ordering_key', 'id'):
+        unfinished.setdefault(key, []).append(event_id)
+
+    counts = {}
+    for event in due:
+        queue = unfinished.get(event.ordering_key)
+        if queue and queue[0] != event.id:
+            counts['deferred'] = counts.get('deferred', 0) + 1
+            continue
+        outcome = process_event(event, now) or 'skipped'
+        counts[outcome] = counts.get(outcome, 0) + 1
+        if queue and outcome in ('processed', 'rejected', 'failed'):
+            queue.pop(0)
+    return counts